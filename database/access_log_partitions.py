@@ -0,0 +1,48 @@
+"""
+access_logs partition bakım scripti
+Gelecek aylar için partition oluşturur, eski partitionları ayırır (arşivler).
+
+Proje kök dizininden çalıştırın (cron ile ayda bir yeterli):
+    python -m database.access_log_partitions --months-ahead 2 --retain-months 12
+"""
+
+import argparse
+
+from database import dao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="access_logs partition bakımı")
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=dao.ACCESS_LOG_MONTHS_AHEAD,
+        help="Bu aydan sonra kaç ay için partition hazırlansın",
+    )
+    parser.add_argument(
+        "--retain-months",
+        type=int,
+        default=None,
+        help="Bu kadar aydan eski partitionları ayır (verilmezse hiçbirine dokunulmaz)",
+    )
+    parser.add_argument(
+        "--drop",
+        action="store_true",
+        help="Ayrılan partitionları arşiv tablosu olarak bırakmak yerine sil",
+    )
+    args = parser.parse_args()
+
+    report = dao.maintain_access_log_partitions(
+        months_ahead=args.months_ahead,
+        retain_months=args.retain_months,
+        drop=args.drop,
+    )
+
+    print(f"✓ Oluşturulan partition: {', '.join(report['created']) or '-'}")
+    print(f"✓ Ayrılan (arşiv) partition: {', '.join(report['detached']) or '-'}")
+    if args.drop:
+        print(f"✓ Silinen partition: {', '.join(report['dropped']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
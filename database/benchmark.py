@@ -0,0 +1,320 @@
+"""
+DAO performans ölçümü (benchmark)
+Temsilî dao çağrılarını yerel PostgreSQL'e karşı tekrar tekrar çalıştırır;
+her işlem için p50/p95/p99 gecikme, saniyedeki işlem sayısı ve işlem başına
+sorgu sayısını raporlar. --json sonucu dosyaya yazar, --compare önceki bir
+çalıştırmayla (ör. başka bir commit) karşılaştırır.
+
+Veri eklediği ve yazma işlemi ölçtüğü için ayrı bir veritabanında çalıştırın
+(proje kök dizininden):
+    PGDATABASE=gym_bench alembic upgrade head
+    PGDATABASE=gym_bench python -m database.benchmark --seed-users 100000 --log-months 3
+    PGDATABASE=gym_bench python -m database.benchmark --json bench/yeni.json --compare bench/eski.json
+"""
+
+import argparse
+import contextlib
+import json
+import random
+import statistics
+import subprocess
+import time
+from datetime import date, datetime, timedelta
+
+from database import dao, db, query_stats
+from database.records import MemberRow
+from database.seed_mock_data import seed_dataset
+
+
+class BenchmarkContext:
+    """Ölçülen işlemlerin paylaştığı örnek üyeler, paket ve ödeme tipi"""
+
+    def __init__(self, sample_size, seed):
+        with db.db_connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT id FROM users ORDER BY id")
+            user_ids = [row["id"] for row in cur.fetchall()]
+        if not user_ids:
+            raise SystemExit("❌ Veritabanında üye yok: önce --seed-users ile veri ekleyin")
+
+        rng = random.Random(seed)
+        self.member_ids = rng.sample(user_ids, min(sample_size, len(user_ids)))
+        packages = dao.get_all_packages()
+        payment_types = dao.get_all_payment_types()
+        if not packages or not payment_types:
+            raise SystemExit("❌ Paket veya ödeme tipi yok: önce --seed-users ile veri ekleyin")
+        self.package = packages[0]
+        self.payment_type_id = payment_types[0]["id"]
+        self.created_subscriptions = []
+        self.registered_members = []
+        with db.db_connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT now() as now")
+            self.started_at = cur.fetchone()["now"]
+        self.logged_members = set()
+
+    def member(self, i):
+        return self.member_ids[i % len(self.member_ids)]
+
+    def create_subscription(self, i):
+        start = datetime.now()
+        self.created_subscriptions.append(
+            dao.create_subscription(
+                user_id=self.member(i),
+                package_id=self.package["id"],
+                start_date=start,
+                end_date=start + timedelta(days=self.package["duration_days"]),
+                price_sold=float(self.package["price"]),
+                payment_type_id=self.payment_type_id,
+            )
+        )
+
+    def register_member(self, i, atomic=True):
+        """Üye kaydı ekranının akışı: üye, paket, üyelik (atomic: tek transaction)"""
+        with dao.transaction() if atomic else contextlib.nullcontext():
+            tc_number = f"{7 if atomic else 8}{i:010d}"
+            user_id = dao.create_user(
+                "Benchmark", f"Uye {i}", f"benchmark.{tc_number}@example.com", "",
+                "05000000000", "Erkek", tc_number, date(1990, 1, 1),
+            )
+            package = dao.get_package(self.package["id"])
+            start = datetime.now()
+            subscription_id = dao.create_subscription(
+                user_id, package["id"], start,
+                start + timedelta(days=package["duration_days"]),
+                float(package["price"]), self.payment_type_id,
+            )
+        self.registered_members.append((user_id, subscription_id))
+
+    def turnstile_event(self, i):
+        """Turnike olayı: üyeyi oku, logu yaz, içerideki sayısını güncelle"""
+        user_id = self.member(i)
+        dao.get_user(user_id, columns=("first_name", "last_name", "program_name"))
+        dao.add_access_log(user_id, "GİRİŞ" if i % 2 == 0 else "ÇIKIŞ")
+        self.logged_members.add(user_id)
+        dao.get_inside_count()
+
+    def cleanup(self):
+        """Ölçüm sırasında eklenen üyeleri, üyelikleri ve logları sil (veri seti değişmesin)"""
+        for subscription_id in self.created_subscriptions:
+            dao.delete_subscription(subscription_id)
+        self.created_subscriptions = []
+        for user_id, subscription_id in self.registered_members:
+            dao.delete_subscription(subscription_id)
+            dao.delete_user(user_id)
+        self.registered_members = []
+        if self.logged_members:
+            with db.db_connection() as conn, conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM access_logs WHERE user_id = ANY(%s) AND created_at >= %s",
+                    (list(self.logged_members), self.started_at),
+                )
+                conn.commit()
+            self.logged_members = set()
+
+
+# İşlem adı -> ctx ve tekrar numarasıyla çağrılan fonksiyon
+OPERATIONS = {
+    "get_all_users": lambda ctx, i: dao.get_all_users(),
+    "get_all_users_records": lambda ctx, i: dao.get_all_users(records=True),
+    "get_users_page": lambda ctx, i: dao.get_users_page(limit=200),
+    "get_users_page_records": lambda ctx, i: dao.get_users_page(limit=200, records=True),
+    "get_users_page_member_rows": lambda ctx, i: dao.get_users_page(limit=200, records=MemberRow),
+    "get_user": lambda ctx, i: dao.get_user(ctx.member(i)),
+    "get_package": lambda ctx, i: dao.get_package(ctx.package["id"]),
+    "get_user_subscriptions": lambda ctx, i: dao.get_user_subscriptions(ctx.member(i)),
+    "get_inside_count": lambda ctx, i: dao.get_inside_count(),
+    "get_todays_access_logs": lambda ctx, i: dao.get_todays_access_logs(limit=100),
+    "get_dashboard_stats": lambda ctx, i: dao.get_dashboard_stats(),
+    "create_subscription": lambda ctx, i: ctx.create_subscription(i),
+    "register_member": lambda ctx, i: ctx.register_member(i),
+    "register_member_separate": lambda ctx, i: ctx.register_member(i, atomic=False),
+    "turnstile_event": lambda ctx, i: ctx.turnstile_event(i),
+}
+
+
+def percentile(sorted_values, p):
+    """Sıralı listede p. yüzdelik (doğrusal ara değer)"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    k = (len(sorted_values) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (k - low)
+
+
+def measure(operation, ctx, iterations, warmup):
+    """operation'ı warmup kez ısıtıp iterations kez ölçer, istatistikleri döndürür"""
+    for i in range(warmup):
+        operation(ctx, i)
+
+    durations = []
+    queries_before = query_stats.total_queries()
+    for i in range(iterations):
+        started = time.perf_counter()
+        operation(ctx, warmup + i)
+        durations.append(time.perf_counter() - started)
+    queries = query_stats.total_queries() - queries_before
+
+    durations.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p95_ms": round(percentile(durations, 95) * 1000, 3),
+        "p99_ms": round(percentile(durations, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(durations) * 1000, 3),
+        "max_ms": round(durations[-1] * 1000, 3),
+        "ops_per_sec": round(iterations / sum(durations), 1),
+        "queries_per_op": round(queries / iterations, 2),
+    }
+
+
+def dataset_size():
+    with db.db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """SELECT (SELECT COUNT(*) FROM users) as users,
+                      (SELECT COUNT(*) FROM subscriptions) as subscriptions,
+                      (SELECT COUNT(*) FROM access_logs) as access_logs"""
+        )
+        return dict(cur.fetchone())
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print(f"\n{'İşlem':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'işlem/sn':>11}{'sorgu':>8}")
+    print("-" * 75)
+    for name, r in results.items():
+        print(
+            f"{name:<26}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+            f"{r['ops_per_sec']:>11.1f}{r['queries_per_op']:>8.2f}"
+        )
+
+
+def print_comparison(report, previous):
+    print(f"\nKarşılaştırma: {previous.get('label') or '?'} -> {report.get('label') or '?'}")
+    print(f"{'İşlem':<26}{'p50 ms':>20}{'değişim':>10}{'p95 ms':>20}{'değişim':>10}")
+    print("-" * 86)
+    for name, new in report["results"].items():
+        old = previous.get("results", {}).get(name)
+        if old is None:
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms"):
+            change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            cells.append(f"{old[key]:>9.2f} -> {new[key]:<7.2f}{change:>+9.1f}%")
+        print(f"{name:<26}{cells[0]}{cells[1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="dao.py performans ölçümü")
+    parser.add_argument(
+        "--seed-users",
+        type=int,
+        default=0,
+        help="Ölçümden önce bu kadar üye (üyelik ve loglarıyla) ekle (0: mevcut veriyi kullan)",
+    )
+    parser.add_argument(
+        "--log-months",
+        type=int,
+        default=1,
+        help="--seed-users ile eklenecek turnike logu (ay)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Veri ve örnek üye seçimi tohumu")
+    parser.add_argument("--iterations", type=int, default=50, help="İşlem başına ölçüm sayısı")
+    parser.add_argument("--warmup", type=int, default=3, help="Ölçülmeyen ısınma çağrısı sayısı")
+    parser.add_argument(
+        "--members",
+        type=int,
+        default=100,
+        help="Üye bazlı işlemlerde dönüşümlü kullanılan örnek üye sayısı",
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=sorted(OPERATIONS),
+        help="Sadece bu işlemleri ölç",
+    )
+    parser.add_argument(
+        "--no-prepare",
+        action="store_true",
+        help="Sık sorguları hazırlanmış ifade (PREPARE) olmadan çalıştır (karşılaştırma için)",
+    )
+    parser.add_argument("--label", default=None, help="Sonucun etiketi (varsayılan: git commit)")
+    parser.add_argument("--json", default=None, help="Sonucu bu JSON dosyasına yaz")
+    parser.add_argument("--compare", default=None, help="Önceki bir JSON sonucuyla karşılaştır")
+    args = parser.parse_args()
+
+    if args.seed_users > 0:
+        seed_dataset(
+            users=args.seed_users,
+            max_subscriptions=3,
+            log_months=args.log_months,
+            seed=args.seed,
+            skip_reference=bool(dao.get_all_packages()),
+        )
+
+    db.set_prepared_statements(not args.no_prepare)
+    if not query_stats.enabled():
+        raise SystemExit("❌ Sorgu sayımı için PGQUERY_STATS=0 olmadan çalıştırın")
+    # Seed sırasındaki sorgular ölçüme karışmasın
+    query_stats.reset()
+
+    ctx = BenchmarkContext(args.members, args.seed)
+    report = {
+        "label": args.label or git_revision(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "members": len(ctx.member_ids),
+            "seed": args.seed,
+            "prepared_statements": db.prepared_statements_enabled(),
+        },
+        "dataset": dataset_size(),
+        "results": {},
+        "queries": [],
+    }
+    print(
+        f"Veri seti: {report['dataset']['users']} üye, "
+        f"{report['dataset']['subscriptions']} üyelik, "
+        f"{report['dataset']['access_logs']} turnike logu"
+    )
+
+    try:
+        for name, operation in OPERATIONS.items():
+            if args.only and name not in args.only:
+                continue
+            print(f"Ölçülüyor: {name}...")
+            report["results"][name] = measure(operation, ctx, args.iterations, args.warmup)
+        # Toplam süreye göre en pahalı sorgular (ısınma dahil)
+        report["queries"] = [
+            {key: row[key] for key in ("fingerprint", "calls", "total_ms", "p50_ms", "p95_ms", "max_ms", "rows")}
+            for row in query_stats.top(10)
+        ]
+    finally:
+        ctx.cleanup()
+        db.close_pool()
+
+    print_results(report["results"])
+    print("\nEn pahalı sorgular:")
+    print(query_stats.format_report(5))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(report, json.load(f))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Sonuç yazıldı: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,10 @@ Contains all database get/set functions for PyQt UI
 """
 
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any
-from database.db import get_db_connection
+from typing import Optional, List, Dict, Any, Sequence, Union
+from psycopg2.extras import execute_values
+from database.db import db_connection, execute_prepared, transaction, tuple_cursor
+from database.records import User, Subscription, Package, AccessLog
 import re
 import hashlib
 
@@ -87,62 +89,278 @@ def kullanici_kaydet(kullanici_adi: str, sifre: str, email: str) -> bool:
         return False
 
 
+# ==================== RECORDS ====================
+
+
+def _list_cursor(conn, records):
+    """Tuple cursor for the records fast path, the default dict cursor otherwise"""
+    return tuple_cursor(conn) if records else conn.cursor()
+
+
+def _projection(
+    column_map: Dict[str, str],
+    default_record,
+    records=False,
+    columns: Optional[Sequence[str]] = None,
+) -> tuple[str, Any]:
+    """
+    SELECT list and record class of a list query. records=True selects the
+    fields of `default_record`, a record class (e.g. records.MemberRow) only
+    its own fields; dict rows get `columns`, or all of `default_record`'s
+    fields. Names are looked up in `column_map` (never interpolate input).
+    """
+    if records:
+        record_type = default_record if records is True else records
+        fields = record_type._fields
+    else:
+        record_type = None
+        fields = columns or default_record._fields
+    unknown = [name for name in fields if name not in column_map]
+    if unknown:
+        raise ValueError(f"Unknown column: {', '.join(unknown)}")
+    return ", ".join(f"{column_map[name]} as {name}" for name in fields), record_type
+
+
+def _fetch_list(cur, record_type) -> list:
+    """All rows as `record_type` records (tuple cursor), or dicts if None"""
+    if record_type is not None:
+        return list(map(record_type._make, cur.fetchall()))
+    return [dict(row) for row in cur.fetchall()]
+
+
 # ==================== USERS ====================
 
 
-def get_user(user_id: int) -> Optional[Dict[str, Any]]:
-    """Get a single user by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """SELECT u.*, p.name as program_name 
-               FROM users u 
-               LEFT JOIN programs p ON u.current_program_id = p.id 
+# Member list rows: user, program and the current subscription that
+# create/update/delete_subscription keep on users (current_subscription_id,
+# active_until), so no per-user subscription lookup is needed. The status
+# shown is users.status, kept in step by expire_memberships().
+_USER_LIST_FROM = """FROM users u
+               LEFT JOIN programs p ON u.current_program_id = p.id
+               LEFT JOIN subscriptions cs ON cs.id = u.current_subscription_id
+               LEFT JOIN packages pk ON cs.package_id = pk.id"""
+
+# Columns the user functions can project (field name -> expression); the
+# password hash is not selectable, user rows never carry it
+USER_LIST_COLUMNS = {
+    "id": "u.id",
+    "first_name": "u.first_name",
+    "last_name": "u.last_name",
+    "email": "u.email",
+    "phone": "u.phone",
+    "gender": "u.gender",
+    "tc_number": "u.tc_number",
+    "status": "u.status",
+    "birth_date": "u.birth_date",
+    "created_at": "u.created_at",
+    "current_program_id": "u.current_program_id",
+    "current_subscription_id": "u.current_subscription_id",
+    "active_until": "u.active_until",
+    "program_name": "p.name",
+    "start_date": "cs.start_date",
+    "end_date": "cs.end_date",
+    "package_name": "pk.name",
+    "subscription_status": "u.status",
+}
+
+# Default dict shape of get_user/get_all_users/get_users_by_status: the
+# users row (without password) and program name. The subscription joins of
+# _USER_LIST_FROM are dropped by the planner when none of their columns is
+# selected.
+_USER_FIELDS = tuple(USER_LIST_COLUMNS)[: list(USER_LIST_COLUMNS).index("program_name") + 1]
+
+
+def get_user(
+    user_id: int, columns: Optional[Sequence[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Get a single user by ID with program name, or only `columns` (keys of
+    USER_LIST_COLUMNS)
+    """
+    select, _ = _projection(USER_LIST_COLUMNS, User, columns=columns or _USER_FIELDS)
+    with db_connection() as conn, conn.cursor() as cur:
+        # Hot path (turnstile, dialogs): prepared once per connection
+        execute_prepared(
+            cur,
+            "get_user",
+            f"""SELECT {select}
+               {_USER_LIST_FROM}
                WHERE u.id = %s""",
             (user_id,),
         )
         result = cur.fetchone()
         return dict(result) if result else None
-    finally:
-        cur.close()
-        conn.close()
 
 
-def get_all_users() -> List[Dict[str, Any]]:
-    """Get all users"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+def get_all_users(
+    records=False, columns: Optional[Sequence[str]] = None
+) -> List[Union[Dict[str, Any], User]]:
+    """
+    Get all users with program name.
+
+    The user list functions share these projection arguments: records=True
+    returns records.User tuples (member list shape, including the current
+    subscription) instead of dicts, a record class (e.g. records.MemberRow)
+    selects and returns only its fields, and `columns` (keys of
+    USER_LIST_COLUMNS) picks the keys of dict rows.
+    """
+    select, record_type = _projection(
+        USER_LIST_COLUMNS, User, records, columns or _USER_FIELDS
+    )
+    with db_connection() as conn, _list_cursor(conn, records) as cur:
         cur.execute(
-            """SELECT u.*, p.name as program_name 
-               FROM users u 
-               LEFT JOIN programs p ON u.current_program_id = p.id 
+            f"""SELECT {select}
+               {_USER_LIST_FROM}
                ORDER BY u.id ASC"""
         )
-        return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        conn.close()
+        return _fetch_list(cur, record_type)
+
+
+def get_users_with_latest_subscription(
+    records=False, columns: Optional[Sequence[str]] = None
+) -> List[Union[Dict[str, Any], User]]:
+    """
+    Get all users joined with their current (most recently started)
+    subscription in one query. Adds start_date, end_date, package_name and
+    subscription_status (the member's status, see expire_memberships()).
+    Projection arguments as in get_all_users().
+    """
+    return get_all_users(records, columns or User._fields)
+
+
+def get_users_page(
+    after_id: Optional[int] = None,
+    limit: int = 200,
+    active: Optional[bool] = None,
+    records=False,
+    columns: Optional[Sequence[str]] = None,
+) -> List[Union[Dict[str, Any], User]]:
+    """
+    Keyset-paginated member list: the next `limit` users with id > after_id
+    (from the start if after_id is None), ordered by id. Rows have the same
+    shape as get_users_with_latest_subscription(); pass the last row's id
+    as after_id to fetch the following page. active=True/False keeps only
+    'Aktif' / 'Pasif' members.
+    """
+    select, record_type = _projection(USER_LIST_COLUMNS, User, records, columns)
+    active_filter = ""
+    if active is not None:
+        active_filter = "AND u.status = 'Aktif'" if active else "AND u.status = 'Pasif'"
+
+    with db_connection() as conn, _list_cursor(conn, records) as cur:
+        cur.execute(
+            f"""SELECT {select}
+               {_USER_LIST_FROM}
+               WHERE (%(after_id)s::int IS NULL OR u.id > %(after_id)s)
+               {active_filter}
+               ORDER BY u.id ASC
+               LIMIT %(limit)s""",
+            {"after_id": after_id, "limit": limit},
+        )
+        return _fetch_list(cur, record_type)
+
+
+def get_random_user(
+    exclude_ids: Sequence[int] = (),
+    records=False,
+    columns: Optional[Sequence[str]] = None,
+) -> Optional[Union[Dict[str, Any], User]]:
+    """
+    One random user whose id is not in `exclude_ids` (None if there is
+    none), in a single indexed query: a random point between the smallest
+    and largest id, then the first eligible id from there (wrapping
+    around). Ids after gaps are picked a bit more often, which is fine for
+    simulations; it never reads the whole table. Projection arguments as
+    in get_all_users().
+    """
+    select, record_type = _projection(
+        USER_LIST_COLUMNS, User, records, columns or _USER_FIELDS
+    )
+    params = {"exclude": list(exclude_ids)}
+    with db_connection() as conn, _list_cursor(conn, records) as cur:
+        cur.execute(
+            f"""WITH pick AS (
+                   SELECT lo + floor(random() * (hi - lo + 1))::int as start_id
+                   FROM (SELECT MIN(id) as lo, MAX(id) as hi FROM users) bounds
+               )
+               (SELECT {select}
+                {_USER_LIST_FROM}
+                WHERE u.id >= (SELECT start_id FROM pick)
+                  AND u.id <> ALL(%(exclude)s::int[])
+                ORDER BY u.id
+                LIMIT 1)
+               UNION ALL
+               (SELECT {select}
+                {_USER_LIST_FROM}
+                WHERE u.id < (SELECT start_id FROM pick)
+                  AND u.id <> ALL(%(exclude)s::int[])
+                ORDER BY u.id
+                LIMIT 1)
+               LIMIT 1""",
+            params,
+        )
+        rows = _fetch_list(cur, record_type)
+        return rows[0] if rows else None
+
+
+def _like_escape(text: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_users(
+    query: str,
+    limit: int = 100,
+    records=False,
+    columns: Optional[Sequence[str]] = None,
+) -> List[Union[Dict[str, Any], User]]:
+    """
+    Search users in the database by name, TC number or phone.
+    Name and phone match anywhere (ILIKE / LIKE, pg_trgm indexes), so "555"
+    finds "05551112233"; TC number matches by prefix (pattern_ops index).
+    Rows have the same shape as
+    get_users_with_latest_subscription(), at most `limit` of them.
+    """
+    query = (query or "").strip()
+    if not query:
+        return []
+
+    select, record_type = _projection(USER_LIST_COLUMNS, User, records, columns)
+    escaped = _like_escape(query)
+    with db_connection() as conn, _list_cursor(conn, records) as cur:
+        cur.execute(
+            f"""SELECT {select}
+               {_USER_LIST_FROM}
+               WHERE (u.first_name || ' ' || u.last_name) ILIKE %(contains)s
+                  OR u.tc_number LIKE %(prefix)s
+                  OR u.phone LIKE %(contains)s
+               ORDER BY u.id ASC
+               LIMIT %(limit)s""",
+            {
+                "contains": f"%{escaped}%",
+                "prefix": f"{escaped}%",
+                "limit": limit,
+            },
+        )
+        return _fetch_list(cur, record_type)
 
 
-def get_users_by_status(status: str) -> List[Dict[str, Any]]:
-    """Get users by status (Aktif/Pasif)"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+def get_users_by_status(
+    status: str, records=False, columns: Optional[Sequence[str]] = None
+) -> List[Union[Dict[str, Any], User]]:
+    """Get users by status (Aktif/Pasif), newest first; rows as in get_all_users()"""
+    select, record_type = _projection(
+        USER_LIST_COLUMNS, User, records, columns or _USER_FIELDS
+    )
+    with db_connection() as conn, _list_cursor(conn, records) as cur:
         cur.execute(
-            """SELECT u.*, p.name as program_name 
-               FROM users u 
-               LEFT JOIN programs p ON u.current_program_id = p.id 
-               WHERE u.status = %s 
+            f"""SELECT {select}
+               {_USER_LIST_FROM}
+               WHERE u.status = %s
                ORDER BY u.created_at DESC""",
             (status,),
         )
-        return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        conn.close()
+        return _fetch_list(cur, record_type)
 
 
 def create_user(
@@ -158,12 +376,10 @@ def create_user(
     current_program_id: Optional[int] = None,
 ) -> int:
     """Create a new user. Returns the new user ID"""
-    conn = get_db_connection()
     email = (email or "").strip()
     if email == "":
         email = None
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute(
             """INSERT INTO users (first_name, last_name, email, password, phone, 
                gender, tc_number, status, birth_date, current_program_id) 
@@ -185,9 +401,6 @@ def create_user(
         user_id = cur.fetchone()["id"]
         conn.commit()
         return user_id
-    finally:
-        cur.close()
-        conn.close()
 
 
 def update_user(
@@ -204,9 +417,7 @@ def update_user(
     current_program_id: Optional[int] = None,
 ) -> bool:
     """Update user fields. Only provided fields will be updated"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
 
         updates = []
         values = []
@@ -250,16 +461,11 @@ def update_user(
         cur.execute(query, values)
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 def delete_user(user_id: int) -> bool:
     """Delete a user by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("DELETE FROM users WHERE id = %s", (user_id,))
         
         # Reset ID sequence to current max ID
@@ -268,9 +474,6 @@ def delete_user(user_id: int) -> bool:
         
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 # ==================== PROGRAMS ====================
@@ -278,34 +481,22 @@ def delete_user(user_id: int) -> bool:
 
 def get_program(program_id: int) -> Optional[Dict[str, Any]]:
     """Get a single program by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM programs WHERE id = %s", (program_id,))
         result = cur.fetchone()
         return dict(result) if result else None
-    finally:
-        cur.close()
-        conn.close()
 
 
 def get_all_programs() -> List[Dict[str, Any]]:
     """Get all programs"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM programs ORDER BY name")
         return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        conn.close()
 
 
 def create_program(name: str, description: str) -> int:
     """Create a new program. Returns the new program ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute(
             "INSERT INTO programs (name, description) VALUES (%s, %s) RETURNING id",
             (name, description),
@@ -313,18 +504,13 @@ def create_program(name: str, description: str) -> int:
         program_id = cur.fetchone()["id"]
         conn.commit()
         return program_id
-    finally:
-        cur.close()
-        conn.close()
 
 
 def update_program(
     program_id: int, name: Optional[str] = None, description: Optional[str] = None
 ) -> bool:
     """Update program fields"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         updates = []
         values = []
 
@@ -343,22 +529,14 @@ def update_program(
         cur.execute(query, values)
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 def delete_program(program_id: int) -> bool:
     """Delete a program by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("DELETE FROM programs WHERE id = %s", (program_id,))
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 # ==================== EXERCISES ====================
@@ -366,34 +544,22 @@ def delete_program(program_id: int) -> bool:
 
 def get_exercise(exercise_id: int) -> Optional[Dict[str, Any]]:
     """Get a single exercise by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM exercises WHERE id = %s", (exercise_id,))
         result = cur.fetchone()
         return dict(result) if result else None
-    finally:
-        cur.close()
-        conn.close()
 
 
 def get_all_exercises() -> List[Dict[str, Any]]:
     """Get all exercises"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM exercises ORDER BY name")
         return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        conn.close()
 
 
 def create_exercise(name: str) -> int:
     """Create a new exercise. Returns the new exercise ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         # First check if exists
         cur.execute("SELECT id FROM exercises WHERE name = %s", (name,))
         existing = cur.fetchone()
@@ -404,35 +570,22 @@ def create_exercise(name: str) -> int:
         exercise_id = cur.fetchone()["id"]
         conn.commit()
         return exercise_id
-    finally:
-        cur.close()
-        conn.close()
 
 
 def update_exercise(exercise_id: int, name: str) -> bool:
     """Update exercise name"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("UPDATE exercises SET name = %s WHERE id = %s", (name, exercise_id))
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 def delete_exercise(exercise_id: int) -> bool:
     """Delete an exercise by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("DELETE FROM exercises WHERE id = %s", (exercise_id,))
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 # ==================== PROGRAM EXERCISES ====================
@@ -440,9 +593,7 @@ def delete_exercise(exercise_id: int) -> bool:
 
 def get_program_exercises(program_id: int) -> List[Dict[str, Any]]:
     """Get all exercises for a program"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute(
             """SELECT pe.*, e.name as exercise_name 
                FROM program_exercises pe 
@@ -452,18 +603,13 @@ def get_program_exercises(program_id: int) -> List[Dict[str, Any]]:
             (program_id,),
         )
         return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        conn.close()
 
 
 def add_exercise_to_program(
     program_id: int, exercise_id: int, sets: int, reps: int
 ) -> int:
     """Add an exercise to a program. Returns the new program_exercise ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute(
             """INSERT INTO program_exercises (program_id, exercise_id, sets, reps) 
                VALUES (%s, %s, %s, %s) RETURNING id""",
@@ -472,18 +618,13 @@ def add_exercise_to_program(
         pe_id = cur.fetchone()["id"]
         conn.commit()
         return pe_id
-    finally:
-        cur.close()
-        conn.close()
 
 
 def update_program_exercise(
     program_exercise_id: int, sets: Optional[int] = None, reps: Optional[int] = None
 ) -> bool:
     """Update program exercise sets/reps"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         updates = []
         values = []
 
@@ -502,37 +643,24 @@ def update_program_exercise(
         cur.execute(query, values)
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 def remove_exercise_from_program(program_exercise_id: int) -> bool:
     """Remove an exercise from a program"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute(
             "DELETE FROM program_exercises WHERE id = %s", (program_exercise_id,)
         )
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 def delete_program_exercises(program_id: int) -> bool:
     """Delete all exercises for a program"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("DELETE FROM program_exercises WHERE program_id = %s", (program_id,))
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 # ==================== PACKAGES ====================
@@ -540,36 +668,33 @@ def delete_program_exercises(program_id: int) -> bool:
 
 def get_package(package_id: int) -> Optional[Dict[str, Any]]:
     """Get a single package by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM packages WHERE id = %s", (package_id,))
+    with db_connection() as conn, conn.cursor() as cur:
+        execute_prepared(
+            cur,
+            "get_package",
+            """SELECT id, name, duration_days, description, price, created_at
+               FROM packages WHERE id = %s""",
+            (package_id,),
+        )
         result = cur.fetchone()
         return dict(result) if result else None
-    finally:
-        cur.close()
-        conn.close()
 
 
-def get_all_packages() -> List[Dict[str, Any]]:
-    """Get all packages"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM packages ORDER BY duration_days")
-        return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        conn.close()
+def get_all_packages(records: bool = False) -> List[Union[Dict[str, Any], Package]]:
+    """Get all packages. records=True returns records.Package tuples"""
+    with db_connection() as conn, _list_cursor(conn, records) as cur:
+        cur.execute(
+            """SELECT id, name, duration_days, description, price
+               FROM packages ORDER BY duration_days"""
+        )
+        return _fetch_list(cur, Package if records else None)
 
 
 def create_package(
     name: str, duration_days: int, description: str, price: float
 ) -> int:
     """Create a new package. Returns the new package ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute(
             """INSERT INTO packages (name, duration_days, description, price) 
                VALUES (%s, %s, %s, %s) RETURNING id""",
@@ -578,9 +703,6 @@ def create_package(
         package_id = cur.fetchone()["id"]
         conn.commit()
         return package_id
-    finally:
-        cur.close()
-        conn.close()
 
 
 def update_package(
@@ -591,9 +713,7 @@ def update_package(
     price: Optional[float] = None,
 ) -> bool:
     """Update package fields"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         updates = []
         values = []
 
@@ -618,22 +738,14 @@ def update_package(
         cur.execute(query, values)
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 def delete_package(package_id: int) -> bool:
     """Delete a package by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("DELETE FROM packages WHERE id = %s", (package_id,))
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 # ==================== SUBSCRIPTIONS ====================
@@ -641,9 +753,7 @@ def delete_package(package_id: int) -> bool:
 
 def get_subscription(subscription_id: int) -> Optional[Dict[str, Any]]:
     """Get a single subscription by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute(
             """SELECT s.*, u.first_name, u.last_name, p.name as package_name, 
                pt.name as payment_type_name 
@@ -656,36 +766,159 @@ def get_subscription(subscription_id: int) -> Optional[Dict[str, Any]]:
         )
         result = cur.fetchone()
         return dict(result) if result else None
-    finally:
-        cur.close()
-        conn.close()
 
 
-def get_all_subscriptions() -> List[Dict[str, Any]]:
-    """Get all subscriptions"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+# Payment list rows: subscription with member, package and payment type
+_SUBSCRIPTION_LIST_FROM = """FROM subscriptions s
+               JOIN users u ON s.user_id = u.id
+               JOIN packages p ON s.package_id = p.id
+               JOIN payment_types pt ON s.payment_type_id = pt.id"""
+
+# Columns the subscription list functions can project (field name -> expression)
+SUBSCRIPTION_LIST_COLUMNS = {
+    "id": "s.id",
+    "user_id": "s.user_id",
+    "package_id": "s.package_id",
+    "start_date": "s.start_date",
+    "end_date": "s.end_date",
+    "price_sold": "s.price_sold",
+    "created_at": "s.created_at",
+    "payment_type_id": "s.payment_type_id",
+    "first_name": "u.first_name",
+    "last_name": "u.last_name",
+    "package_name": "p.name",
+    "payment_type_name": "pt.name",
+}
+
+
+def get_all_subscriptions(
+    records=False, columns: Optional[Sequence[str]] = None
+) -> List[Union[Dict[str, Any], Subscription]]:
+    """
+    Get all subscriptions, newest first. records=True returns
+    records.Subscription tuples, a record class (e.g. records.PaymentRow)
+    only its fields; `columns` (keys of SUBSCRIPTION_LIST_COLUMNS) narrows
+    dict rows.
+    """
+    select, record_type = _projection(SUBSCRIPTION_LIST_COLUMNS, Subscription, records, columns)
+    with db_connection() as conn, _list_cursor(conn, records) as cur:
         cur.execute(
-            """SELECT s.*, u.first_name, u.last_name, p.name as package_name, 
-               pt.name as payment_type_name 
-               FROM subscriptions s 
-               JOIN users u ON s.user_id = u.id 
-               JOIN packages p ON s.package_id = p.id 
-               JOIN payment_types pt ON s.payment_type_id = pt.id 
+            f"""SELECT {select}
+               {_SUBSCRIPTION_LIST_FROM}
                ORDER BY s.created_at DESC"""
         )
-        return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        conn.close()
+        return _fetch_list(cur, record_type)
+
+
+# Sort keys accepted by get_subscriptions_page (never interpolate user input)
+SUBSCRIPTION_SORT_COLUMNS = {
+    "id": ["s.id"],
+    "member": ["u.first_name", "u.last_name"],
+    "price": ["s.price_sold"],
+    "created_at": ["s.created_at"],
+    "payment_type": ["pt.name"],
+    "package": ["p.name"],
+}
+
+
+def _subscription_filters(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    payment_type_id: Optional[int] = None,
+    member_name: Optional[str] = None,
+) -> tuple[str, Dict[str, Any]]:
+    """
+    WHERE clause and parameters shared by the subscription list and summary.
+    Dates filter the payment date (created_at) and are inclusive days,
+    applied as a half-open range so the created_at index is used.
+    """
+    conditions = []
+    params: Dict[str, Any] = {}
+    if start_date is not None:
+        conditions.append("s.created_at >= %(start_date)s")
+        params["start_date"] = start_date
+    if end_date is not None:
+        conditions.append("s.created_at < %(end_date)s::date + 1")
+        params["end_date"] = end_date
+    if payment_type_id is not None:
+        conditions.append("s.payment_type_id = %(payment_type_id)s")
+        params["payment_type_id"] = payment_type_id
+    member_name = (member_name or "").strip()
+    if member_name:
+        conditions.append("(u.first_name || ' ' || u.last_name) ILIKE %(member_name)s")
+        params["member_name"] = f"%{_like_escape(member_name)}%"
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, params
+
+
+def get_subscriptions_page(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    payment_type_id: Optional[int] = None,
+    member_name: Optional[str] = None,
+    order_by: str = "created_at",
+    descending: bool = True,
+    limit: int = 100,
+    offset: int = 0,
+    records=False,
+    columns: Optional[Sequence[str]] = None,
+) -> List[Union[Dict[str, Any], Subscription]]:
+    """
+    One page of subscriptions (payments) matching the filters, sorted on the
+    server. order_by is a key of SUBSCRIPTION_SORT_COLUMNS; ties are broken by
+    id. Rows (and records/columns) as in get_all_subscriptions().
+    """
+    if order_by not in SUBSCRIPTION_SORT_COLUMNS:
+        raise ValueError(f"Unknown sort column: {order_by}")
+    direction = "DESC" if descending else "ASC"
+    order = ", ".join(
+        f"{column} {direction}" for column in SUBSCRIPTION_SORT_COLUMNS[order_by] + ["s.id"]
+    )
+    select, record_type = _projection(SUBSCRIPTION_LIST_COLUMNS, Subscription, records, columns)
+    where, params = _subscription_filters(start_date, end_date, payment_type_id, member_name)
+    params.update(limit=limit, offset=offset)
+
+    with db_connection() as conn, _list_cursor(conn, records) as cur:
+        cur.execute(
+            f"""SELECT {select}
+               {_SUBSCRIPTION_LIST_FROM}
+               {where}
+               ORDER BY {order}
+               LIMIT %(limit)s OFFSET %(offset)s""",
+            params,
+        )
+        return _fetch_list(cur, record_type)
+
+
+def get_subscriptions_summary(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    payment_type_id: Optional[int] = None,
+    member_name: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Count and total revenue of the subscriptions matching the same filters
+    as get_subscriptions_page(): {count, total_revenue}
+    """
+    where, params = _subscription_filters(start_date, end_date, payment_type_id, member_name)
+    # users is only needed for the name filter
+    join = "JOIN users u ON s.user_id = u.id" if "member_name" in params else ""
+
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""SELECT COUNT(*) as count,
+                      COALESCE(SUM(s.price_sold), 0) as total_revenue
+               FROM subscriptions s
+               {join}
+               {where}""",
+            params,
+        )
+        return dict(cur.fetchone())
 
 
 def get_user_subscriptions(user_id: int) -> List[Dict[str, Any]]:
     """Get all subscriptions for a user"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute(
             """SELECT s.*, p.name as package_name, pt.name as payment_type_name 
                FROM subscriptions s 
@@ -696,9 +929,61 @@ def get_user_subscriptions(user_id: int) -> List[Dict[str, Any]]:
             (user_id,),
         )
         return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        conn.close()
+
+
+def _refresh_current_subscription(cur, user_id: Optional[int] = None) -> int:
+    """
+    Point users.current_subscription_id / active_until at each member's most
+    recently started subscription (NULL if none), inside the caller's
+    transaction. The status follows the new current subscription: 'Aktif'
+    while it has not ended (renewal), 'Pasif' once it has ended or when the
+    member has none left (e.g. the latest one was deleted); status changes
+    are recorded like the ones expire_memberships() makes. Members whose
+    pointer does not move keep their status. Only `user_id` is refreshed if given,
+    otherwise every member (set-based repair after bulk loads).
+    Returns the number of users changed.
+    """
+    cur.execute(
+        """WITH changed AS (
+           UPDATE users u
+           SET current_subscription_id = ls.id,
+               active_until = ls.end_date,
+               status = CASE WHEN ls.end_date >= LOCALTIMESTAMP
+                             THEN 'Aktif' ELSE 'Pasif' END::status_enum
+           FROM users u2
+           LEFT JOIN LATERAL (
+               SELECT s.id, s.end_date
+               FROM subscriptions s
+               WHERE s.user_id = u2.id
+               ORDER BY s.start_date DESC, s.id DESC
+               LIMIT 1
+           ) ls ON TRUE
+           WHERE u.id = u2.id
+             AND (%(user_id)s::int IS NULL OR u2.id = %(user_id)s)
+             AND (u.current_subscription_id IS DISTINCT FROM ls.id
+                  OR u.active_until IS DISTINCT FROM ls.end_date)
+           RETURNING u.id, u2.status as old_status, u.status as new_status
+           ),
+           logged AS (
+               INSERT INTO user_status_changes (user_id, old_status, new_status)
+               SELECT id, old_status, new_status FROM changed
+               WHERE old_status <> new_status
+           )
+           SELECT COUNT(*) as changed FROM changed""",
+        {"user_id": user_id},
+    )
+    return cur.fetchone()["changed"]
+
+
+def refresh_current_subscriptions() -> int:
+    """
+    Recompute the current subscription pointer of every member (for data
+    written outside this module, e.g. bulk seeding). Returns users changed.
+    """
+    with db_connection() as conn, conn.cursor() as cur:
+        changed = _refresh_current_subscription(cur)
+        conn.commit()
+        return changed
 
 
 def create_subscription(
@@ -710,23 +995,20 @@ def create_subscription(
     payment_type_id: int,
 ) -> int:
     """Create a new subscription. Returns the new subscription ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         _ensure_payment_type_exists(cur, payment_type_id)
         
         cur.execute(
             """INSERT INTO subscriptions (user_id, package_id, start_date, end_date, 
                price_sold, payment_type_id) 
-               VALUES (%s, %s, %s, %s, %s, %s) RETURNING id""",
+               VALUES (%s, %s, %s, %s, %s, %s) RETURNING id, created_at::date as day""",
             (user_id, package_id, start_date, end_date, price_sold, payment_type_id),
         )
-        subscription_id = cur.fetchone()["id"]
+        row = cur.fetchone()
+        _refresh_current_subscription(cur, user_id)
+        _refresh_revenue_days(cur, row["day"], row["day"])
         conn.commit()
-        return subscription_id
-    finally:
-        cur.close()
-        conn.close()
+        return row["id"]
 
 def _ensure_payment_type_exists(cur, type_id: int):
     """Ensure the specific payment type exists, insert if missing"""
@@ -759,9 +1041,7 @@ def update_subscription(
     payment_type_id: Optional[int] = None,
 ) -> bool:
     """Update subscription fields"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         updates = []
         values = []
 
@@ -782,26 +1062,238 @@ def update_subscription(
             return False
 
         values.append(subscription_id)
-        query = f"UPDATE subscriptions SET {', '.join(updates)} WHERE id = %s"
+        query = (
+            f"UPDATE subscriptions SET {', '.join(updates)} WHERE id = %s "
+            "RETURNING user_id, created_at::date as day"
+        )
         cur.execute(query, values)
+        row = cur.fetchone()
+        if row:
+            _refresh_current_subscription(cur, row["user_id"])
+            _refresh_revenue_days(cur, row["day"], row["day"])
         conn.commit()
-        return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
+        return row is not None
 
 
 def delete_subscription(subscription_id: int) -> bool:
     """Delete a subscription by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM subscriptions WHERE id = %s", (subscription_id,))
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "DELETE FROM subscriptions WHERE id = %s "
+            "RETURNING user_id, created_at::date as day",
+            (subscription_id,),
+        )
+        row = cur.fetchone()
+        if row:
+            _refresh_current_subscription(cur, row["user_id"])
+            _refresh_revenue_days(cur, row["day"], row["day"])
         conn.commit()
-        return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
+        return row is not None
+
+
+# ==================== MEMBERSHIP EXPIRY ====================
+
+
+def expire_memberships() -> List[Dict[str, Any]]:
+    """
+    Mark every 'Aktif' member whose current subscription has ended
+    (active_until in the past) or who has no subscription at all
+    (active_until NULL) as 'Pasif' in one set-based UPDATE and record
+    each change in user_status_changes. Idempotent: a second run (or a concurrent one from
+    another terminal) finds nothing left to change.
+    Returns the changed members as {user_id, changed_at} rows.
+    """
+    with db_connection() as conn, conn.cursor() as cur:
+        # An UPDATE fires the (statement level) users change trigger even when
+        # it matches no rows; skip it so idle sweeps don't wake every terminal.
+        cur.execute(
+            """SELECT EXISTS (
+                   SELECT 1 FROM users
+                   WHERE status = 'Aktif'
+                     AND (active_until < LOCALTIMESTAMP OR active_until IS NULL)
+               ) as due"""
+        )
+        if not cur.fetchone()["due"]:
+            return []
+
+        cur.execute(
+            """WITH expired AS (
+                   UPDATE users SET status = 'Pasif'
+                   WHERE status = 'Aktif'
+                     AND (active_until < LOCALTIMESTAMP OR active_until IS NULL)
+                   RETURNING id
+               )
+               INSERT INTO user_status_changes (user_id, old_status, new_status)
+               SELECT id, 'Aktif', 'Pasif' FROM expired
+               RETURNING user_id, changed_at"""
+        )
+        changed = [dict(row) for row in cur.fetchall()]
+        conn.commit()
+        return changed
+
+
+def get_status_changes(
+    since: Optional[datetime] = None, limit: int = 100
+) -> List[Dict[str, Any]]:
+    """Recorded member status changes, newest first (optionally since a time)"""
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """SELECT sc.*, u.first_name, u.last_name
+               FROM user_status_changes sc
+               JOIN users u ON sc.user_id = u.id
+               WHERE (%(since)s::timestamp IS NULL OR sc.changed_at >= %(since)s)
+               ORDER BY sc.changed_at DESC, sc.id DESC
+               LIMIT %(limit)s""",
+            {"since": since, "limit": limit},
+        )
+        return [dict(row) for row in cur.fetchall()]
+
+
+# ==================== REVENUE REPORTS ====================
+# Reports read the revenue_daily rollup (day x package x payment type)
+# instead of scanning subscriptions. Subscriptions written through this
+# module refresh their day immediately; refresh_revenue_rollups() repairs
+# anything changed elsewhere (run it from cron, see database/revenue_rollups.py).
+
+
+# Advisory lock class of revenue_daily refreshes; key 0 is the whole table,
+# a day is keyed by its ordinal (see _refresh_revenue_days)
+_REVENUE_LOCK = 7301
+
+
+def _refresh_revenue_days(
+    cur, start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> int:
+    """
+    Recompute revenue_daily for the days in [start_date, end_date] (open ends
+    mean unbounded) inside the caller's transaction. Returns rows written.
+
+    Refreshes of the same day are serialized with a transaction-level
+    advisory lock: the second one waits for the first to commit and then
+    recomputes from its committed rows, instead of overwriting the day with
+    a count that misses them. Range refreshes lock out all day refreshes.
+    """
+    if start_date is not None and start_date == end_date:
+        cur.execute(
+            "SELECT pg_advisory_xact_lock_shared(%(cls)s, 0),"
+            " pg_advisory_xact_lock(%(cls)s, %(day)s)",
+            {"cls": _REVENUE_LOCK, "day": start_date.toordinal()},
+        )
+    else:
+        cur.execute("SELECT pg_advisory_xact_lock(%s, 0)", (_REVENUE_LOCK,))
+    params = {"start_date": start_date, "end_date": end_date}
+    cur.execute(
+        """DELETE FROM revenue_daily
+           WHERE (%(start_date)s::date IS NULL OR day >= %(start_date)s)
+             AND (%(end_date)s::date IS NULL OR day <= %(end_date)s)""",
+        params,
+    )
+    cur.execute(
+        """INSERT INTO revenue_daily
+               (day, package_id, payment_type_id, subscription_count, revenue)
+           SELECT created_at::date, package_id, payment_type_id,
+                  COUNT(*), SUM(price_sold)
+           FROM subscriptions
+           WHERE (%(start_date)s::date IS NULL OR created_at >= %(start_date)s)
+             AND (%(end_date)s::date IS NULL OR created_at < %(end_date)s::date + 1)
+           GROUP BY 1, 2, 3
+           ON CONFLICT (day, package_id, payment_type_id) DO UPDATE
+               SET subscription_count = EXCLUDED.subscription_count,
+                   revenue = EXCLUDED.revenue""",
+        params,
+    )
+    return cur.rowcount
+
+
+def refresh_revenue_rollups(
+    start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> int:
+    """
+    Rebuild the revenue rollup for a day range (the whole history if no
+    dates are given). Returns the number of rollup rows written.
+    """
+    with db_connection() as conn, conn.cursor() as cur:
+        written = _refresh_revenue_days(cur, start_date, end_date)
+        conn.commit()
+        return written
+
+
+# Inclusive day range filter shared by the report readers
+_ROLLUP_RANGE = """(%(start_date)s::date IS NULL OR r.day >= %(start_date)s)
+                AND (%(end_date)s::date IS NULL OR r.day <= %(end_date)s)"""
+
+
+def get_daily_revenue(
+    start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """Revenue per day: [{day, subscription_count, revenue}, ...] oldest first"""
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""SELECT r.day, SUM(r.subscription_count)::int as subscription_count,
+                       SUM(r.revenue) as revenue
+                FROM revenue_daily r
+                WHERE {_ROLLUP_RANGE}
+                GROUP BY r.day
+                ORDER BY r.day""",
+            {"start_date": start_date, "end_date": end_date},
+        )
+        return [dict(row) for row in cur.fetchall()]
+
+
+def get_monthly_revenue(
+    start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """Revenue per month: [{month, subscription_count, revenue}, ...] oldest first"""
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""SELECT date_trunc('month', r.day)::date as month,
+                       SUM(r.subscription_count)::int as subscription_count,
+                       SUM(r.revenue) as revenue
+                FROM revenue_daily r
+                WHERE {_ROLLUP_RANGE}
+                GROUP BY 1
+                ORDER BY 1""",
+            {"start_date": start_date, "end_date": end_date},
+        )
+        return [dict(row) for row in cur.fetchall()]
+
+
+def get_revenue_by_package(
+    start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """Revenue per package: [{package_id, package_name, subscription_count, revenue}, ...]"""
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""SELECT r.package_id, p.name as package_name,
+                       SUM(r.subscription_count)::int as subscription_count,
+                       SUM(r.revenue) as revenue
+                FROM revenue_daily r
+                LEFT JOIN packages p ON r.package_id = p.id
+                WHERE {_ROLLUP_RANGE}
+                GROUP BY r.package_id, p.name
+                ORDER BY revenue DESC""",
+            {"start_date": start_date, "end_date": end_date},
+        )
+        return [dict(row) for row in cur.fetchall()]
+
+
+def get_revenue_by_payment_type(
+    start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """Revenue per payment type: [{payment_type_id, payment_type_name, subscription_count, revenue}, ...]"""
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""SELECT r.payment_type_id, pt.name as payment_type_name,
+                       SUM(r.subscription_count)::int as subscription_count,
+                       SUM(r.revenue) as revenue
+                FROM revenue_daily r
+                LEFT JOIN payment_types pt ON r.payment_type_id = pt.id
+                WHERE {_ROLLUP_RANGE}
+                GROUP BY r.payment_type_id, pt.name
+                ORDER BY revenue DESC""",
+            {"start_date": start_date, "end_date": end_date},
+        )
+        return [dict(row) for row in cur.fetchall()]
 
 
 # ==================== PAYMENT TYPES ====================
@@ -809,27 +1301,17 @@ def delete_subscription(subscription_id: int) -> bool:
 
 def get_payment_type(payment_type_id: int) -> Optional[Dict[str, Any]]:
     """Get a single payment type by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM payment_types WHERE id = %s", (payment_type_id,))
         result = cur.fetchone()
         return dict(result) if result else None
-    finally:
-        cur.close()
-        conn.close()
 
 
 def get_all_payment_types() -> List[Dict[str, Any]]:
     """Get all payment types"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM payment_types ORDER BY name")
         return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        conn.close()
 
 
 # ==================== COACHES ====================
@@ -837,35 +1319,23 @@ def get_all_payment_types() -> List[Dict[str, Any]]:
 
 def get_coach(coach_id: int) -> Optional[Dict[str, Any]]:
     """Get a single coach by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM coaches WHERE id = %s", (coach_id,))
         result = cur.fetchone()
         return dict(result) if result else None
-    finally:
-        cur.close()
-        conn.close()
 
 
 def get_coach_by_username(username: str) -> Optional[Dict[str, Any]]:
     """Get a coach by username"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM coaches WHERE username = %s", (username,))
         result = cur.fetchone()
         return dict(result) if result else None
-    finally:
-        cur.close()
-        conn.close()
 
 
 def create_coach(username: str, email: str, password_hash: str) -> int:
     """Create a new coach"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute(
             "INSERT INTO coaches (username, email, password) VALUES (%s, %s, %s) RETURNING id",
             (username, email, password_hash),
@@ -873,65 +1343,276 @@ def create_coach(username: str, email: str, password_hash: str) -> int:
         coach_id = cur.fetchone()["id"]
         conn.commit()
         return coach_id
-    finally:
-        cur.close()
-        conn.close()
 
 
 # ==================== ACCESS LOGS ====================
 
 
-def ensure_access_log_table():
-    """Create access_logs table if not exists"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+# NOTIFY channels fed by triggers (see migration 11b803d87400)
+ACCESS_LOG_CHANNEL = "access_logs"  # one JSON payload per inserted log row
+CHANGE_CHANNEL = "gym_changes"  # {"table": ..., "op": ...} per users/subscriptions statement
+
+# access_logs is range-partitioned by month on created_at (access_logs_YYYY_MM);
+# rows outside every monthly range land in the DEFAULT partition
+ACCESS_LOG_MONTHS_AHEAD = 2
+ACCESS_LOG_DEFAULT_PARTITION = "access_logs_default"
+
+# Same function and trigger as migration 11b803d87400, for databases whose
+# access_logs table was created by ensure_access_log_table()
+_ACCESS_LOG_NOTIFY_DDL = """
+CREATE OR REPLACE FUNCTION notify_access_log() RETURNS trigger AS $$
+DECLARE
+    payload TEXT;
+BEGIN
+    SELECT json_build_object(
+               'id', NEW.id,
+               'user_id', NEW.user_id,
+               'action_type', NEW.action_type,
+               'created_at', NEW.created_at,
+               'first_name', u.first_name,
+               'last_name', u.last_name,
+               'program_name', p.name
+           )::text
+      INTO payload
+      FROM users u
+      LEFT JOIN programs p ON u.current_program_id = p.id
+     WHERE u.id = NEW.user_id;
+    PERFORM pg_notify('access_logs', payload);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER access_logs_notify
+    AFTER INSERT ON access_logs
+    FOR EACH ROW EXECUTE FUNCTION notify_access_log();
+"""
+
+
+def _add_months(month: date, months: int) -> date:
+    """First day of the month `months` after the month of `month`"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _access_log_partition_name(month: date) -> str:
+    return f"access_logs_{month:%Y_%m}"
+
+
+def _get_access_log_partitions(cur) -> Dict[str, date]:
+    """Attached monthly partitions of access_logs as {name: month start}"""
+    cur.execute(
+        """SELECT c.relname as name
+           FROM pg_inherits i
+           JOIN pg_class c ON c.oid = i.inhrelid
+           WHERE i.inhparent = 'access_logs'::regclass"""
+    )
+    partitions = {}
+    for row in cur.fetchall():
+        match = re.fullmatch(r"access_logs_(\d{4})_(\d{2})", row["name"])
+        if match:
+            partitions[row["name"]] = date(int(match[1]), int(match[2]), 1)
+    return partitions
+
+
+def _create_access_log_partitions(
+    cur, months_ahead: int, months_back: int = 0
+) -> List[str]:
+    """
+    Create missing partitions for this month, the next `months_ahead` and
+    the previous `months_back` months
+    """
+    existing = _get_access_log_partitions(cur)
+    cur.execute(
+        "SELECT to_regclass(%s) IS NOT NULL as found", (ACCESS_LOG_DEFAULT_PARTITION,)
+    )
+    has_default = cur.fetchone()["found"]
+    this_month = date.today().replace(day=1)
+    created = []
+    for offset in range(-months_back, months_ahead + 1):
+        month = _add_months(this_month, offset)
+        name = _access_log_partition_name(month)
+        if name in existing:
+            continue
+        # Partition names and bounds are generated here, never user input
+        bounds = f"FROM ('{month}') TO ('{_add_months(month, 1)}')"
+        in_range = f"created_at >= '{month}' AND created_at < '{_add_months(month, 1)}'"
+        if has_default:
+            cur.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {ACCESS_LOG_DEFAULT_PARTITION} WHERE {in_range}) as found"
+            )
+            if cur.fetchone()["found"]:
+                # Rows of this month already sit in the DEFAULT partition:
+                # move them into a standalone table first, then attach it
+                # (a plain PARTITION OF would fail on the overlapping rows)
+                cur.execute(
+                    f"""CREATE TABLE {name}
+                            (LIKE access_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+                        WITH moved AS (
+                            DELETE FROM {ACCESS_LOG_DEFAULT_PARTITION}
+                            WHERE {in_range}
+                            RETURNING *
+                        )
+                        INSERT INTO {name} SELECT * FROM moved;
+                        ALTER TABLE access_logs ATTACH PARTITION {name} FOR VALUES {bounds}"""
+                )
+                created.append(name)
+                continue
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF access_logs FOR VALUES {bounds}"
+        )
+        created.append(name)
+    return created
+
+
+def ensure_access_log_table(
+    months_ahead: int = ACCESS_LOG_MONTHS_AHEAD, months_back: int = 0
+) -> List[str]:
+    """
+    Create the partitioned access_logs table if not exists and make sure
+    partitions exist for this month and the next `months_ahead` months
+    (and the past `months_back` months, e.g. before loading history).
+    Also makes sure the DEFAULT partition and the access_logs_notify trigger
+    exist, so rows never fail for lack of a partition and tables bootstrapped
+    here behave like migrated ones.
+    Only catalog lookups run when everything is already in place.
+    Returns the names of the partitions that were created.
+    """
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """SELECT c.relkind,
+                      EXISTS (SELECT 1 FROM pg_trigger t
+                              WHERE t.tgrelid = c.oid
+                                AND t.tgname = 'access_logs_notify') as has_notify
+               FROM pg_class c WHERE c.oid = to_regclass('access_logs')"""
+        )
+        result = cur.fetchone()
+        if result is None:
+            cur.execute(
+                """CREATE TABLE access_logs (
+                    id SERIAL,
+                    user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                    action_type VARCHAR(20) NOT NULL, -- 'GİRİŞ' or 'ÇIKIŞ'
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (id, created_at)
+                ) PARTITION BY RANGE (created_at);
+                CREATE INDEX ix_access_logs_created_at
+                    ON access_logs (created_at);
+                CREATE INDEX ix_access_logs_user_created
+                    ON access_logs (user_id, created_at DESC) INCLUDE (action_type)"""
+            )
+        elif result["relkind"] != "p":
+            # Old unpartitioned table: run the Alembic migration to convert it
+            return []
+
+        if result is None or not result["has_notify"]:
+            cur.execute(_ACCESS_LOG_NOTIFY_DDL)
         cur.execute(
-            """CREATE TABLE IF NOT EXISTS access_logs (
-                id SERIAL PRIMARY KEY,
-                user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                action_type VARCHAR(20) NOT NULL, -- 'GİRİŞ' or 'ÇIKIŞ'
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )"""
+            f"""CREATE TABLE IF NOT EXISTS {ACCESS_LOG_DEFAULT_PARTITION}
+                PARTITION OF access_logs DEFAULT"""
         )
+        created = _create_access_log_partitions(cur, months_ahead, months_back)
+        conn.commit()
+        return created
+
+
+def maintain_access_log_partitions(
+    months_ahead: int = ACCESS_LOG_MONTHS_AHEAD,
+    retain_months: Optional[int] = None,
+    drop: bool = False,
+) -> Dict[str, List[str]]:
+    """
+    Partition maintenance for access_logs.
+    Pre-creates partitions for the coming `months_ahead` months and, when
+    `retain_months` is given, detaches partitions that ended more than
+    `retain_months` months before the current month. Detached partitions are
+    kept as standalone archive tables unless `drop` is True.
+    Returns {'created': [...], 'detached': [...], 'dropped': [...]}
+    """
+    report = {
+        "created": ensure_access_log_table(months_ahead),
+        "detached": [],
+        "dropped": [],
+    }
+    if retain_months is None:
+        return report
+
+    cutoff = _add_months(date.today().replace(day=1), -retain_months)
+    with db_connection() as conn, conn.cursor() as cur:
+        for name, month in sorted(_get_access_log_partitions(cur).items()):
+            if _add_months(month, 1) > cutoff:
+                continue
+            cur.execute(f"ALTER TABLE access_logs DETACH PARTITION {name}")
+            report["detached"].append(name)
+            if drop:
+                cur.execute(f"DROP TABLE {name}")
+                report["dropped"].append(name)
         conn.commit()
-    finally:
-        cur.close()
-        conn.close()
+    return report
 
 
 def add_access_log(user_id: int, action_type: str) -> bool:
     """Add a new access log"""
-    conn = get_db_connection()
     try:
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO access_logs (user_id, action_type) VALUES (%s, %s)",
-            (user_id, action_type),
-        )
-        conn.commit()
-        return True
+        with db_connection() as conn, conn.cursor() as cur:
+            execute_prepared(
+                cur,
+                "add_access_log",
+                "INSERT INTO access_logs (user_id, action_type) VALUES (%s, %s)",
+                (user_id, action_type),
+            )
+            conn.commit()
+            return True
     except Exception as e:
         print(f"Error adding log: {e}")
         return False
-    finally:
-        cur.close()
-        conn.close()
 
 
-def get_todays_access_logs() -> List[Dict[str, Any]]:
-    """Get access logs for today"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+def add_access_logs(events: List[tuple]) -> int:
+    """
+    Insert many access logs with a single multi-row INSERT.
+    `events` is a list of (user_id, action_type, created_at) tuples; rows are
+    written in list order. Returns the number of inserted rows.
+    """
+    if not events:
+        return 0
+    with db_connection() as conn, conn.cursor() as cur:
+        execute_values(
+            cur,
+            "INSERT INTO access_logs (user_id, action_type, created_at) VALUES %s",
+            events,
+            page_size=len(events),
+        )
+        conn.commit()
+        return len(events)
+
+
+def get_todays_access_logs(
+    limit: Optional[int] = None,
+    records: bool = False,
+) -> List[Union[Dict[str, Any], AccessLog]]:
+    """
+    Get access logs for today, newest first.
+    `limit` caps the number of (newest) rows. records=True returns
+    records.AccessLog tuples (without the preformatted time_str).
+    There is no "newer than id" filter on purpose: ids are taken before
+    commit, so a log can become visible after one with a greater id.
+    Callers that poll dedupe by id instead.
+    """
+    with db_connection() as conn, _list_cursor(conn, records) as cur:
         cur.execute(
-            """SELECT al.*, u.first_name, u.last_name, p.name as program_name 
+            """SELECT al.id, al.user_id, al.action_type, al.created_at,
+                      u.first_name, u.last_name, p.name as program_name 
                FROM access_logs al 
                JOIN users u ON al.user_id = u.id 
                LEFT JOIN programs p ON u.current_program_id = p.id 
-               WHERE DATE(al.created_at) = CURRENT_DATE 
-               ORDER BY al.created_at DESC"""
+               WHERE al.created_at >= CURRENT_DATE 
+                 AND al.created_at < CURRENT_DATE + 1 
+               ORDER BY al.created_at DESC
+               LIMIT %(limit)s""",
+            {"limit": limit},
         )
+        if records:
+            return _fetch_list(cur, AccessLog)
         logs = []
         for row in cur.fetchall():
             log = dict(row)
@@ -940,25 +1621,23 @@ def get_todays_access_logs() -> List[Dict[str, Any]]:
                 log['time_str'] = log['created_at'].strftime("%H:%M:%S")
             logs.append(log)
         return logs
-    finally:
-        cur.close()
-        conn.close()
 
 
 def get_inside_count() -> int:
     """Calculate how many people are currently inside (Entries > Exits today)"""
     # Simple logic: For each user, if last action today was 'GİRİŞ', they are inside.
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         # Subquery finds the latest log_id for each user today
         # We then check if that latest action was 'GİRİŞ'
-        cur.execute(
+        execute_prepared(
+            cur,
+            "get_inside_count",
             """
             SELECT COUNT(*) as count FROM (
                 SELECT DISTINCT ON (user_id) action_type 
                 FROM access_logs 
-                WHERE DATE(created_at) = CURRENT_DATE 
+                WHERE created_at >= CURRENT_DATE 
+                  AND created_at < CURRENT_DATE + 1 
                 ORDER BY user_id, created_at DESC
             ) as latest_actions 
             WHERE action_type = 'GİRİŞ'
@@ -966,41 +1645,83 @@ def get_inside_count() -> int:
         )
         result = cur.fetchone()
         return result['count'] if result else 0
-    finally:
-        cur.close()
-        conn.close()
+
+
+def get_dashboard_stats() -> Dict[str, Any]:
+    """
+    Get all dashboard card numbers in a single round trip:
+    total_members, active_subscriptions (members with an unexpired
+    subscription), package_count, inside_count and todays_revenue
+    """
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            WITH member_stats AS (
+                SELECT COUNT(*) as total_members,
+                       COUNT(*) FILTER (WHERE active_until >= LOCALTIMESTAMP)
+                           as active_subscriptions
+                FROM users
+            ),
+            subscription_stats AS (
+                SELECT COALESCE(SUM(price_sold), 0) as todays_revenue
+                FROM subscriptions
+                WHERE created_at >= CURRENT_DATE AND created_at < CURRENT_DATE + 1
+            ),
+            package_stats AS (
+                SELECT COUNT(*) as package_count FROM packages
+            ),
+            access_stats AS (
+                SELECT COUNT(*) FILTER (WHERE action_type = 'GİRİŞ') as inside_count
+                FROM (
+                    SELECT DISTINCT ON (user_id) action_type 
+                    FROM access_logs 
+                    WHERE created_at >= CURRENT_DATE 
+                      AND created_at < CURRENT_DATE + 1 
+                    ORDER BY user_id, created_at DESC
+                ) as latest_actions
+            )
+            SELECT * FROM member_stats, subscription_stats, package_stats, access_stats
+            """
+        )
+        return dict(cur.fetchone())
+
+
+def get_inside_user_ids() -> List[int]:
+    """Get IDs of users whose last action today was 'GİRİŞ' (currently inside)"""
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT user_id FROM (
+                SELECT DISTINCT ON (user_id) user_id, action_type 
+                FROM access_logs 
+                WHERE created_at >= CURRENT_DATE 
+                  AND created_at < CURRENT_DATE + 1 
+                ORDER BY user_id, created_at DESC
+            ) as latest_actions 
+            WHERE action_type = 'GİRİŞ'
+            """
+        )
+        return [row['user_id'] for row in cur.fetchall()]
 
 
 def get_all_coaches() -> List[Dict[str, Any]]:
     """Get all coaches"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM coaches ORDER BY username")
         return [dict(row) for row in cur.fetchall()]
-    finally:
-        cur.close()
-        conn.close()
 
 
 def get_coach_by_username(username: str) -> Optional[Dict[str, Any]]:
     """Get a coach by username"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM coaches WHERE username = %s", (username,))
         result = cur.fetchone()
         return dict(result) if result else None
-    finally:
-        cur.close()
-        conn.close()
 
 
 def create_coach(username: str, email: str, password: str) -> int:
     """Create a new coach. Returns the new coach ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute(
             "INSERT INTO coaches (username, email, password) VALUES (%s, %s, %s) RETURNING id",
             (username, email, password),
@@ -1008,9 +1729,6 @@ def create_coach(username: str, email: str, password: str) -> int:
         coach_id = cur.fetchone()["id"]
         conn.commit()
         return coach_id
-    finally:
-        cur.close()
-        conn.close()
 
 
 def update_coach(
@@ -1020,9 +1738,7 @@ def update_coach(
     password: Optional[str] = None,
 ) -> bool:
     """Update coach fields"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         updates = []
         values = []
 
@@ -1044,19 +1760,11 @@ def update_coach(
         cur.execute(query, values)
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
 
 
 def delete_coach(coach_id: int) -> bool:
     """Delete a coach by ID"""
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
+    with db_connection() as conn, conn.cursor() as cur:
         cur.execute("DELETE FROM coaches WHERE id = %s", (coach_id,))
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        cur.close()
-        conn.close()
@@ -1,26 +1,463 @@
 import os
+import re
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
 import psycopg2
+from psycopg2 import errors, extensions
+from psycopg2.pool import PoolError
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 
+from database import query_stats
+
 load_dotenv()
 
 
+def _default_cursor_factory():
+    """Statements are timed and counted (database.query_stats) unless PGQUERY_STATS=0"""
+    return query_stats.InstrumentedCursor if query_stats.enabled() else RealDictCursor
+
+
+# Cursor class of every new connection (pooled ones included)
+_cursor_factory = _default_cursor_factory()
+
+
+def set_cursor_factory(factory=None):
+    """
+    Use `factory` (a RealDictCursor subclass) for connections opened from now
+    on, or the default cursor if None. Call it before the pool is first used,
+    or close_pool() so new connections pick it up.
+    """
+    global _cursor_factory
+    _cursor_factory = factory or _default_cursor_factory()
+
+
+def tuple_cursor(conn):
+    """
+    Plain cursor on `conn` whose rows are tuples (instrumented like the
+    default one). For bulk reads where building a dict per row dominates.
+    """
+    if query_stats.enabled():
+        return conn.cursor(cursor_factory=query_stats.InstrumentedTupleCursor)
+    return conn.cursor(cursor_factory=extensions.cursor)
+
+
+def _connection_params():
+    """Connection parameters built from the PG* environment variables"""
+    return dict(
+        host=os.getenv("PGHOST", "localhost"),
+        database=os.getenv("PGDATABASE"),
+        user=os.getenv("PGUSER"),
+        password=os.getenv("PGPASSWORD"),
+        port=os.getenv("PGPORT", 5432),
+        cursor_factory=_cursor_factory,
+        connection_factory=PreparingConnection,
+    )
+
+
 def get_db_connection():
     """
     Creates and returns a connection to the database.
     Returns a psycopg2 connection object.
     """
     try:
-        conn = psycopg2.connect(
-            host=os.getenv("PGHOST", "localhost"),
-            database=os.getenv("PGDATABASE"),
-            user=os.getenv("PGUSER"),
-            password=os.getenv("PGPASSWORD"),
-            port=os.getenv("PGPORT", 5432),
-            cursor_factory=RealDictCursor,
-        )
+        conn = psycopg2.connect(**_connection_params())
         return conn
     except psycopg2.Error as e:
         print(f"Error connecting to database: {e}")
         raise e
+
+
+# ==================== CONNECTION POOL ====================
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool.
+
+    Keeps at least `minconn` connections open and never opens more than
+    `maxconn`. When the pool is exhausted, acquire() waits up to `timeout`
+    seconds for a connection to be released. Connections idle for longer than
+    `check_after` seconds are verified with `SELECT 1` before being handed out;
+    broken ones are dropped and replaced.
+    """
+
+    def __init__(self, minconn=1, maxconn=10, timeout=30.0, check_after=30.0):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Invalid pool size: expected 0 <= minconn <= maxconn, maxconn >= 1")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.check_after = check_after
+
+        self._idle = []  # [(conn, last_used), ...] - LIFO
+        self._opened = 0  # idle + checked out
+        self._cond = threading.Condition()
+        self._closed = False
+
+        for _ in range(minconn):
+            self._idle.append((get_db_connection(), time.monotonic()))
+            self._opened += 1
+
+    def _is_healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - last_used < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _forget(self, conn=None):
+        """Drop a connection from the pool (closing it if given) and wake a waiter"""
+        if conn is not None:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+
+    def acquire(self):
+        """Check out a healthy connection from the pool"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolError("connection pool is closed")
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._opened < self.maxconn:
+                        conn, last_used = None, None
+                        self._opened += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolError(
+                            f"connection pool exhausted ({self.maxconn} connections)"
+                        )
+                    self._cond.wait(remaining)
+
+            # Network round trips happen outside the lock
+            if conn is None:
+                try:
+                    return get_db_connection()
+                except Exception:
+                    self._forget()
+                    raise
+            if self._is_healthy(conn, last_used):
+                return conn
+            self._forget(conn)
+
+    def release(self, conn):
+        """Return a connection to the pool, rolling back any open transaction"""
+        keep = not self._closed and not conn.closed
+        if keep:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                keep = False
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    keep = False
+        if keep and conn.autocommit:
+            conn.autocommit = False
+
+        if not keep:
+            self._forget(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        """Close idle connections now; checked-out ones are closed when released"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use.
+    Sized by PGPOOL_MIN / PGPOOL_MAX; PGPOOL_TIMEOUT is the checkout wait and
+    PGPOOL_CHECK_AFTER the idle time after which a connection is health-checked.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    minconn=int(os.getenv("PGPOOL_MIN", 1)),
+                    maxconn=int(os.getenv("PGPOOL_MAX", 10)),
+                    timeout=float(os.getenv("PGPOOL_TIMEOUT", 30)),
+                    check_after=float(os.getenv("PGPOOL_CHECK_AFTER", 30)),
+                )
+    return _pool
+
+
+def close_pool():
+    """Close the shared pool (call on application shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+@contextmanager
+def db_connection():
+    """
+    Borrow a pooled connection for the duration of a `with` block.
+    The connection is returned to the pool (not closed) on exit and any
+    uncommitted work is rolled back if the block raises.
+
+        with db_connection() as conn:
+            cur = conn.cursor()
+            ...
+            conn.commit()
+
+    Inside a transaction() block the thread's unit-of-work connection is
+    returned instead, and the transaction is left to that block.
+    """
+    shared = getattr(_local, "connection", None)
+    if shared is not None:
+        yield shared
+        return
+
+    pool = get_pool()
+    started = time.perf_counter()
+    conn = pool.acquire()
+    query_stats.record_acquire(time.perf_counter() - started)
+    scope = getattr(_local, "cancel_scope", None)
+    try:
+        if scope is not None:
+            scope._attach(conn)
+        yield conn
+    except Exception:
+        if not conn.closed:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                pass
+        raise
+    finally:
+        if scope is not None and scope._detach(conn):
+            # A cancel request was sent on it and may still reach the backend
+            # later: never hand this session to another caller
+            conn.close()
+        pool.release(conn)
+
+
+# ==================== TRANSACTIONS ====================
+
+
+# The unit-of-work connection of the current thread (see transaction())
+_local = threading.local()
+
+
+@contextmanager
+def transaction():
+    """
+    Unit of work: every db_connection() block this thread opens inside the
+    `with` (so every dao call) runs on one pooled connection, in one
+    transaction. commit() calls made in between are deferred; the work is
+    committed once when the block exits and rolled back as a whole if it
+    raises. A nested transaction() joins the outer one. Yields the
+    connection, for statements of the caller's own.
+
+        with dao.transaction():
+            user_id = dao.create_user(...)
+            dao.create_subscription(user_id, ...)
+
+    Thread-local: run the whole block in one thread (e.g. one AsyncDao job).
+    """
+    shared = getattr(_local, "connection", None)
+    if shared is not None:
+        yield shared
+        return
+
+    with db_connection() as conn:
+        conn.defer_commit = True
+        _local.connection = conn
+        try:
+            yield conn
+        finally:
+            _local.connection = None
+            conn.defer_commit = False
+        if conn.info.transaction_status == extensions.TRANSACTION_STATUS_INERROR:
+            # A statement failed and the caller carried on: COMMIT would
+            # silently roll back, say so instead
+            raise errors.InFailedSqlTransaction(
+                "transaction() block aborted by an earlier error, rolled back"
+            )
+        conn.commit()
+
+
+# ==================== CANCELLATION ====================
+
+
+class CancelScope:
+    """
+    Handle of a cancellable() block. cancel() may be called from any thread:
+    it interrupts the statement currently running on a connection the block
+    has borrowed (the statement fails with QueryCanceled) and makes the
+    block's next db_connection() raise QueryCanceled right away.
+    The cancel request travels separately and may arrive late, so connections
+    it was sent on are closed when released instead of going back to the pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections = []
+        self._cancelled_connections = []
+        self.cancelled = False
+
+    def _attach(self, conn):
+        with self._lock:
+            if self.cancelled:
+                raise errors.QueryCanceled("canceled before the query started")
+            self._connections.append(conn)
+
+    def _detach(self, conn):
+        """Forget `conn`; True if a cancel request was sent on it"""
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+            return any(c is conn for c in self._cancelled_connections)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            for conn in self._connections:
+                if not conn.closed:
+                    # Sends a cancel request to the backend; a no-op when
+                    # the connection is idle between statements
+                    conn.cancel()
+                    self._cancelled_connections.append(conn)
+
+
+@contextmanager
+def cancellable(scope=None):
+    """
+    Run the pooled db_connection() blocks this thread opens inside the
+    `with` under `scope` (a new CancelScope if not given), so another thread
+    can interrupt them with scope.cancel(). Connections shared from an
+    enclosing transaction() are not covered.
+
+        scope = CancelScope()
+        with cancellable(scope):
+            dao.search_users(...)   # scope.cancel() from elsewhere aborts it
+    """
+    scope = scope or CancelScope()
+    previous = getattr(_local, "cancel_scope", None)
+    _local.cancel_scope = scope
+    try:
+        yield scope
+    finally:
+        _local.cancel_scope = previous
+
+
+# ==================== PREPARED STATEMENTS ====================
+
+
+class PreparingConnection(extensions.connection):
+    """
+    Connection that remembers which statements execute_prepared() has
+    PREPAREd on its session. Prepared statements live as long as the
+    session (a ROLLBACK doesn't drop them); a connection opened to replace
+    a broken one starts empty, so statements are prepared again on it.
+    Inside transaction() its commit() is a no-op until the block ends.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+        # Set while the connection runs a transaction() unit of work
+        self.defer_commit = False
+
+    def commit(self):
+        if not self.defer_commit:
+            super().commit()
+
+
+# PGPREPARE=0 runs execute_prepared() statements as plain queries
+_prepare_enabled = os.getenv("PGPREPARE", "1") != "0"
+
+_PLACEHOLDER = re.compile(r"%s")
+
+
+def set_prepared_statements(enabled: bool):
+    """Turn server-side prepared statements on or off at runtime"""
+    global _prepare_enabled
+    _prepare_enabled = enabled
+
+
+def prepared_statements_enabled() -> bool:
+    return _prepare_enabled
+
+
+def execute_prepared(cur, name, sql, params=()):
+    """
+    Run `sql` (positional %s placeholders) with `params` as a server-side
+    prepared statement: PREPAREd once per connection, then only EXECUTEd,
+    so PostgreSQL skips parsing and (once it settles on a generic plan)
+    planning. `name` is a readable prefix; the statement name also carries
+    a checksum of `sql`, so different texts (e.g. projections) never clash.
+    Falls back to a plain execute when disabled or on a connection that
+    wasn't opened by get_db_connection().
+    """
+    prepared = getattr(cur.connection, "prepared_statements", None)
+    if not _prepare_enabled or prepared is None:
+        cur.execute(sql, params)
+        return
+
+    statement = f"{name}_{zlib.crc32(sql.encode()):08x}"
+    if statement not in prepared:
+        numbers = iter(range(1, len(params) + 1))
+        cur.execute(
+            f"PREPARE {statement} AS "
+            + _PLACEHOLDER.sub(lambda _: f"${next(numbers)}", sql)
+        )
+        prepared.add(statement)
+
+    query = f"EXECUTE {statement}"
+    if params:
+        query += f" ({', '.join(['%s'] * len(params))})"
+    # Instrumented cursors record the EXECUTE under `sql`'s fingerprint (the
+    # PREPARE is recorded on its own, as preparation cost)
+    execute_as = getattr(cur, "execute_as", None)
+    try:
+        if execute_as is not None:
+            execute_as(query, params, sql, params)
+        else:
+            cur.execute(query, params)
+    except errors.InvalidSqlStatementName:
+        # Deallocated behind our back (DISCARD ALL, DEALLOCATE): prepare
+        # again on the next call
+        prepared.clear()
+        raise
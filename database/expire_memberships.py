@@ -0,0 +1,34 @@
+"""
+Üyelik süre taraması
+Güncel üyeliği biten 'Aktif' üyeleri 'Pasif' yapar ve değişiklikleri
+user_status_changes tablosuna kaydeder. Tekrar çalıştırmak güvenlidir.
+
+Uygulama açıkken tarama zaten periyodik çalışır; uygulama kapalıyken de
+güncel kalması için proje kök dizininden çalıştırın (cron ile saatte bir):
+    python -m database.expire_memberships
+    python -m database.expire_memberships --verbose
+"""
+
+import argparse
+
+from database import dao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Süresi biten üyelikleri pasife al")
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Pasife alınan üyeleri tek tek listele",
+    )
+    args = parser.parse_args()
+
+    changed = dao.expire_memberships()
+    print(f"✓ Pasife alınan üye: {len(changed)}")
+    if args.verbose:
+        for row in changed:
+            print(f"  - #{row['user_id']} ({row['changed_at']:%Y-%m-%d %H:%M})")
+
+
+if __name__ == "__main__":
+    main()
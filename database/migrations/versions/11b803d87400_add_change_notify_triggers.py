@@ -0,0 +1,83 @@
+"""add change notify triggers
+
+Revision ID: 11b803d87400
+Revises: d12c5ab41e64
+Create Date: 2026-10-18 16:16:46.199857
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '11b803d87400'
+down_revision: Union[str, Sequence[str], None] = 'd12c5ab41e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute(
+        """
+        -- Her turnike logu 'access_logs' kanalına, ekranda gösterilecek
+        -- bilgilerle (üye adı, program) birlikte yayınlanır
+        CREATE OR REPLACE FUNCTION notify_access_log() RETURNS trigger AS $$
+        DECLARE
+            payload TEXT;
+        BEGIN
+            SELECT json_build_object(
+                       'id', NEW.id,
+                       'user_id', NEW.user_id,
+                       'action_type', NEW.action_type,
+                       'created_at', NEW.created_at,
+                       'first_name', u.first_name,
+                       'last_name', u.last_name,
+                       'program_name', p.name
+                   )::text
+              INTO payload
+              FROM users u
+              LEFT JOIN programs p ON u.current_program_id = p.id
+             WHERE u.id = NEW.user_id;
+            PERFORM pg_notify('access_logs', payload);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER access_logs_notify
+            AFTER INSERT ON access_logs
+            FOR EACH ROW EXECUTE FUNCTION notify_access_log();
+
+        -- Üye / üyelik değişiklikleri 'gym_changes' kanalına (tablo, işlem).
+        -- Statement seviyesinde: toplu işlemler tek bildirim üretir.
+        CREATE OR REPLACE FUNCTION notify_gym_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify(
+                'gym_changes',
+                json_build_object('table', TG_TABLE_NAME, 'op', TG_OP)::text
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER users_notify
+            AFTER INSERT OR UPDATE OR DELETE ON users
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_gym_change();
+        CREATE TRIGGER subscriptions_notify
+            AFTER INSERT OR UPDATE OR DELETE ON subscriptions
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_gym_change();
+    """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP TRIGGER IF EXISTS subscriptions_notify ON subscriptions;
+        DROP TRIGGER IF EXISTS users_notify ON users;
+        DROP TRIGGER IF EXISTS access_logs_notify ON access_logs;
+        DROP FUNCTION IF EXISTS notify_gym_change();
+        DROP FUNCTION IF EXISTS notify_access_log();
+    """
+    )
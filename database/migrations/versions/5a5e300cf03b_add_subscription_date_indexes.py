@@ -0,0 +1,40 @@
+"""add subscription date indexes
+
+Revision ID: 5a5e300cf03b
+Revises: 11b803d87400
+Create Date: 2026-10-18 16:18:54.372096
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a5e300cf03b'
+down_revision: Union[str, Sequence[str], None] = '11b803d87400'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute(
+        """
+        -- Aktif üyelik sayısı: end_date >= şimdi
+        CREATE INDEX IF NOT EXISTS ix_subscriptions_end_date
+            ON subscriptions (end_date);
+        -- Günlük gelir / ödeme listesi: created_at aralığı
+        CREATE INDEX IF NOT EXISTS ix_subscriptions_created_at
+            ON subscriptions (created_at);
+    """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP INDEX IF EXISTS ix_subscriptions_created_at;
+        DROP INDEX IF EXISTS ix_subscriptions_end_date;
+    """
+    )
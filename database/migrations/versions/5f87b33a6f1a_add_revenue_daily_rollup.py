@@ -0,0 +1,46 @@
+"""add revenue daily rollup
+
+Revision ID: 5f87b33a6f1a
+Revises: 5a5e300cf03b
+Create Date: 2026-10-18 16:27:52.962990
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f87b33a6f1a'
+down_revision: Union[str, Sequence[str], None] = '5a5e300cf03b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute(
+        """
+        -- Günlük gelir özeti: gün x paket x ödeme tipi.
+        -- dao.refresh_revenue_rollups() ile (gün aralığı bazında) yeniden hesaplanır;
+        -- raporlar subscriptions yerine bu küçük tablodan okunur.
+        CREATE TABLE IF NOT EXISTS revenue_daily (
+            day DATE NOT NULL,
+            package_id INT NOT NULL,
+            payment_type_id INT NOT NULL,
+            subscription_count INT NOT NULL,
+            revenue DECIMAL(12, 2) NOT NULL,
+            PRIMARY KEY (day, package_id, payment_type_id)
+        );
+
+        INSERT INTO revenue_daily (day, package_id, payment_type_id, subscription_count, revenue)
+        SELECT created_at::date, package_id, payment_type_id, COUNT(*), SUM(price_sold)
+        FROM subscriptions
+        GROUP BY 1, 2, 3
+        ON CONFLICT DO NOTHING;
+    """
+    )
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS revenue_daily;")
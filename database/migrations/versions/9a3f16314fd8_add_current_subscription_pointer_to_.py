@@ -0,0 +1,62 @@
+"""add current subscription pointer to users
+
+Revision ID: 9a3f16314fd8
+Revises: 5f87b33a6f1a
+Create Date: 2026-10-18 16:29:07.395318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3f16314fd8'
+down_revision: Union[str, Sequence[str], None] = '5f87b33a6f1a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute(
+        """
+        -- Üyenin güncel (en son başlayan) üyeliği ve bitişi; dao'daki üyelik
+        -- fonksiyonları aynı transaction içinde günceller.
+        ALTER TABLE users
+            ADD COLUMN IF NOT EXISTS current_subscription_id INT
+                REFERENCES subscriptions (id) ON DELETE SET NULL,
+            ADD COLUMN IF NOT EXISTS active_until TIMESTAMP;
+
+        -- Durum da güncel üyelikten gelir (liste, arama ve aktif filtresi
+        -- users.status okur): bitmemişse 'Aktif', bittiyse 'Pasif'
+        UPDATE users u
+        SET current_subscription_id = ls.id,
+            active_until = ls.end_date,
+            status = CASE WHEN ls.end_date >= LOCALTIMESTAMP
+                          THEN 'Aktif' ELSE 'Pasif' END::status_enum
+        FROM (
+            SELECT DISTINCT ON (user_id) id, user_id, end_date
+            FROM subscriptions
+            ORDER BY user_id, start_date DESC, id DESC
+        ) ls
+        WHERE ls.user_id = u.id;
+
+        -- Aktif üye sayısı / filtresi: active_until >= now
+        CREATE INDEX IF NOT EXISTS ix_users_active_until ON users (active_until);
+        CREATE INDEX IF NOT EXISTS ix_users_current_subscription
+            ON users (current_subscription_id);
+    """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP INDEX IF EXISTS ix_users_current_subscription;
+        DROP INDEX IF EXISTS ix_users_active_until;
+        ALTER TABLE users
+            DROP COLUMN IF EXISTS active_until,
+            DROP COLUMN IF EXISTS current_subscription_id;
+    """
+    )
@@ -0,0 +1,35 @@
+"""add subscription user index
+
+Revision ID: a6916c241ee6
+Revises: 3a5618ae5e4c
+Create Date: 2026-10-18 16:12:17.305201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6916c241ee6'
+down_revision: Union[str, Sequence[str], None] = '3a5618ae5e4c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_subscriptions_user_start
+            ON subscriptions (user_id, start_date DESC);
+    """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP INDEX IF EXISTS ix_subscriptions_user_start;
+    """
+    )
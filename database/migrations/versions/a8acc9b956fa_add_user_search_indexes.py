@@ -0,0 +1,51 @@
+"""add user search indexes
+
+Revision ID: a8acc9b956fa
+Revises: a6916c241ee6
+Create Date: 2026-10-18 16:12:49.796044
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8acc9b956fa'
+down_revision: Union[str, Sequence[str], None] = 'a6916c241ee6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute(
+        """
+        -- TC ve telefon aramaları önek (prefix) araması: LIKE '123%'
+        CREATE INDEX IF NOT EXISTS ix_users_tc_number_prefix
+            ON users (tc_number varchar_pattern_ops);
+        CREATE INDEX IF NOT EXISTS ix_users_phone_prefix
+            ON users (phone varchar_pattern_ops);
+
+        -- Ad soyad araması: ILIKE '%ali%' (pg_trgm kurulu ise)
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                CREATE INDEX IF NOT EXISTS ix_users_full_name_trgm
+                    ON users USING gin ((first_name || ' ' || last_name) gin_trgm_ops);
+            END IF;
+        END
+        $$;
+    """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP INDEX IF EXISTS ix_users_full_name_trgm;
+        DROP INDEX IF EXISTS ix_users_phone_prefix;
+        DROP INDEX IF EXISTS ix_users_tc_number_prefix;
+    """
+    )
@@ -0,0 +1,52 @@
+"""create access logs table
+
+Revision ID: b5e136c6923e
+Revises: a8acc9b956fa
+Create Date: 2026-10-18 16:14:05.368495
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e136c6923e'
+down_revision: Union[str, Sequence[str], None] = 'a8acc9b956fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute(
+        """
+        -- Daha önce dao.ensure_access_log_table ile oluşturulmuş olabilir
+        CREATE TABLE IF NOT EXISTS access_logs (
+            id SERIAL PRIMARY KEY,
+            user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            action_type VARCHAR(20) NOT NULL, -- 'GİRİŞ' or 'ÇIKIŞ'
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Günlük log listesi: created_at aralık taraması
+        CREATE INDEX IF NOT EXISTS ix_access_logs_created_at
+            ON access_logs (created_at);
+
+        -- İçerideki üye sayısı: DISTINCT ON (user_id) ... ORDER BY user_id, created_at DESC
+        CREATE INDEX IF NOT EXISTS ix_access_logs_user_created
+            ON access_logs (user_id, created_at DESC) INCLUDE (action_type);
+    """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        -- Tablo upgrade'den önce de var olabilir (dao.ensure_access_log_table)
+        -- ve turnike geçmişini tutar: sadece bu migration'ın eklediği
+        -- indeksleri kaldır, tabloyu ve verisini bırak
+        DROP INDEX IF EXISTS ix_access_logs_user_created;
+        DROP INDEX IF EXISTS ix_access_logs_created_at;
+    """
+    )
@@ -0,0 +1,50 @@
+"""add user status changes for expiry sweep
+
+Revision ID: c7e4a92d1b35
+Revises: 9a3f16314fd8
+Create Date: 2026-10-18 17:02:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e4a92d1b35'
+down_revision: Union[str, Sequence[str], None] = '9a3f16314fd8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute(
+        """
+        -- Süre taramasının (dao.expire_memberships) yaptığı durum değişiklikleri
+        CREATE TABLE IF NOT EXISTS user_status_changes (
+            id SERIAL PRIMARY KEY,
+            user_id INT NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            old_status status_enum NOT NULL,
+            new_status status_enum NOT NULL,
+            changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS ix_user_status_changes_user
+            ON user_status_changes (user_id);
+        CREATE INDEX IF NOT EXISTS ix_user_status_changes_changed_at
+            ON user_status_changes (changed_at);
+
+        -- Tarama adayları: sadece hâlâ 'Aktif' olan üyeler
+        CREATE INDEX IF NOT EXISTS ix_users_aktif_active_until
+            ON users (active_until) WHERE status = 'Aktif';
+    """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP INDEX IF EXISTS ix_users_aktif_active_until;
+        DROP TABLE IF EXISTS user_status_changes;
+    """
+    )
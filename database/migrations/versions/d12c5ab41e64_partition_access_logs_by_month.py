@@ -0,0 +1,100 @@
+"""partition access logs by month
+
+Revision ID: d12c5ab41e64
+Revises: b5e136c6923e
+Create Date: 2026-10-18 16:14:42.205351
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd12c5ab41e64'
+down_revision: Union[str, Sequence[str], None] = 'b5e136c6923e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute(
+        """
+        -- Mevcut tabloyu kenara al (isimler yeni tabloyla çakışmasın)
+        ALTER TABLE access_logs RENAME TO access_logs_unpartitioned;
+        ALTER TABLE access_logs_unpartitioned
+            RENAME CONSTRAINT access_logs_pkey TO access_logs_unpartitioned_pkey;
+        DROP INDEX IF EXISTS ix_access_logs_created_at;
+        DROP INDEX IF EXISTS ix_access_logs_user_created;
+
+        -- Aylık range partition; PK partition anahtarını içermek zorunda
+        CREATE TABLE access_logs (
+            id INT NOT NULL DEFAULT nextval('access_logs_id_seq'),
+            user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            action_type VARCHAR(20) NOT NULL, -- 'GİRİŞ' or 'ÇIKIŞ'
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at);
+        ALTER SEQUENCE access_logs_id_seq OWNED BY access_logs.id;
+
+        CREATE INDEX ix_access_logs_created_at ON access_logs (created_at);
+        CREATE INDEX ix_access_logs_user_created
+            ON access_logs (user_id, created_at DESC) INCLUDE (action_type);
+
+        -- En eski kayıttan itibaren 2 ay sonrasına kadar aylık partitionlar
+        DO $$
+        DECLARE
+            month_start DATE;
+            last_month DATE := date_trunc('month', CURRENT_DATE) + INTERVAL '2 months';
+        BEGIN
+            SELECT date_trunc('month', COALESCE(MIN(created_at), CURRENT_DATE))
+              INTO month_start
+              FROM access_logs_unpartitioned;
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF access_logs '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'access_logs_' || to_char(month_start, 'YYYY_MM'),
+                    month_start,
+                    (month_start + INTERVAL '1 month')::date
+                );
+                month_start := (month_start + INTERVAL '1 month')::date;
+            END LOOP;
+        END
+        $$;
+
+        INSERT INTO access_logs (id, user_id, action_type, created_at)
+            SELECT id, user_id, action_type, COALESCE(created_at, CURRENT_TIMESTAMP)
+            FROM access_logs_unpartitioned;
+        DROP TABLE access_logs_unpartitioned;
+    """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        ALTER TABLE access_logs RENAME TO access_logs_partitioned;
+        ALTER TABLE access_logs_partitioned
+            RENAME CONSTRAINT access_logs_pkey TO access_logs_partitioned_pkey;
+        DROP INDEX IF EXISTS ix_access_logs_created_at;
+        DROP INDEX IF EXISTS ix_access_logs_user_created;
+
+        CREATE TABLE access_logs (
+            id INT PRIMARY KEY DEFAULT nextval('access_logs_id_seq'),
+            user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            action_type VARCHAR(20) NOT NULL, -- 'GİRİŞ' or 'ÇIKIŞ'
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        ALTER SEQUENCE access_logs_id_seq OWNED BY access_logs.id;
+
+        CREATE INDEX ix_access_logs_created_at ON access_logs (created_at);
+        CREATE INDEX ix_access_logs_user_created
+            ON access_logs (user_id, created_at DESC) INCLUDE (action_type);
+
+        INSERT INTO access_logs (id, user_id, action_type, created_at)
+            SELECT id, user_id, action_type, created_at FROM access_logs_partitioned;
+        DROP TABLE access_logs_partitioned;
+    """
+    )
@@ -0,0 +1,49 @@
+"""add user phone trigram index
+
+Revision ID: e3b8d15f7a02
+Revises: c7e4a92d1b35
+Create Date: 2026-10-18 18:40:12.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8d15f7a02'
+down_revision: Union[str, Sequence[str], None] = 'c7e4a92d1b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute(
+        """
+        -- Telefon araması yine metnin herhangi bir yerinde: LIKE '%555%'
+        -- ('555' -> '05551112233'); pg_trgm kurulu ise indeksli
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                CREATE INDEX IF NOT EXISTS ix_users_phone_trgm
+                    ON users USING gin (phone gin_trgm_ops);
+            END IF;
+        END
+        $$;
+
+        -- Önek indeksini artık hiçbir sorgu kullanmıyor; sadece yazmaları yavaşlatır
+        DROP INDEX IF EXISTS ix_users_phone_prefix;
+    """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP INDEX IF EXISTS ix_users_phone_trgm;
+        CREATE INDEX IF NOT EXISTS ix_users_phone_prefix
+            ON users (phone varchar_pattern_ops);
+    """
+    )
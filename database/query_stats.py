@@ -0,0 +1,316 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Percentiles and histograms are computed over this many recent calls
+# per statement, so they follow the current load instead of all history
+WINDOW_SIZE = 1000
+
+slow_query_logger = logging.getLogger("database.slow_queries")
+
+_lock = threading.Lock()
+_stats: Dict[str, "_Metric"] = {}
+_acquire = None  # _Metric for pool checkout waits
+_config = None
+
+
+def _settings() -> Dict[str, Any]:
+    """
+    Read the PG* settings on first use (after db.py has loaded .env):
+    PGQUERY_STATS=0 turns instrumentation off, PGSLOW_QUERY_MS is the slow
+    query threshold, PGSLOW_QUERY_LOG a file the slow-query log is appended
+    to (stderr otherwise) and PGSLOW_QUERY_EXPLAIN=1 captures
+    EXPLAIN (ANALYZE, BUFFERS) for the slowest SELECTs.
+    """
+    global _config
+    if _config is None:
+        _config = {
+            "enabled": os.getenv("PGQUERY_STATS", "1") != "0",
+            "slow_ms": float(os.getenv("PGSLOW_QUERY_MS", 200)),
+            "explain": os.getenv("PGSLOW_QUERY_EXPLAIN", "0") == "1",
+        }
+        log_file = os.getenv("PGSLOW_QUERY_LOG")
+        if log_file:
+            handler = logging.FileHandler(log_file, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            slow_query_logger.addHandler(handler)
+            slow_query_logger.setLevel(logging.INFO)
+    return _config
+
+
+def enabled() -> bool:
+    return _settings()["enabled"]
+
+
+def configure(
+    slow_ms: Optional[float] = None, explain: Optional[bool] = None
+) -> None:
+    """Change the slow query threshold / EXPLAIN capture at runtime"""
+    settings = _settings()
+    if slow_ms is not None:
+        settings["slow_ms"] = slow_ms
+    if explain is not None:
+        settings["explain"] = explain
+
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_VALUES_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_ROWS = re.compile(r"(VALUES\s+\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+
+# dao statements are mostly constant strings: normalise each text once
+_FINGERPRINT_CACHE_SIZE = 2048
+_fingerprints: Dict[Any, str] = {}
+
+
+def fingerprint(sql: Any) -> str:
+    """
+    Normalised statement text used as the statistics key: whitespace is
+    collapsed and literals (strings, numbers, value lists) become `?`, so
+    the same query with different parameters is counted once.
+    """
+    try:
+        return _fingerprints[sql]
+    except (KeyError, TypeError):
+        pass
+    key = sql
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    elif not isinstance(sql, str):
+        sql = str(sql)  # psycopg2.sql.Composed
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _VALUES_LIST.sub("(...)", sql)
+    sql = _VALUES_ROWS.sub(r"\1", sql)
+    if isinstance(key, (str, bytes)):
+        if len(_fingerprints) >= _FINGERPRINT_CACHE_SIZE:
+            _fingerprints.clear()
+        _fingerprints[key] = sql
+    return sql
+
+
+class _Metric:
+    __slots__ = ("calls", "total", "max", "rows", "recent", "plan", "plan_time")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.recent = deque(maxlen=WINDOW_SIZE)
+        self.plan = None  # EXPLAIN output of the slowest captured call
+        self.plan_time = 0.0
+
+    def add(self, seconds: float, rows: int = 0) -> bool:
+        """Record one call; True if it is the slowest seen so far"""
+        self.calls += 1
+        self.total += seconds
+        self.rows += max(rows, 0)
+        self.recent.append(seconds)
+        if seconds > self.max:
+            self.max = seconds
+            return True
+        return False
+
+    def summary(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+        histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        for seconds in recent:
+            ms = seconds * 1000
+            for i, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+                if ms <= bound:
+                    histogram[i] += 1
+                    break
+            else:
+                histogram[-1] += 1
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.calls * 1000, 3) if self.calls else 0.0,
+            "p50_ms": round(_percentile(recent, 50) * 1000, 3),
+            "p95_ms": round(_percentile(recent, 95) * 1000, 3),
+            "p99_ms": round(_percentile(recent, 99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "rows": self.rows,
+            "histogram": histogram,
+            "plan": self.plan,
+        }
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def record_query(sql: Any, seconds: float, rows: int = 0) -> bool:
+    """
+    Record one executed statement. Returns True if the call should have its
+    plan captured (slow, slowest of its kind so far, EXPLAIN capture on).
+    """
+    key = fingerprint(sql)
+    with _lock:
+        metric = _stats.get(key)
+        if metric is None:
+            metric = _stats[key] = _Metric()
+        slowest = metric.add(seconds, rows)
+
+    settings = _settings()
+    if seconds * 1000 < settings["slow_ms"]:
+        return False
+    slow_query_logger.warning(
+        "slow query %.1f ms rows=%d: %s", seconds * 1000, max(rows, 0), key[:1000]
+    )
+    return slowest and settings["explain"]
+
+
+def record_acquire(seconds: float) -> None:
+    """Record how long a pool checkout waited for a connection"""
+    global _acquire
+    with _lock:
+        if _acquire is None:
+            _acquire = _Metric()
+        _acquire.add(seconds)
+
+
+def _store_plan(sql: Any, seconds: float, plan: str) -> None:
+    key = fingerprint(sql)
+    with _lock:
+        metric = _stats.get(key)
+        if metric is not None and seconds >= metric.plan_time:
+            metric.plan, metric.plan_time = plan, seconds
+    slow_query_logger.warning("plan for %.1f ms query:\n%s", seconds * 1000, plan)
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Per-fingerprint statistics: calls, totals, recent p50/p95/p99, histogram, plan"""
+    with _lock:
+        return {key: metric.summary() for key, metric in _stats.items()}
+
+
+def acquire_stats() -> Dict[str, Any]:
+    """Pool checkout wait statistics (same shape as a snapshot() entry)"""
+    with _lock:
+        return (_acquire or _Metric()).summary()
+
+
+def total_queries() -> int:
+    with _lock:
+        return sum(metric.calls for metric in _stats.values())
+
+
+def top(n: int = 10, by: str = "total_ms") -> List[Dict[str, Any]]:
+    """The `n` statements with the highest `by` (total_ms, p95_ms, calls, ...)"""
+    rows = [dict(summary, fingerprint=key) for key, summary in snapshot().items()]
+    rows.sort(key=lambda row: row[by], reverse=True)
+    return rows[:n]
+
+
+def reset() -> None:
+    global _acquire
+    with _lock:
+        _stats.clear()
+        _acquire = None
+
+
+def format_report(n: int = 10) -> str:
+    """Plain-text table of the top statements by total time"""
+    lines = [f"{'calls':>8}{'total ms':>12}{'p50':>9}{'p95':>9}{'max':>9}{'rows':>10}  query"]
+    for row in top(n):
+        lines.append(
+            f"{row['calls']:>8}{row['total_ms']:>12.1f}{row['p50_ms']:>9.2f}"
+            f"{row['p95_ms']:>9.2f}{row['max_ms']:>9.2f}{row['rows']:>10}  "
+            f"{row['fingerprint'][:100]}"
+        )
+    acquire = acquire_stats()
+    lines.append(
+        f"pool checkout: {acquire['calls']} waits, p95 {acquire['p95_ms']:.2f} ms, "
+        f"max {acquire['max_ms']:.2f} ms"
+    )
+    return "\n".join(lines)
+
+
+def _explainable(sql: Any) -> bool:
+    """Only read-only statements are re-run under EXPLAIN ANALYZE"""
+    text = fingerprint(sql).lstrip("( ").upper()
+    if text.startswith("SELECT"):
+        return True
+    return text.startswith("WITH") and not re.search(
+        r"\b(INSERT|UPDATE|DELETE|MERGE)\b", text
+    )
+
+
+class _InstrumentedMixin:
+    """
+    Records every statement in this module's statistics (wall time, rows)
+    and logs the slow ones; mixed into the cursor classes below.
+    """
+
+    def execute(self, query, vars=None):
+        return self.execute_as(query, vars, query, vars)
+
+    def execute_as(self, query, vars, sql, params):
+        """
+        Run `query` but record (and explain) it as `sql` with `params`, the
+        statement it stands for: db.execute_prepared() runs `EXECUTE name
+        (...)` and wants the timing under the prepared query's fingerprint.
+        """
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            elapsed = time.perf_counter() - started
+            if record_query(sql, elapsed, self.rowcount):
+                self._capture_plan(sql, params, elapsed)
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            record_query(query, time.perf_counter() - started, self.rowcount)
+
+    def _capture_plan(self, query, vars, elapsed):
+        conn = self.connection
+        if (
+            conn.autocommit
+            or not _explainable(query)
+            or conn.info.transaction_status != extensions.TRANSACTION_STATUS_INTRANS
+        ):
+            return
+        # Separate plain cursor (this one's results are still unread) and a
+        # savepoint so a failing EXPLAIN can't abort the caller's transaction
+        with conn.cursor(cursor_factory=extensions.cursor) as cur:
+            try:
+                cur.execute("SAVEPOINT query_stats_explain")
+                cur.execute(b"EXPLAIN (ANALYZE, BUFFERS) " + cur.mogrify(query, vars))
+                plan = "\n".join(row[0] for row in cur.fetchall())
+                cur.execute("RELEASE SAVEPOINT query_stats_explain")
+            except psycopg2.Error:
+                try:
+                    cur.execute("ROLLBACK TO SAVEPOINT query_stats_explain")
+                except psycopg2.Error:
+                    pass
+                return
+        _store_plan(query, elapsed, plan)
+
+
+class InstrumentedCursor(_InstrumentedMixin, RealDictCursor):
+    """Default cursor of db.py connections (dict rows) unless PGQUERY_STATS=0"""
+
+
+class InstrumentedTupleCursor(_InstrumentedMixin, extensions.cursor):
+    """Plain tuple-row cursor for the record fast path (db.tuple_cursor)"""
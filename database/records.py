@@ -0,0 +1,111 @@
+"""
+Lightweight row records for the DAO's bulk list functions.
+
+By default a list function reads RealDictRows and copies each into a dict.
+Called with records=True it reads plain tuples instead and wraps each one in
+the record class below (one small tuple per row, attribute access, no dict).
+The queries in dao.py select the fields explicitly, in field order.
+
+The *Row classes are narrow projections for a single screen: passed as
+records=MemberRow / records=PaymentRow, a list function selects only
+those fields.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+
+class User(NamedTuple):
+    """A member with program name and current subscription (member list row)"""
+
+    id: int
+    first_name: str
+    last_name: str
+    email: str
+    phone: str
+    gender: str
+    tc_number: str
+    status: str
+    birth_date: date
+    created_at: Optional[datetime]
+    current_program_id: Optional[int]
+    current_subscription_id: Optional[int]
+    active_until: Optional[datetime]
+    program_name: Optional[str]
+    start_date: Optional[datetime]
+    end_date: Optional[datetime]
+    package_name: Optional[str]
+    subscription_status: str
+
+
+class MemberRow(NamedTuple):
+    """What the member table shows"""
+
+    id: int
+    first_name: str
+    last_name: str
+    tc_number: str
+    phone: str
+    email: str
+    program_name: Optional[str]
+    start_date: Optional[datetime]
+    end_date: Optional[datetime]
+    subscription_status: str
+
+
+class MemberName(NamedTuple):
+    """A member's id, name and program (turnstile events)"""
+
+    id: int
+    first_name: str
+    last_name: str
+    program_name: Optional[str]
+
+
+class Subscription(NamedTuple):
+    """A subscription (payment) with member, package and payment type names"""
+
+    id: int
+    user_id: int
+    package_id: int
+    start_date: datetime
+    end_date: datetime
+    price_sold: Decimal
+    created_at: Optional[datetime]
+    payment_type_id: int
+    first_name: str
+    last_name: str
+    package_name: str
+    payment_type_name: str
+
+
+class PaymentRow(NamedTuple):
+    """What the payments table shows"""
+
+    id: int
+    first_name: str
+    last_name: str
+    price_sold: Decimal
+    created_at: Optional[datetime]
+    payment_type_name: str
+
+
+class Package(NamedTuple):
+    id: int
+    name: str
+    duration_days: int
+    description: Optional[str]
+    price: Decimal
+
+
+class AccessLog(NamedTuple):
+    """A turnstile log with the member's name and program"""
+
+    id: int
+    user_id: int
+    action_type: str
+    created_at: datetime
+    first_name: str
+    last_name: str
+    program_name: Optional[str]
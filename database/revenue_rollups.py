@@ -0,0 +1,42 @@
+"""
+Gelir özeti (revenue_daily) yenileme scripti
+Uygulama dışından (psql, başka servis) yapılan ödeme değişikliklerini
+günlük gelir özetine yansıtır.
+
+Proje kök dizininden çalıştırın (cron ile günde bir yeterli):
+    python -m database.revenue_rollups --days 7
+    python -m database.revenue_rollups --full
+"""
+
+import argparse
+from datetime import date, timedelta
+
+from database import dao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="revenue_daily gelir özeti yenileme")
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=2,
+        help="Bugün dahil son kaç günün özeti yeniden hesaplansın",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Tüm geçmişi yeniden hesapla (--days yok sayılır)",
+    )
+    args = parser.parse_args()
+
+    if args.full:
+        written = dao.refresh_revenue_rollups()
+        print(f"✓ Tüm gelir özeti yeniden hesaplandı ({written} satır)")
+    else:
+        start = date.today() - timedelta(days=max(args.days, 1) - 1)
+        written = dao.refresh_revenue_rollups(start_date=start)
+        print(f"✓ {start.isoformat()} ve sonrası yeniden hesaplandı ({written} satır)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,22 @@
 """
 Mock data ekleme scripti
 Bu script veritabanına örnek veriler ekler.
+
+Üyeler, üyelikler ve turnike logları COPY FROM STDIN ile yazılır; satırlar
+üreteçlerden akıtıldığı için milyonlarca kayıt bellekte biriktirilmez.
+Aynı --seed ve --as-of ile her çalıştırma aynı veriyi üretir.
+
+Proje kök dizininden çalıştırın:
+    python -m database.seed_mock_data
+    python -m database.seed_mock_data --users 1000000 --log-months 3 --seed 42
 """
 
+import argparse
 import random
-from datetime import datetime, timedelta
-from db import get_db_connection
+from datetime import date, datetime, time, timedelta
+
+from database import dao
+from database.db import get_db_connection
 
 # Türkçe isimler ve soyisimler
 FIRST_NAMES = [
@@ -90,15 +101,120 @@ PAYMENT_TYPES = [
 ]
 
 
-def generate_tc_number():
-    """11 haneli geçerli bir TC kimlik numarası üretir"""
-    tc = str(random.randint(10000000000, 99999999999))
-    return tc
+# E-posta adresleri ASCII olsun (dao.email_dogrula ile uyumlu)
+ASCII_HARFLER = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU")
+
+GENDERS = ["Erkek", "Kadın", "Diğer"]
+# Üyeliği olmayan üyelerin durumu (çoğunlukla Aktif)
+STATUSES = ["Aktif", "Aktif", "Aktif", "Pasif"]
+
+# COPY'ye bir seferde gönderilen veri (byte)
+COPY_BLOK_BOYUTU = 1 << 20
+
+# Üye başına bağımsız rastgele akışlar (üye, üyelik ve log üretimi
+# birbirini etkilemesin; her biri ayrı ayrı tekrar üretilebilsin)
+AKIS_UYE, AKIS_UYELIK, AKIS_LOG = range(3)
 
 
-def generate_phone():
+def uye_rng(seed, index, akis):
+    """index'inci üyenin `akis` verisi için tekrarlanabilir rastgele üreteç"""
+    return random.Random((seed * 1_000_003 + index) * 4 + akis)
+
+
+def generate_tc_number(user_id):
+    """
+    Üye id'sinden 11 haneli TC kimlik numarası üretir.
+    id -> numara eşlemesi birebirdir; toplu eklemede tekrar eden numara olmaz.
+    """
+    govde = 1_000_000_000 + (user_id * 7919) % 9_000_000_000
+    return f"{govde}{user_id % 10}"
+
+
+def generate_phone(rng=random):
     """Türk telefon numarası üretir"""
-    return f"05{random.randint(10, 99)}{random.randint(100, 999)}{random.randint(10, 99)}{random.randint(10, 99)}"
+    return f"05{rng.randint(10, 99)}{rng.randint(100, 999)}{rng.randint(10, 99)}{rng.randint(10, 99)}"
+
+
+class CopyAkisi:
+    """
+    Satır üretecini COPY FROM STDIN'in okuduğu dosya benzeri nesneye çevirir.
+    Satırlar psycopg2 okudukça üretilir (text formatı, None -> \\N).
+    """
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._tampon = b""
+        self.satir_sayisi = 0
+
+    def read(self, size=-1):
+        parcalar = [self._tampon]
+        uzunluk = len(self._tampon)
+        for row in self._rows:
+            satir = "\t".join("\\N" if v is None else str(v) for v in row) + "\n"
+            veri = satir.encode()
+            parcalar.append(veri)
+            uzunluk += len(veri)
+            self.satir_sayisi += 1
+            if 0 < size <= uzunluk:
+                break
+        veri = b"".join(parcalar)
+        if size < 0:
+            self._tampon = b""
+            return veri
+        self._tampon = veri[size:]
+        return veri[:size]
+
+
+def copy_rows(cursor, table, columns, rows):
+    """rows üretecini COPY FROM STDIN ile tabloya yazar, satır sayısını döndürür"""
+    akis = CopyAkisi(rows)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN",
+        akis,
+        size=COPY_BLOK_BOYUTU,
+    )
+    return akis.satir_sayisi
+
+
+def reserve_user_ids(cursor, count):
+    """
+    users.id dizisinden `count` uzunluğunda ardışık bir blok ayırır ve ilk
+    id'yi döndürür. id'ler COPY'de elle verildiği için üyelik ve log satırları
+    üye id'sini veritabanına sormadan bilir. Tablo commit'e kadar kilitli kalır.
+    """
+    cursor.execute("LOCK TABLE users IN SHARE ROW EXCLUSIVE MODE")
+    cursor.execute(
+        """SELECT setval(pg_get_serial_sequence('users', 'id'),
+                         COALESCE(MAX(id), 0) + %s) - %s + 1 as first_id
+           FROM users""",
+        (count, count),
+    )
+    return cursor.fetchone()["first_id"]
+
+
+def subscription_plan(seed, index, packages, payment_type_ids, max_subscriptions, as_of):
+    """
+    index'inci üyenin üyelikleri, eskiden yeniye:
+    [(package_id, start_date, end_date, price_sold, payment_type_id), ...]
+    En yenisi as_of'tan önceki 400 gün içinde başlar; öncekiler ondan geriye
+    doğru aralıklarla dizilir. Aynı argümanlarla hep aynı liste döner.
+    """
+    rng = uye_rng(seed, index, AKIS_UYELIK)
+    plan = []
+    start = as_of - timedelta(days=rng.randint(0, 400), hours=rng.randint(3, 16))
+    for _ in range(rng.randint(0, max_subscriptions)):
+        package = rng.choice(packages)
+        end = start + timedelta(days=package["duration_days"])
+        # Paket fiyatından %0-20 indirim yapılabilir
+        price_sold = round(float(package["price"]) * (1 - rng.uniform(0, 0.2)), 2)
+        plan.append((package["id"], start, end, price_sold, rng.choice(payment_type_ids)))
+        # Bir önceki üyelik bundan 0-60 gün önce bitmiş olsun
+        previous = rng.choice(packages)
+        start = start - timedelta(
+            days=previous["duration_days"] + rng.randint(0, 60), hours=rng.randint(-4, 4)
+        )
+    plan.reverse()
+    return plan
 
 
 def seed_payment_types(conn):
@@ -242,129 +358,187 @@ def seed_coaches(conn):
     print(f"✓ {len(coaches_data)} coach eklendi")
 
 
-def seed_users(conn, num_users=20):
-    """Users tablosuna veri ekler"""
-    cursor = conn.cursor()
-    print(f"{num_users} user ekleniyor...")
-
-    genders = ["Erkek", "Kadın", "Diğer"]
-    genders = ["Erkek", "Kadın", "Diğer"]
-    # Varsayılan olarak çoğunlukla Aktif olsun
-    statuses = ["Aktif", "Aktif", "Aktif", "Pasif"]
-
-    # Program ID'lerini al
-    cursor.execute("SELECT id FROM programs")
+def load_reference_data(cursor):
+    """Üretimde kullanılan program, paket ve ödeme tipleri (tek sorguda her biri)"""
+    cursor.execute("SELECT id FROM programs ORDER BY id")
     program_ids = [row["id"] for row in cursor.fetchall()]
+    cursor.execute("SELECT id, duration_days, price FROM packages ORDER BY id")
+    packages = [dict(row) for row in cursor.fetchall()]
+    cursor.execute("SELECT id FROM payment_types ORDER BY id")
+    payment_type_ids = [row["id"] for row in cursor.fetchall()]
+    return program_ids, packages, payment_type_ids
 
-    users_added = 0
-    for i in range(num_users):
-        first_name = random.choice(FIRST_NAMES)
-        last_name = random.choice(LAST_NAMES)
-        email = f"{first_name.lower()}.{last_name.lower()}{i}@example.com"
-        password = "password123"  # Gerçek uygulamada hash'lenmeli
-        phone = generate_phone()
-        gender = random.choice(genders)
-        tc_number = generate_tc_number()
-        status = random.choice(statuses)
-
-        # Doğum tarihi (18-65 yaş arası)
-        birth_date = datetime.now() - timedelta(days=random.randint(18 * 365, 65 * 365))
-
-        # %50 ihtimalle program atanır
-        program_id = (
-            random.choice(program_ids)
-            if program_ids and random.random() > 0.5
-            else None
-        )
 
-        try:
-            cursor.execute(
-                """INSERT INTO users (first_name, last_name, email, password, phone, gender, tc_number, status, birth_date, current_program_id) 
-                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-                (
-                    first_name,
-                    last_name,
-                    email,
-                    password,
-                    phone,
-                    gender,
-                    tc_number,
-                    status,
-                    birth_date.date(),
-                    program_id,
-                ),
+def seed_users(conn, num_users, first_id, program_ids, plan, as_of, seed):
+    """
+    Users tablosuna COPY ile num_users üye ekler (id'ler first_id'den başlar).
+    Üyeliği devam eden üye 'Aktif', bitmiş olan 'Pasif' olur; güncel üyelik
+    bağlantısı (current_subscription_id) üyelikler eklendikten sonra kurulur.
+    """
+    cursor = conn.cursor()
+    print(f"{num_users} user ekleniyor...")
+
+    def rows():
+        for i in range(num_users):
+            user_id = first_id + i
+            rng = uye_rng(seed, i, AKIS_UYE)
+            first_name = rng.choice(FIRST_NAMES)
+            last_name = rng.choice(LAST_NAMES)
+            email = f"{first_name}.{last_name}.{user_id}@example.com".translate(ASCII_HARFLER).lower()
+            # Doğum tarihi (18-65 yaş arası)
+            birth_date = as_of.date() - timedelta(days=rng.randint(18 * 365, 65 * 365))
+            # %50 ihtimalle program atanır
+            program_id = rng.choice(program_ids) if program_ids and rng.random() > 0.5 else None
+
+            subscriptions = plan(i)
+            if subscriptions:
+                status = "Aktif" if subscriptions[-1][2] >= as_of else "Pasif"
+                created_at = subscriptions[0][1]
+            else:
+                status = rng.choice(STATUSES)
+                created_at = as_of - timedelta(days=rng.randint(0, 400))
+
+            yield (
+                user_id,
+                first_name,
+                last_name,
+                email,
+                "password123",  # Gerçek uygulamada hash'lenmeli
+                generate_phone(rng),
+                rng.choice(GENDERS),
+                generate_tc_number(user_id),
+                status,
+                birth_date,
+                program_id,
+                created_at,
             )
-            users_added += 1
-        except Exception as e:
-            print(f"⚠ User eklenirken hata: {email} - {e}")
 
-    conn.commit()
+    users_added = copy_rows(
+        cursor,
+        "users",
+        ["id", "first_name", "last_name", "email", "password", "phone", "gender",
+         "tc_number", "status", "birth_date", "current_program_id", "created_at"],
+        rows(),
+    )
     print(f"✓ {users_added} user eklendi")
+    return users_added
 
 
-def seed_subscriptions(conn):
-    """Subscriptions tablosuna veri ekler"""
+def seed_subscriptions(conn, num_users, first_id, plan):
+    """Subscriptions tablosuna COPY ile her üyenin planındaki üyelikleri ekler"""
     cursor = conn.cursor()
     print("Subscriptions ekleniyor...")
 
-    # User ID'lerini al
-    cursor.execute("SELECT id FROM users")
-    user_ids = [row["id"] for row in cursor.fetchall()]
-
-    # Package ID'lerini al
-    cursor.execute("SELECT id, duration_days FROM packages")
-    packages = cursor.fetchall()
-
-    # Payment type ID'lerini al
-    cursor.execute("SELECT id FROM payment_types")
-    payment_type_ids = [row["id"] for row in cursor.fetchall()]
-
-    if not user_ids or not packages or not payment_type_ids:
-        print("⚠ User, package veya payment_type bulunamadı, subscriptions eklenemedi")
-        return
+    def rows():
+        for i in range(num_users):
+            for package_id, start, end, price_sold, payment_type_id in plan(i):
+                # Ödeme üyelik başladığı gün alınmış olsun (gelir geçmişe yayılır)
+                yield (first_id + i, package_id, start, end, f"{price_sold:.2f}", payment_type_id, start)
+
+    subscriptions_added = copy_rows(
+        cursor,
+        "subscriptions",
+        ["user_id", "package_id", "start_date", "end_date", "price_sold",
+         "payment_type_id", "created_at"],
+        rows(),
+    )
+    print(f"✓ {subscriptions_added} subscription eklendi")
+    return subscriptions_added
 
-    subscriptions_added = 0
-    # Her kullanıcı için 0-2 abonelik ekle
-    for user_id in user_ids:
-        num_subs = random.randint(0, 2)
-        for _ in range(num_subs):
-            package = random.choice(packages)
-            package_id = package["id"]
-            duration_days = package["duration_days"]
-
-            start_date = datetime.now() - timedelta(days=random.randint(0, 30))
-            end_date = start_date + timedelta(days=duration_days)
-
-            # Paket fiyatından %0-20 indirim yapılabilir
-            cursor.execute("SELECT price FROM packages WHERE id = %s", (package_id,))
-            base_price = cursor.fetchone()["price"]
-            price_sold = float(base_price) * (1 - random.uniform(0, 0.2))
-
-            payment_type_id = random.choice(payment_type_ids)
-
-            try:
-                cursor.execute(
-                    """INSERT INTO subscriptions (user_id, package_id, start_date, end_date, price_sold, payment_type_id) 
-                       VALUES (%s, %s, %s, %s, %s, %s)""",
-                    (
-                        user_id,
-                        package_id,
-                        start_date,
-                        end_date,
-                        price_sold,
-                        payment_type_id,
-                    ),
-                )
-                subscriptions_added += 1
-            except Exception as e:
-                print(f"⚠ Subscription eklenirken hata: {e}")
 
-    conn.commit()
-    print(f"✓ {subscriptions_added} subscription eklendi")
+def seed_access_logs(conn, num_users, first_id, plan, as_of, log_months, visits_per_month, seed):
+    """
+    access_logs tablosuna COPY ile son log_months ayın turnike geçişlerini ekler.
+    Üyeler sadece üyelikleri sürerken, ayda ortalama visits_per_month kez gelir;
+    her ziyaret bir GİRİŞ ve 45-150 dakika sonra bir ÇIKIŞ logudur. Loglar
+    as_of'tan önce biter (bugünkü içerideki sayısı etkilenmez).
 
+    Satır başına bildirim gönderen access_logs_notify trigger'ı yükleme
+    süresince kapatılır (aynı transaction; hata olursa geri alınır).
+    """
+    cursor = conn.cursor()
+    window_start = as_of - timedelta(days=30 * log_months)
+    print(f"Access logs ekleniyor ({window_start:%Y-%m-%d} - {as_of:%Y-%m-%d})...")
+
+    def rows():
+        for i in range(num_users):
+            rng = uye_rng(seed, i, AKIS_LOG)
+            for _, start, end, _, _ in plan(i):
+                start, end = max(start, window_start), min(end, as_of)
+                if start >= end:
+                    continue
+                days = (end - start).days
+                for _ in range(round(days * visits_per_month / 30 * rng.uniform(0.5, 1.5))):
+                    entry = datetime.combine(
+                        (start + timedelta(days=rng.randrange(days))).date(),
+                        time(rng.randint(6, 21), rng.randint(0, 59), rng.randint(0, 59)),
+                    )
+                    exit_ = entry + timedelta(minutes=rng.randint(45, 150))
+                    if entry < start or exit_ >= as_of:
+                        continue
+                    yield (first_id + i, "GİRİŞ", entry)
+                    yield (first_id + i, "ÇIKIŞ", exit_)
+
+    cursor.execute("ALTER TABLE access_logs DISABLE TRIGGER access_logs_notify")
+    logs_added = copy_rows(cursor, "access_logs", ["user_id", "action_type", "created_at"], rows())
+    cursor.execute("ALTER TABLE access_logs ENABLE TRIGGER access_logs_notify")
+    print(f"✓ {logs_added} access log eklendi")
+    return logs_added
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Örnek / yük testi verisi ekleme")
+    parser.add_argument("--users", type=int, default=20, help="Eklenecek üye sayısı")
+    parser.add_argument(
+        "--max-subscriptions",
+        type=int,
+        default=2,
+        help="Üye başına en fazla üyelik (0 ile bu sayı arasında)",
+    )
+    parser.add_argument(
+        "--log-months",
+        type=int,
+        default=0,
+        help="Kaç aylık turnike logu üretilsin (0: log yok)",
+    )
+    parser.add_argument(
+        "--visits-per-month",
+        type=float,
+        default=8,
+        help="Üyeliği süren bir üyenin aylık ortalama ziyaret sayısı",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Rastgele üreteç tohumu")
+    parser.add_argument(
+        "--as-of",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="Verinin üretildiği 'bugün' (YYYY-MM-DD); aynı tarih aynı veriyi verir",
+    )
+    parser.add_argument(
+        "--skip-reference",
+        action="store_true",
+        help="Paket, program, egzersiz, antrenör gibi sabit verileri ekleme",
+    )
+    return parser.parse_args()
+
+
+def seed_dataset(
+    users=20,
+    max_subscriptions=2,
+    log_months=0,
+    visits_per_month=8,
+    seed=42,
+    as_of=None,
+    skip_reference=False,
+):
+    """
+    Tüm mock datayı ekler (benchmark gibi başka araçlar da çağırır).
+    as_of verilmezse bugün kullanılır.
+    """
+    # Sabit veriler (program egzersizleri) de tekrarlanabilir olsun
+    random.seed(seed)
+    as_of = datetime.combine(as_of or date.today(), time())
 
-def main():
-    """Ana fonksiyon - tüm mock datayı ekler"""
     print("=" * 50)
     print("Mock Data Ekleme İşlemi Başlatılıyor...")
     print("=" * 50)
@@ -374,14 +548,51 @@ def main():
         print("✓ Veritabanı bağlantısı başarılı\n")
 
         # Sırayla tüm tablolara veri ekle
-        seed_payment_types(conn)
-        seed_packages(conn)
-        seed_exercises(conn)
-        seed_programs(conn)
-        seed_program_exercises(conn)
-        seed_coaches(conn)
-        seed_users(conn, num_users=20)
-        seed_subscriptions(conn)
+        if not skip_reference:
+            seed_payment_types(conn)
+            seed_packages(conn)
+            seed_exercises(conn)
+            seed_programs(conn)
+            seed_program_exercises(conn)
+            seed_coaches(conn)
+
+        cursor = conn.cursor()
+        program_ids, packages, payment_type_ids = load_reference_data(cursor)
+        if not packages or not payment_type_ids:
+            print("⚠ Package veya payment_type bulunamadı, subscriptions eklenemeyecek")
+
+        def plan(index):
+            if not packages or not payment_type_ids:
+                return []
+            return subscription_plan(
+                seed, index, packages, payment_type_ids, max_subscriptions, as_of
+            )
+
+        if log_months > 0:
+            # Log penceresinin ilk ayına kadar geriye partition hazırla
+            first_month = (as_of - timedelta(days=30 * log_months)).date()
+            today = date.today()
+            months_back = max((today.year - first_month.year) * 12 + today.month - first_month.month, 0)
+            dao.ensure_access_log_table(months_back=months_back)
+
+        # Üye, üyelik ve loglar tek transaction'da: yarıda kalırsa hiçbiri eklenmez
+        first_id = reserve_user_ids(cursor, users)
+        seed_users(conn, users, first_id, program_ids, plan, as_of, seed)
+        subscriptions_added = seed_subscriptions(conn, users, first_id, plan)
+        if log_months > 0:
+            seed_access_logs(
+                conn, users, first_id, plan, as_of, log_months, visits_per_month, seed
+            )
+        conn.commit()
+
+        # Türetilmiş veriler: güncel üyelik bağlantısı ve günlük gelir özeti
+        print("Güncel üyelikler ve gelir özeti hesaplanıyor...")
+        dao.refresh_current_subscriptions()
+        if subscriptions_added:
+            dao.refresh_revenue_rollups()
+        cursor.execute("ANALYZE users, subscriptions, access_logs")
+        conn.commit()
+        print("✓ Güncel üyelikler ve gelir özeti hazır")
 
         print("\n" + "=" * 50)
         print("✓ Tüm mock data başarıyla eklendi!")
@@ -396,5 +607,19 @@ def main():
             print("\n✓ Veritabanı bağlantısı kapatıldı")
 
 
+def main():
+    """Ana fonksiyon - komut satırı argümanlarıyla tüm mock datayı ekler"""
+    args = parse_args()
+    seed_dataset(
+        users=args.users,
+        max_subscriptions=args.max_subscriptions,
+        log_months=args.log_months,
+        visits_per_month=args.visits_per_month,
+        seed=args.seed,
+        as_of=args.as_of,
+        skip_reference=args.skip_reference,
+    )
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,102 @@
+"""
+Test fixtures: every test session runs against a throwaway database
+(<PGDATABASE>_test, created on the server from the PG* settings, migrated
+with `alembic upgrade head` and dropped at the end). The suite is skipped
+when no PostgreSQL server is reachable.
+"""
+
+import itertools
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+import psycopg2
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from database import db  # noqa: E402  (loads .env before PGDATABASE is read)
+
+
+def _admin_connection():
+    params = db._connection_params()
+    params.update(database="postgres", cursor_factory=None, connection_factory=None)
+    conn = psycopg2.connect(**params)
+    conn.autocommit = True
+    return conn
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_database():
+    try:
+        admin = _admin_connection()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"PostgreSQL not reachable: {e}")
+
+    name = f"{os.getenv('PGDATABASE') or 'gym'}_test"
+    with admin.cursor() as cur:
+        cur.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+        cur.execute(f'CREATE DATABASE "{name}"')
+
+    previous = os.environ.get("PGDATABASE")
+    os.environ["PGDATABASE"] = name
+    db.close_pool()
+    try:
+        from alembic import command
+        from alembic.config import Config
+
+        command.upgrade(Config(str(ROOT / "alembic.ini")), "head")
+        yield name
+    finally:
+        db.close_pool()
+        if previous is None:
+            os.environ.pop("PGDATABASE", None)
+        else:
+            os.environ["PGDATABASE"] = previous
+        with admin.cursor() as cur:
+            cur.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+        admin.close()
+
+
+_tc_numbers = itertools.count(100000000)
+
+
+def _tc_number() -> str:
+    """A valid, unique TC kimlik number"""
+    digits = [int(d) for d in str(next(_tc_numbers))]
+    tenth = ((sum(digits[0::2]) * 7) - sum(digits[1::2])) % 10
+    digits.append(tenth)
+    digits.append(sum(digits) % 10)
+    return "".join(map(str, digits))
+
+
+@pytest.fixture
+def member_data():
+    """Factory of create_user() arguments for a new, unique member"""
+
+    def make(**overrides):
+        tc_number = _tc_number()
+        data = dict(
+            first_name="Test",
+            last_name=f"Uye {tc_number}",
+            email=f"test.{tc_number}@example.com",
+            password="",
+            phone="05000000000",
+            gender="Erkek",
+            tc_number=tc_number,
+            birth_date=date(1990, 1, 1),
+        )
+        data.update(overrides)
+        return data
+
+    return make
+
+
+@pytest.fixture
+def package():
+    from database import dao
+
+    package_id = dao.create_package("Test Paketi", 30, "", 100.0)
+    return dao.get_package(package_id)
@@ -0,0 +1,67 @@
+"""AccessLogWriter failure handling (turnike_simulasyon)"""
+
+from datetime import datetime
+
+import pytest
+
+from database import dao, db
+from turnike_simulasyon import AccessLogWriter
+
+
+def _logs(created_at):
+    with db.db_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT user_id FROM access_logs WHERE created_at = %s ORDER BY id",
+            (created_at,),
+        )
+        return [row["user_id"] for row in cur.fetchall()]
+
+
+@pytest.fixture
+def user_id(member_data):
+    dao.ensure_access_log_table()
+    return dao.create_user(**member_data())
+
+
+def test_bad_rows_are_dropped_and_the_rest_written(user_id):
+    created_at = datetime.now().replace(microsecond=0)
+    writer = AccessLogWriter()
+    for i in range(7):
+        # Row 4 belongs to a member that doesn't exist (FK violation)
+        writer.add(user_id if i != 4 else user_id + 100000, "GİRİŞ", created_at)
+
+    assert writer.flush() == 6
+    assert writer.dropped == 1
+    assert _logs(created_at) == [user_id] * 6
+    # Nothing poisoned is left behind: the next flush and close() succeed
+    writer.add(user_id, "ÇIKIŞ", created_at)
+    writer.close()
+    assert len(_logs(created_at)) == 7
+
+
+def test_transient_failures_keep_rows_until_retries_run_out(user_id, monkeypatch):
+    def down(events):
+        raise ConnectionError("veritabani yok")
+
+    monkeypatch.setattr(dao, "add_access_logs", down)
+    writer = AccessLogWriter(max_retries=3)
+    for _ in range(5):
+        writer.add(user_id, "GİRİŞ")
+
+    for attempt in range(2):
+        with pytest.raises(ConnectionError):
+            writer.flush()
+        assert len(writer._buffer) == 5 and writer.dropped == 0
+
+    with pytest.raises(ConnectionError):
+        writer.flush()
+    assert writer._buffer == [] and writer.dropped == 5
+    assert writer.flush() == 0
+
+
+def test_buffer_is_capped(user_id):
+    writer = AccessLogWriter(max_batch=100, max_buffer=3)
+    for _ in range(5):
+        writer.add(user_id, "GİRİŞ")
+    assert len(writer._buffer) == 3
+    assert writer.dropped == 2
@@ -0,0 +1,165 @@
+"""Unit of work (db.transaction), pool checkout and prepared statements"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import psycopg2
+import pytest
+from psycopg2 import errors, extensions
+
+from database import dao, db
+
+
+def _user_exists(tc_number):
+    with db.db_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM users WHERE tc_number = %s", (tc_number,))
+        return cur.fetchone() is not None
+
+
+def _subscribe(user_id, package):
+    start = datetime.now()
+    return dao.create_subscription(
+        user_id, package["id"], start,
+        start + timedelta(days=package["duration_days"]),
+        float(package["price"]), 1,
+    )
+
+
+def test_transaction_commits_once_at_the_end(member_data, package):
+    data = member_data()
+    with dao.transaction():
+        user_id = dao.create_user(**data)
+        _subscribe(user_id, package)
+        # create_user's commit() was deferred: not visible to other connections yet
+        other = db.get_db_connection()
+        try:
+            with other.cursor() as cur:
+                cur.execute("SELECT 1 FROM users WHERE id = %s", (user_id,))
+                assert cur.fetchone() is None
+        finally:
+            other.close()
+    assert _user_exists(data["tc_number"])
+    assert dao.get_user(user_id)["current_subscription_id"] is not None
+
+
+def test_transaction_rolls_back_whole_block_on_exception(member_data, package):
+    data = member_data()
+    with pytest.raises(LookupError):
+        with dao.transaction():
+            user_id = dao.create_user(**data)
+            _subscribe(user_id, package)
+            raise LookupError("paket bulunamadi")
+    assert not _user_exists(data["tc_number"])
+
+
+def test_swallowed_error_raises_in_failed_sql_transaction(member_data):
+    first, second = member_data(), member_data()
+    with pytest.raises(errors.InFailedSqlTransaction):
+        with dao.transaction():
+            dao.create_user(**first)
+            try:
+                # Same TC number: unique violation aborts the transaction
+                dao.create_user(**dict(second, tc_number=first["tc_number"]))
+            except psycopg2.IntegrityError:
+                pass
+    assert not _user_exists(first["tc_number"])
+    assert not _user_exists(second["tc_number"])
+
+
+def test_nested_transaction_joins_the_outer_one(member_data):
+    outer_data, inner_data = member_data(), member_data()
+    with pytest.raises(RuntimeError):
+        with dao.transaction() as outer:
+            dao.create_user(**outer_data)
+            with dao.transaction() as inner:
+                assert inner is outer
+                dao.create_user(**inner_data)
+            # Leaving the inner block commits nothing
+            assert outer.info.transaction_status == extensions.TRANSACTION_STATUS_INTRANS
+            raise RuntimeError
+    assert not _user_exists(outer_data["tc_number"])
+    assert not _user_exists(inner_data["tc_number"])
+
+
+def test_connection_is_rolled_back_and_released():
+    with pytest.raises(RuntimeError):
+        with db.db_connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO packages (name, duration_days, description, price)"
+                " VALUES ('Geri Alinacak', 1, '', 1)"
+            )
+            raise RuntimeError
+    # The pool hands the same (LIFO) connection back, clean and idle
+    with db.db_connection() as again, again.cursor() as cur:
+        assert again is conn
+        assert again.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+        cur.execute("SELECT 1 FROM packages WHERE name = 'Geri Alinacak'")
+        assert cur.fetchone() is None
+
+
+def test_transaction_releases_its_connection(member_data):
+    with dao.transaction() as conn:
+        dao.create_user(**member_data())
+    assert db._local.connection is None
+    assert not conn.defer_commit
+    with db.db_connection() as again:
+        assert again is conn
+        assert again.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+
+
+def test_cancelled_connection_is_closed_not_pooled():
+    scope = db.CancelScope()
+    result = {}
+
+    def run():
+        try:
+            with db.cancellable(scope), db.db_connection() as conn:
+                result["conn"] = conn
+                with conn.cursor() as cur:
+                    cur.execute("SELECT pg_sleep(5)")
+        except Exception as e:
+            result["error"] = e
+
+    worker = threading.Thread(target=run)
+    started = time.monotonic()
+    worker.start()
+    while "conn" not in result:
+        time.sleep(0.01)
+    time.sleep(0.2)
+    scope.cancel()
+    worker.join()
+
+    assert time.monotonic() - started < 4
+    assert isinstance(result["error"], errors.QueryCanceled)
+    assert result["conn"].closed
+    with db.db_connection() as conn, conn.cursor() as cur:
+        assert conn is not result["conn"]
+        cur.execute("SELECT 1 as one")
+        assert cur.fetchone()["one"] == 1
+    # A cancelled scope refuses to start new work
+    with pytest.raises(errors.QueryCanceled):
+        with db.cancellable(scope), db.db_connection():
+            pass
+
+
+def _prepared_test_statements(conn):
+    return {name for name in conn.prepared_statements if name.startswith("test_add_")}
+
+
+def test_prepared_statement_is_prepared_again_after_deallocate():
+    sql = "SELECT %s::int + 1 as n"
+    with db.db_connection() as conn, conn.cursor() as cur:
+        db.execute_prepared(cur, "test_add", sql, (1,))
+        assert cur.fetchone()["n"] == 2
+        assert len(_prepared_test_statements(conn)) == 1
+
+        cur.execute("DEALLOCATE ALL")
+        with pytest.raises(errors.InvalidSqlStatementName):
+            db.execute_prepared(cur, "test_add", sql, (2,))
+        assert not conn.prepared_statements
+        conn.rollback()
+
+        db.execute_prepared(cur, "test_add", sql, (3,))
+        assert cur.fetchone()["n"] == 4
+        assert len(_prepared_test_statements(conn)) == 1
@@ -1,9 +1,208 @@
 import sys
 import random
+import threading
 import time
-from datetime import datetime
+from datetime import datetime, date
+import psycopg2
 from PyQt5.QtCore import QThread, pyqtSignal
 from database import dao
+from database.records import MemberName
+
+
+class AccessLogWriter:
+    """
+    Turnike olaylarini biriktirip toplu yazan tampon.
+
+    Olaylar zaman damgasiyla birlikte sirayla tampona eklenir ve tek bir
+    cok satirli INSERT ile yazilir: tampon `max_batch` olaya ulasinca ya da
+    en gec `flush_interval` saniyede bir. Yazmalar tek tek siralanir (ayni anda
+    tek flush). close() kalan her seyi yazar.
+
+    Hata durumlari:
+    - Kalici hata (silinmis uyeye FK, bolum yok, gecersiz veri): toplu yazma
+      ikiye bolunerek tekrarlanir, sadece hatali satirlar atilir ve loglanir;
+      digerleri yazilir. Tek bozuk satir kuyrugu tikamaz.
+    - Gecici hata (baglanti koptu vb.): yazilamayanlar sira bozulmadan tamponun
+      basina geri konur. Ust uste `max_retries` basarisiz denemeden sonra o
+      olaylar atilir. Tampon en fazla `max_buffer` olay tutar, tasarsa en
+      eskiler atilir. Atilan olaylarin sayisi `dropped`'ta tutulur.
+    """
+
+    def __init__(self, max_batch=50, flush_interval=1.0, max_retries=60, max_buffer=10000):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.max_buffer = max_buffer
+        self.dropped = 0
+
+        self._buffer = []  # [(user_id, action_type, created_at), ...]
+        self._retries = 0  # ust uste basarisiz flush sayisi
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def add(self, user_id, action_type, created_at=None):
+        """Olayi tampona ekle (DB'ye gitmez, aninda doner)."""
+        with self._buffer_lock:
+            self._buffer.append((user_id, action_type, created_at or datetime.now()))
+            self._trim()
+            full = len(self._buffer) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def _trim(self):
+        # Kilit altinda cagrilmali: tasan en eski olaylari at
+        extra = len(self._buffer) - self.max_buffer
+        if extra > 0:
+            del self._buffer[:extra]
+            self._drop(extra, "tampon dolu")
+
+    def _drop(self, count, reason):
+        self.dropped += count
+        print(f"Turnike: {count} olay atildi ({reason})")
+
+    def flush(self):
+        """Tampondaki olaylari yaz. Yazilan olay sayisini dondurur."""
+        with self._flush_lock:
+            with self._buffer_lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+
+            written = 0
+            pending = [batch]  # sirayla yazilacak parcalar
+            while pending:
+                chunk = pending.pop(0)
+                try:
+                    written += dao.add_access_logs(chunk)
+                except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+                    if len(chunk) == 1:
+                        self._drop(1, f"{chunk[0]}: {str(e).splitlines()[0]}")
+                    else:
+                        # Hatali satir(lar)i bulmak icin ikiye bol
+                        mid = len(chunk) // 2
+                        pending[:0] = [chunk[:mid], chunk[mid:]]
+                except Exception:
+                    rest = [event for part in [chunk] + pending for event in part]
+                    self._retries += 1
+                    if self._retries >= self.max_retries:
+                        self._retries = 0
+                        self._drop(len(rest), f"{self.max_retries} deneme basarisiz")
+                    else:
+                        # Yazilamayanlari, sonradan gelenlerin onune geri koy
+                        with self._buffer_lock:
+                            self._buffer[:0] = rest
+                            self._trim()
+                    raise
+            self._retries = 0
+            return written
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Turnike log yazma hatasi: {e}")
+
+    def close(self):
+        """
+        Arka plan yaziciyi durdur ve kalan olaylari yaz.
+        Gecici bir hatayla yazilamazsa hatayi yukari iletir (olaylar tamponda kalir).
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.flush()
+
+
+class OccupancyTracker:
+    """
+    Icerideki uyelerin bellekte tutulan listesi.
+
+    Baslangicta bir kez DB'den doldurulur (load), sonra her turnike olayinda
+    artimsal olarak guncellenir. Sayi ve "iceride mi" kontrolleri O(1).
+    Gun degisince (gece yarisi) liste sifirlanir, cunku sayim sadece bugunun
+    loglarina gore yapilir.
+    """
+
+    def __init__(self, writer=None):
+        self._lock = threading.Lock()
+        self._inside = set()
+        self._last_seen = {}  # user_id -> son uygulanan olayin zamani
+        self._day = date.today()
+        # Verilirse olaylar AccessLogWriter ile toplu yazilir
+        self._writer = writer
+
+    def load(self):
+        """Bugunun durumunu DB'den yukle (baslangicta bir kez)."""
+        inside = set(dao.get_inside_user_ids())
+        with self._lock:
+            self._inside = inside
+            self._last_seen = {}
+            self._day = date.today()
+
+    def _check_day(self):
+        # Kilit altinda cagrilmali
+        today = date.today()
+        if today != self._day:
+            self._inside.clear()
+            self._last_seen.clear()
+            self._day = today
+
+    def apply(self, user_id, action_type, created_at=None):
+        """
+        DB'ye zaten yazilmis bir olayi duruma uygula.
+        Ayni olay birden fazla kez gelebilir (yerel turnike + NOTIFY); ayni
+        uye icin daha yeni bir olaydan eski olanlar yok sayilir.
+        """
+        created_at = created_at or datetime.now()
+        with self._lock:
+            self._check_day()
+            if created_at.date() != self._day:
+                return
+            last = self._last_seen.get(user_id)
+            if last is not None and created_at < last:
+                return
+            self._last_seen[user_id] = created_at
+            if action_type == "GİRİŞ":
+                self._inside.add(user_id)
+            else:
+                self._inside.discard(user_id)
+
+    def record(self, user_id, action_type):
+        """Olayi DB'ye yaz (ya da yazma tamponuna ekle) ve durumu guncelle."""
+        created_at = datetime.now()
+        if self._writer is not None:
+            self._writer.add(user_id, action_type, created_at)
+        elif not dao.add_access_log(user_id, action_type):
+            return False
+        self.apply(user_id, action_type, created_at)
+        return True
+
+    def is_inside(self, user_id):
+        with self._lock:
+            self._check_day()
+            return user_id in self._inside
+
+    def inside_ids(self):
+        """Icerideki uye ID'lerinin kopyasi."""
+        with self._lock:
+            self._check_day()
+            return list(self._inside)
+
+    @property
+    def count(self):
+        with self._lock:
+            self._check_day()
+            return len(self._inside)
 
 
 class TurnikeWorker(QThread):
@@ -15,8 +214,14 @@ class TurnikeWorker(QThread):
         super().__init__()
         self.calisiyor = True
 
-        # Ensure table exists
-        dao.ensure_access_log_table()
+        # access_logs tablosu / bolumleri AnaSayfa'nin (arka plandaki) bolum
+        # bakiminda garantilenir; worker ondan sonra baslatilir
+
+        # Loglar tamponlanip toplu yazilir (AnaSayfa kapanirken flush edilir)
+        self.yazici = AccessLogWriter()
+
+        # Icerideki uyeler (run() basinda DB'den bir kez yuklenir)
+        self.takip = OccupancyTracker(self.yazici)
 
         # Zamanlayicilar (saniye cinsinden)
         self.giris_bekleme = random.randint(1, 20)  # 1-4 saniye
@@ -26,6 +231,13 @@ class TurnikeWorker(QThread):
         self.gecen_sure_cikis = 0
 
     def run(self):
+        self.yazici.start()
+        try:
+            self.takip.load()
+            self.sayac_sinyali.emit(self.takip.count)
+        except Exception as e:
+            print(f"Simulasyon baslangic hatasi: {e}")
+
         while self.calisiyor:
             time.sleep(1)
             self.gecen_sure_giris += 1
@@ -43,64 +255,45 @@ class TurnikeWorker(QThread):
                 self.gecen_sure_cikis = 0
                 self.cikis_bekleme = random.randint(2, 6)
 
-    def get_currently_inside_ids(self):
-        """Helper to find who is inside based on DB logs"""
-        logs = dao.get_todays_access_logs()
-        inside_ids = set()
-        # Logs are ordered DESC (latest first)
-        processed_users = set()
-
-        for log in logs:
-            uid = log["user_id"]
-            if uid not in processed_users:
-                if log["action_type"] == "GİRİŞ":
-                    inside_ids.add(uid)
-                processed_users.add(uid)
-        return inside_ids
-
     def giris_yap(self):
         try:
-            uyeler = dao.get_all_users()
-            if not uyeler:
-                return
-
-            inside_ids = self.get_currently_inside_ids()
+            # Iceride olmayanlardan rastgele bir uye (tek indeksli sorgu,
+            # tum uye listesi okunmaz)
+            uye = dao.get_random_user(self.takip.inside_ids(), records=MemberName)
 
-            # Rastgele bir uye sec (iceride olmayanlardan)
-            disaridakiler = [u for u in uyeler if u["id"] not in inside_ids]
-
-            if disaridakiler:
-                uye = random.choice(disaridakiler)
-                uye_id = uye["id"]
+            if uye:
+                uye_id = uye.id
 
                 # DB'ye kaydet
-                dao.add_access_log(uye_id, "GİRİŞ")
+                if not self.takip.record(uye_id, "GİRİŞ"):
+                    return
 
                 # Bilgileri hazirla
-                ad_soyad = f"{uye['first_name']} {uye['last_name']}"
-                program = uye.get("program_name") or "Program Yok"
+                ad_soyad = f"{uye.first_name} {uye.last_name}"
+                program = uye.program_name or "Program Yok"
                 zaman = datetime.now().strftime("%H:%M")
 
                 # Signal gonder
                 self.log_sinyali.emit(zaman, "GİRİŞ", ad_soyad, program)
-                self.sayac_sinyali.emit(dao.get_inside_count())
+                self.sayac_sinyali.emit(self.takip.count)
 
         except Exception as e:
             print(f"Simulasyon giris hatasi: {e}")
 
     def cikis_yap(self):
         try:
-            inside_ids = list(self.get_currently_inside_ids())
+            inside_ids = self.takip.inside_ids()
             if not inside_ids:
                 return
 
             # Iceridekilerden rastgele sec
             uye_id = random.choice(inside_ids)
-            uye = dao.get_user(uye_id)
+            uye = dao.get_user(uye_id, columns=("first_name", "last_name", "program_name"))
 
             if uye:
                 # DB'ye kaydet
-                dao.add_access_log(uye_id, "ÇIKIŞ")
+                if not self.takip.record(uye_id, "ÇIKIŞ"):
+                    return
 
                 # Bilgileri hazirla
                 ad_soyad = f"{uye['first_name']} {uye['last_name']}"
@@ -109,7 +302,7 @@ class TurnikeWorker(QThread):
 
                 # Signal gonder
                 self.log_sinyali.emit(zaman, "ÇIKIŞ", ad_soyad, program)
-                self.sayac_sinyali.emit(dao.get_inside_count())
+                self.sayac_sinyali.emit(self.takip.count)
 
         except Exception as e:
             print(f"Simulasyon cikis hatasi: {e}")
@@ -1,27 +1,52 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QPushButton, QTabWidget, QTableWidget,
-                             QTableWidgetItem, QHeaderView, QLineEdit, QMessageBox)
-from PyQt5.QtCore import Qt
+                             QTableWidgetItem, QTableView, QHeaderView, QLineEdit,
+                             QMessageBox, QAbstractItemView)
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
 
 from uye_islemleri import UyeIslemleri
 from paket_yonetimi import PaketYonetimi
 from odeme_ekrani import OdemeEkrani
 from database import dao
+from database.records import MemberRow
 from uye_guncelle_dialog import UyeGuncelleDialog
 from uyelik_yenile_dialog import UyelikYenileDialog
 from program_yonetimi import ProgramYonetimiWidget
 from program_ata_dialog import ProgramAtaDialog
 from program_goruntule_dialog import ProgramGoruntuleDialog
+from collections import deque
 from datetime import datetime
 from PyQt5.QtWidgets import QListWidget
 from turnike_simulasyon import TurnikeWorker
+from canli_dinleyici import CanliDinleyici
+from uye_tablo_modeli import UyeTabloModeli, uye_proxy_modeli
+from async_dao import AsyncDao
+from gecikmeli_arama import GecikmeliArama
 
 
 class AnaSayfa(QMainWindow):
+    # Üye aramasında gösterilecek en fazla sonuç
+    ARAMA_LIMITI = 200
+    # Yazma durduktan kaç ms sonra arama yapılır
+    ARAMA_GECIKMESI_MS = 300
+    # Üye listesinde bir seferde yüklenen satır (kaydırdıkça sonraki sayfa gelir)
+    SAYFA_BOYUTU = 200
+    # Canlı turnike log tablosunda tutulan en fazla satır
+    LOG_LIMITI = 100
+    # Tabloya eklenmiş diye hatırlanan en fazla log ID'si (tekrarları eler)
+    GORULEN_LOG_LIMITI = 1000
+    # Süresi biten üyelikleri pasife alan taramanın aralığı
+    SURE_TARAMA_ARALIGI_MS = 5 * 60 * 1000
+    # access_logs bölüm (partition) bakımının aralığı; uygulama aylarca açık
+    # kalsa da gelecek ayların bölümleri önceden oluşur
+    BOLUM_BAKIM_ARALIGI_MS = 6 * 60 * 60 * 1000
+
     def __init__(self, kullanici_adi):
         super().__init__()
         self.kullanici_adi = kullanici_adi
+        # Liste/istatistik sorgulari GUI thread'i disinda calisir
+        self.async_dao = AsyncDao(self)
         
         self.setWindowTitle("Spor Salonu Yönetim Sistemi")
         self.setGeometry(100, 100, 1400, 800)
@@ -177,9 +202,6 @@ class AnaSayfa(QMainWindow):
         return header
     
     def create_dashboard(self):
-        # Tabloyu garantile
-        dao.ensure_access_log_table()
-        
         widget = QWidget()
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
@@ -189,22 +211,23 @@ class AnaSayfa(QMainWindow):
         stats_layout = QHBoxLayout()
         stats_layout.setSpacing(15)
         
-        # Toplam uye sayisi (sadece aktif)
-        uyeler = dao.get_all_users()
-        toplam_uye = len(uyeler)
-        
-        # Aktif uyelikler (status == 'Aktif')
-        aktif_uyelik = sum(1 for u in uyeler if u.get('status') == 'Aktif')  
-        
-        stats_layout.addWidget(self.create_stat_card("Toplam Uye", str(toplam_uye), "#2c3e50"))
-        stats_layout.addWidget(self.create_stat_card("Aktif Uyelik", str(aktif_uyelik), "#34495e"))
+        # Kart degerleri tek sorguyla (istatistikleri_guncelle) doldurulur
+        self.toplam_uye_karti = self.create_stat_card("Toplam Uye", "0", "#2c3e50")
+        self.aktif_uyelik_karti = self.create_stat_card("Aktif Uyelik", "0", "#34495e")
+        stats_layout.addWidget(self.toplam_uye_karti)
+        stats_layout.addWidget(self.aktif_uyelik_karti)
         
         # Icerideki Uye Karti (Turnike Simulasyonu)
         self.icerideki_label = self.create_stat_card("İçerideki Üye", "0", "#e67e22")
         stats_layout.addWidget(self.icerideki_label)
         
         # Paket Sayisi
-        stats_layout.addWidget(self.create_stat_card("Paket Sayisi", str(len(dao.get_all_packages())), "#16213e"))
+        self.paket_karti = self.create_stat_card("Paket Sayisi", "0", "#16213e")
+        stats_layout.addWidget(self.paket_karti)
+        
+        # Bugunku Gelir
+        self.gelir_karti = self.create_stat_card("Bugünkü Gelir", "0.00 TL", "#27ae60")
+        stats_layout.addWidget(self.gelir_karti)
         
         layout.addLayout(stats_layout)
         
@@ -247,16 +270,44 @@ class AnaSayfa(QMainWindow):
         log_layout.addWidget(self.log_tablosu)
         layout.addLayout(log_layout)
         
-        # Baslangic verilerini yukle
-        self.loglari_yukle()
-        self.icerideki_label.layout().itemAt(1).widget().setText(str(dao.get_inside_count()))
-        
-        # Worker baslat (Eger zaten calismiyorsa)
-        if not hasattr(self, 'turnike_worker'):
-            self.turnike_worker = TurnikeWorker()
-            self.turnike_worker.log_sinyali.connect(self.log_ekle)
-            self.turnike_worker.sayac_sinyali.connect(self.icerideki_guncelle)
-            self.turnike_worker.start()
+        # Baslangic verilerini yukle (arka planda; sonuclar gelince dolar)
+        # Sira numaralari commit'ten once dagitilir, NOTIFY'lar commit sirasiyla
+        # gelir: "en buyuk ID" yerine gorulen ID'ler (sinirli) tutulur
+        self.gorulen_log_sirasi = deque(maxlen=self.GORULEN_LOG_LIMITI)
+        self.gorulen_log_idleri = set()
+        # Tam yukleme surerken NOTIFY ile gelen loglar (sonuc gelince eklenir)
+        self.yuklenirken_gelenler = None
+        if hasattr(self, 'turnike_worker'):
+            self.dashboard_verilerini_yukle()
+        else:
+            # Ilk acilis: access_logs tablosu / bolumleri once garantilenir (arka
+            # planda, tek sefer); veriler ve turnike worker'i ardindan baslar
+            self.log_bolumlerini_bakimla(sonra=self.dashboard_verilerini_yukle)
+        
+        # Diger terminallerin degisikliklerini dinle (LISTEN/NOTIFY)
+        if not hasattr(self, 'canli_dinleyici'):
+            self.istatistik_zamanlayici = QTimer(self)
+            self.istatistik_zamanlayici.setSingleShot(True)
+            self.istatistik_zamanlayici.setInterval(500)
+            self.istatistik_zamanlayici.timeout.connect(self.istatistikleri_guncelle)
+            
+            self.canli_dinleyici = CanliDinleyici()
+            self.canli_dinleyici.log_sinyali.connect(self.canli_log_ekle)
+            self.canli_dinleyici.degisiklik_sinyali.connect(self.canli_degisiklik)
+            self.canli_dinleyici.start()
+            
+            # Suresi biten uyelikleri periyodik olarak pasife al (acilista bir kez)
+            self.sure_tarama_zamanlayici = QTimer(self)
+            self.sure_tarama_zamanlayici.setInterval(self.SURE_TARAMA_ARALIGI_MS)
+            self.sure_tarama_zamanlayici.timeout.connect(self.suresi_dolanlari_tara)
+            self.sure_tarama_zamanlayici.start()
+            self.suresi_dolanlari_tara()
+            
+            # Log bolumlerini periyodik olarak ileriye dogru olustur
+            self.bolum_bakim_zamanlayici = QTimer(self)
+            self.bolum_bakim_zamanlayici.setInterval(self.BOLUM_BAKIM_ARALIGI_MS)
+            self.bolum_bakim_zamanlayici.timeout.connect(self.log_bolumlerini_bakimla)
+            self.bolum_bakim_zamanlayici.start()
         
     
         
@@ -293,12 +344,11 @@ class AnaSayfa(QMainWindow):
         widget.setLayout(layout)
         return widget
     def dashboard_yenile(self):
-        """Dashboard istatistiklerini yenile."""
+        """Dashboard istatistiklerini yenile (widget'lar yeniden olusturulmaz)."""
         try:
-            # Ana Sayfa tab'ini yeniden olustur
-            self.tabs.removeTab(0)
-            self.tabs.insertTab(0, self.create_dashboard(), 'Ana Sayfa')
-            self.tabs.setCurrentIndex(0)
+            self.istatistikleri_guncelle()
+            # Sadece henuz gosterilmemis loglari ekle
+            self.yeni_loglari_yukle()
         except Exception as e:
             print(f"Dashboard yenileme hatasi: {e}")
     
@@ -332,9 +382,26 @@ class AnaSayfa(QMainWindow):
 
     def loglari_yukle(self):
         """Bugunun loglarini DB'den yukle"""
-        # DB'den [Newest, ..., Oldest] geliyor
-        logs = dao.get_todays_access_logs()
+        # DB'den [Newest, ..., Oldest] geliyor; tablo en fazla LOG_LIMITI satir tutar
+        self.yuklenirken_gelenler = []
+        self.async_dao.calistir('loglar', dao.get_todays_access_logs,
+                                limit=self.LOG_LIMITI, records=True,
+                                basarili=self._loglari_goster)
+    
+    def _log_yeni_mi(self, log_id):
+        """Log tabloya daha once eklenmediyse gorulenlere kaydet ve True dondur."""
+        if log_id in self.gorulen_log_idleri:
+            return False
+        if len(self.gorulen_log_sirasi) == self.gorulen_log_sirasi.maxlen:
+            self.gorulen_log_idleri.discard(self.gorulen_log_sirasi[0])
+        self.gorulen_log_sirasi.append(log_id)
+        self.gorulen_log_idleri.add(log_id)
+        return True
+    
+    def _loglari_goster(self, logs):
         self.log_tablosu.setRowCount(0)
+        self.gorulen_log_sirasi.clear()
+        self.gorulen_log_idleri.clear()
         
         # En yeni log en ustte olmali.
         # DB'den gelen listeyi ters cevirirsek [Oldest, ..., Newest] olur.
@@ -345,18 +412,145 @@ class AnaSayfa(QMainWindow):
         # ...
         # Son. Newest -> Tablo[0].
         # Sonuc: [Newest, ..., Oldest]. Bu istedigimiz sey.
+        self._loglari_ekle(logs)
+        
+        # Sorgu beklenirken NOTIFY ile gelen (sonucta olmayan) loglari da ekle
+        gelenler, self.yuklenirken_gelenler = self.yuklenirken_gelenler or [], None
+        for log in gelenler:
+            if self._log_yeni_mi(log['id']):
+                self._canli_logu_tabloya_ekle(log)
+
+    def yeni_loglari_yukle(self):
+        """Bugunun en yeni loglarindan tabloda olmayanlari en uste ekle."""
+        # Canli dinleyici yokken yerel worker loglari ID'siz eklenir;
+        # bu durumda tabloyu bastan yukle ki ayni log iki kez gorunmesin
+        if not (hasattr(self, 'canli_dinleyici') and self.canli_dinleyici.bagli):
+            self.loglari_yukle()
+            return
         
+        # Gec commit edilen (dusuk ID'li) loglar da gelsin diye "ID'den sonra"
+        # degil, son LOG_LIMITI log okunur; tekrarlari gorulen ID'ler eler
+        self.async_dao.calistir('loglar', dao.get_todays_access_logs,
+                                limit=self.LOG_LIMITI, records=True,
+                                basarili=self._loglari_ekle)
+    
+    def _loglari_ekle(self, logs):
         for log in reversed(logs):
-             zaman = log.get('time_str', '')
-             islem = log.get('action_type', '')
-             ad_soyad = f"{log.get('first_name', '')} {log.get('last_name', '')}"
-             program = log.get('program_name') or "Program Yok"
-             self.log_ekle_tablo(zaman, islem, ad_soyad, program)
+            if not self._log_yeni_mi(log.id):
+                continue  # Zaten tabloda (NOTIFY ya da onceki yukleme)
+            ad_soyad = f"{log.first_name} {log.last_name}"
+            program = log.program_name or "Program Yok"
+            self.log_ekle_tablo(log.created_at.strftime("%H:%M:%S"), log.action_type, ad_soyad, program)
 
     def log_ekle(self, zaman, islem, ad_soyad, program):
         """Worker'dan gelen sinyal ile tabloya ekle. Signal imzasi: str, str, str, str"""
+        # Canli dinleyici bagliysa ayni olay NOTIFY ile de gelecek
+        if hasattr(self, 'canli_dinleyici') and self.canli_dinleyici.bagli:
+            return
         self.log_ekle_tablo(zaman, islem, ad_soyad, program)
 
+    def canli_log_ekle(self, log):
+        """NOTIFY ile gelen (herhangi bir terminaldeki) turnike logunu ekle."""
+        # Icerideki sayisini yerel takip uzerinden guncelle. Her olay uygulanir:
+        # apply() ayni olayin tekrarini ve eski olaylari zaten yok sayar
+        if hasattr(self, 'turnike_worker'):
+            takip = self.turnike_worker.takip
+            takip.apply(log.get('user_id'), log.get('action_type'), log.get('created_at'))
+            self.icerideki_guncelle(takip.count)
+        
+        if log.get('id') is not None:
+            if self.yuklenirken_gelenler is not None:
+                # Tam yukleme suruyor: tablo sonuc gelince yeniden kurulacak
+                self.yuklenirken_gelenler.append(log)
+                return
+            # Yenile butonu / gec gelen NOTIFY bu logu tekrar eklemesin
+            if not self._log_yeni_mi(log['id']):
+                return
+        self._canli_logu_tabloya_ekle(log)
+    
+    def _canli_logu_tabloya_ekle(self, log):
+        created_at = log.get('created_at')
+        zaman = created_at.strftime("%H:%M:%S") if created_at else ''
+        ad_soyad = f"{log.get('first_name') or ''} {log.get('last_name') or ''}"
+        program = log.get('program_name') or "Program Yok"
+        self.log_ekle_tablo(zaman, log.get('action_type', ''), ad_soyad, program)
+
+    def canli_degisiklik(self, tablo, islem):
+        """Uye / uyelik degisikligi: istatistikleri kisa bir gecikmeyle (toplu) yenile."""
+        self.istatistik_zamanlayici.start()
+        # Onbellekteki arama sonuclari artik eski olabilir
+        if hasattr(self, 'uye_arama'):
+            self.uye_arama.onbellegi_temizle()
+
+    def suresi_dolanlari_tara(self):
+        """Suresi biten uyeleri tek sorguyla pasife al (arka planda)."""
+        self.async_dao.calistir('sure_taramasi', dao.expire_memberships,
+                                basarili=self._suresi_dolanlar_geldi,
+                                hata=lambda e: print(f"Sure taramasi hatasi: {e}"))
+    
+    def dashboard_verilerini_yukle(self):
+        """Istatistikleri ve loglari yukle, turnike worker'ini baslat (calismiyorsa)."""
+        self.istatistikleri_guncelle()
+        self.loglari_yukle()
+        
+        if not hasattr(self, 'turnike_worker'):
+            self.turnike_worker = TurnikeWorker()
+            self.turnike_worker.log_sinyali.connect(self.log_ekle)
+            self.turnike_worker.sayac_sinyali.connect(self.icerideki_guncelle)
+            self.turnike_worker.start()
+    
+    def log_bolumlerini_bakimla(self, sonra=None):
+        """
+        Eksik access_logs tablosunu / bolumlerini olustur (arka planda).
+        Verilirse sonra() is bitince (hata olsa da) GUI thread'inde cagrilir.
+        """
+        def basarili(_):
+            if sonra is not None:
+                sonra()
+        
+        def hata(e):
+            print(f"Log bolum bakimi hatasi: {e}")
+            if sonra is not None:
+                sonra()
+        
+        self.async_dao.calistir('bolum_bakimi', dao.ensure_access_log_table,
+                                basarili=basarili, hata=hata)
+    
+    def _suresi_dolanlar_geldi(self, degisenler):
+        if not degisenler:
+            return
+        self.statusBar().showMessage(f'{len(degisenler)} üyenin üyelik süresi doldu (Pasif).', 10000)
+        # Arama yoksa listeyi yenile (aramada sonuc onbellegi canli_degisiklik ile temizlenir)
+        if not self.arama_input.text().strip():
+            self.uyeleri_yukle()
+    
+    def kart_guncelle(self, kart, deger):
+        """Istatistik kartinin deger labelini gunceller."""
+        deger_label = kart.layout().itemAt(1).widget()
+        if isinstance(deger_label, QLabel):
+            deger_label.setText(str(deger))
+
+    def istatistikleri_guncelle(self):
+        """Dashboard kartlarini tek bir istatistik sorgusuyla yenile."""
+        self.async_dao.calistir('istatistik', dao.get_dashboard_stats,
+                                basarili=self._istatistikleri_goster,
+                                hata=lambda e: print(f"Istatistik guncelleme hatasi: {e}"))
+    
+    def _istatistikleri_goster(self, stats):
+        try:
+            self.kart_guncelle(self.toplam_uye_karti, stats['total_members'])
+            self.kart_guncelle(self.aktif_uyelik_karti, stats['active_subscriptions'])
+            self.kart_guncelle(self.paket_karti, stats['package_count'])
+            self.kart_guncelle(self.gelir_karti, f"{stats['todays_revenue']:,.2f} TL")
+            
+            # Turnike calisiyorsa yerel takip (tamponda bekleyen olaylar dahil) daha guncel
+            if hasattr(self, 'turnike_worker'):
+                self.icerideki_guncelle(self.turnike_worker.takip.count)
+            else:
+                self.icerideki_guncelle(stats['inside_count'])
+        except Exception as e:
+            print(f"Istatistik guncelleme hatasi: {e}")
+
     def log_ekle_tablo(self, zaman, islem, ad_soyad, program):
         """Tabloya satir ekleme islemi (En uste)"""
         self.log_tablosu.insertRow(0)
@@ -384,8 +578,8 @@ class AnaSayfa(QMainWindow):
         self.log_tablosu.setItem(0, 3, item_prog)
         
         # Temizlik
-        if self.log_tablosu.rowCount() > 100:
-            self.log_tablosu.removeRow(100)
+        if self.log_tablosu.rowCount() > self.LOG_LIMITI:
+            self.log_tablosu.removeRow(self.LOG_LIMITI)
             
     def icerideki_guncelle(self, sayi):
         """Icerideki uye sayisini gunceller."""
@@ -423,6 +617,14 @@ class AnaSayfa(QMainWindow):
                 border: 2px solid #e94560;
             }
         """)
+        # Yazarken her tusta degil, duraklamada tek (sinirli) sorgu
+        self.uye_arama = GecikmeliArama(
+            self.async_dao, 'uye_arama',
+            lambda metin: dao.search_users(metin, limit=self.ARAMA_LIMITI, records=MemberRow),
+            gecikme_ms=self.ARAMA_GECIKMESI_MS,
+        )
+        self.uye_arama.sonuc_hazir.connect(self._arama_sonucu_geldi)
+        self.uye_arama.temizlendi.connect(self.uyeleri_yukle)
         self.arama_input.textChanged.connect(self.uye_ara)
         
         yenile_btn = QPushButton('🔄 Yenile')
@@ -527,12 +729,18 @@ class AnaSayfa(QMainWindow):
         arama_layout.addWidget(yenile_btn)
         layout.addLayout(arama_layout)
         
-        # Tablo
-        self.uye_tablosu = QTableWidget()
-        self.uye_tablosu.setColumnCount(9)
-        self.uye_tablosu.setHorizontalHeaderLabels(['ID', 'Ad Soyad', 'TC No', 
-                                                     'Telefon', 'E-posta', 'Paket', 
-                                                     'Başlangıç', 'Bitiş', 'Durum'])
+        # Tablo (model/view: sadece gorunen satirlar cizilir)
+        self.uye_modeli = UyeTabloModeli(self.async_dao, self)
+        self.uye_proxy = uye_proxy_modeli(self.uye_modeli, self)
+        self.uye_tablosu = QTableView()
+        self.uye_tablosu.setModel(self.uye_proxy)
+        self.uye_tablosu.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.uye_tablosu.setSelectionMode(QAbstractItemView.SingleSelection)
+        # Başlıktan sıralama kapalı: liste sunucudan ID sırasıyla sayfa sayfa
+        # gelir; istemcide sıralamak sadece yüklenen satırları dizer ve sonraki
+        # sayfalar bu sıranın arasına karışırdı
+        self.uye_tablosu.setSortingEnabled(False)
+        self.uye_tablosu.verticalHeader().setVisible(False)
         
         # Sütun genişliklerini ayarla
         self.uye_tablosu.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
@@ -541,13 +749,13 @@ class AnaSayfa(QMainWindow):
         
         self.uye_tablosu.setAlternatingRowColors(True)
         self.uye_tablosu.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #dfe4ea;
                 background-color: white;
                 border: 1px solid #dfe4ea;
                 border-radius: 8px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
             QHeaderView::section {
@@ -566,78 +774,43 @@ class AnaSayfa(QMainWindow):
         return widget
     
     def uyeleri_yukle(self):
-        uyeler = dao.get_all_users()
-        self._uyeleri_tabloya_yukle(uyeler)
+        # Liste yenileniyor (kayit degismis olabilir): bekleyen aramayi ve eski sonuclari birak
+        self.uye_arama.iptal_et()
+        self.uye_arama.onbellegi_temizle()
+        # Ilk sayfa hemen cizilir, devami kaydirdikca (keyset) yuklenir
+        self.uye_modeli.sayfali_yukle(
+            lambda after_id, limit: dao.get_users_page(after_id, limit, records=MemberRow),
+            self.SAYFA_BOYUTU,
+        )
     
     def _uyeleri_tabloya_yukle(self, uyeler):
         """Helper method to load users into table"""
-        self.uye_tablosu.setRowCount(len(uyeler))
-        
-        for i, uye in enumerate(uyeler):
-            # PostgreSQL dict format: {id, first_name, last_name, tc_number, phone, email, program_name, ...}
-            id_val = str(uye.get('id', ''))
-            ad_soyad = f"{uye.get('first_name', '')} {uye.get('last_name', '')}"
-            tc_no = uye.get('tc_number', '')
-            telefon = uye.get('phone', '') or '-'
-            email = uye.get('email', '') or '-'
-            program_name = uye.get('program_name', '') or '-'
-            
-            # Üyelik bilgilerini al
-            subscriptions = dao.get_user_subscriptions(uye.get('id'))
-            baslangic = subscriptions[0].get('start_date', '') if subscriptions else '-'
-            bitis = subscriptions[0].get('end_date', '') if subscriptions else '-'
-            
-            # Durum hesapla (Bitiş tarihi >= Şu an ise Aktif)
-            durum = 'Pasif'
-            durum_renk = Qt.red
-            
-            if subscriptions:
-                end_date = subscriptions[0].get('end_date')
-                if end_date and isinstance(end_date, datetime):
-                    if datetime.now() <= end_date:
-                        durum = 'Aktif'
-                        durum_renk = Qt.darkGreen
-            
-            data = [id_val, ad_soyad, tc_no, telefon, email, program_name, str(baslangic), str(bitis), durum]
-            
-            for j, veri in enumerate(data):
-                item = QTableWidgetItem(str(veri) if veri else "-")
-                item.setTextAlignment(Qt.AlignCenter)
-                
-                # Durum sütunu renklendirme
-                if j == 8:
-                    item.setForeground(durum_renk)
-                    item.setFont(QFont('Arial', 11, QFont.Bold))
-                
-                self.uye_tablosu.setItem(i, j, item)
+        self.uye_modeli.uyeleri_ayarla(uyeler)
     
     def uye_ara(self):
-        arama = self.arama_input.text()
-        # PostgreSQL'de arama fonksiyonu yok, tüm üyeleri al ve filtrele
-        uyeler = dao.get_all_users()
-        
-        if arama:
-            arama_lower = arama.lower()
-            uyeler = [
-                u for u in uyeler 
-                if arama_lower in (u.get('first_name', '') + ' ' + u.get('last_name', '')).lower()
-                or arama_lower in u.get('tc_number', '')
-                or arama_lower in u.get('phone', '')
-            ]
-        
+        # Filtreleme PostgreSQL'de yapılıyor (indeksli arama, sonuç sınırlı);
+        # bos metin tam listeye doner (temizlendi -> uyeleri_yukle)
+        self.uye_arama.metin_degisti(self.arama_input.text())
+    
+    def _arama_sonucu_geldi(self, metin, uyeler):
         self._uyeleri_tabloya_yukle(uyeler)
     
+    def secili_uye(self):
+        """Secili uyenin (id, ad soyad) bilgisini dondurur; secim yoksa None."""
+        secili = self.uye_tablosu.selectionModel().selectedRows()
+        if not secili:
+            return None
+        satir = self.uye_proxy.mapToSource(secili[0]).row()
+        return self.uye_modeli.uye_id(satir), self.uye_modeli.ad_soyad(satir)
+    
     def secili_uye_sil(self):
         # Seçili satırı al
-        secili_satirlar = self.uye_tablosu.selectedItems()
-        if not secili_satirlar:
+        secili = self.secili_uye()
+        if secili is None:
             QMessageBox.warning(self, 'Uyarı', 'Lütfen silmek için bir üye seçin!')
             return
         
-        # İlk sütundaki ID'yi al
-        satir = secili_satirlar[0].row()
-        uye_id = int(self.uye_tablosu.item(satir, 0).text())
-        uye_ad = self.uye_tablosu.item(satir, 1).text()
+        uye_id, uye_ad = secili
         
         # Onay al
         reply = QMessageBox.question(
@@ -671,13 +844,12 @@ class AnaSayfa(QMainWindow):
 
     def uye_duzenle(self):
         """Seçili üyeyi düzenle."""
-        secili_satirlar = self.uye_tablosu.selectedItems()
-        if not secili_satirlar:
+        secili = self.secili_uye()
+        if secili is None:
             QMessageBox.warning(self, 'Uyarı', 'Lütfen düzenlemek için bir üye seçin!')
             return
         
-        satir = secili_satirlar[0].row()
-        uye_id = int(self.uye_tablosu.item(satir, 0).text())
+        uye_id, _ = secili
         
         # Güncelleme dialog'unu aç
         dialog = UyeGuncelleDialog(uye_id, self)
@@ -686,14 +858,12 @@ class AnaSayfa(QMainWindow):
     
     def uyelik_yenile(self):
         """Seçili üyenin üyeliğini yenile."""
-        secili_satirlar = self.uye_tablosu.selectedItems()
-        if not secili_satirlar:
+        secili = self.secili_uye()
+        if secili is None:
             QMessageBox.warning(self, 'Uyarı', 'Lütfen üyelik yenilemek için bir üye seçin!')
             return
         
-        satir = secili_satirlar[0].row()
-        uye_id = int(self.uye_tablosu.item(satir, 0).text())
-        uye_ad = self.uye_tablosu.item(satir, 1).text()
+        uye_id, uye_ad = secili
         
         # Yenileme dialog'unu aç (db parametresi kaldırıldı)
         dialog = UyelikYenileDialog(uye_id, uye_ad, self)
@@ -702,35 +872,41 @@ class AnaSayfa(QMainWindow):
     
     def program_ata(self):
         """Seçili üyeye program atar."""
-        secili_satirlar = self.uye_tablosu.selectedItems()
-        if not secili_satirlar:
+        secili = self.secili_uye()
+        if secili is None:
             QMessageBox.warning(self, 'Uyarı', 'Lütfen program atamak için bir üye seçin!')
             return
         
-        satir = secili_satirlar[0].row()
-        uye_id = int(self.uye_tablosu.item(satir, 0).text())
-        uye_ad = self.uye_tablosu.item(satir, 1).text()
+        uye_id, uye_ad = secili
         
         dialog = ProgramAtaDialog(uye_id, uye_ad, self)
         dialog.exec_()
     
     def program_goruntule(self):
         """Seçili üyenin programını görüntüler."""
-        secili_satirlar = self.uye_tablosu.selectedItems()
-        if not secili_satirlar:
+        secili = self.secili_uye()
+        if secili is None:
             QMessageBox.warning(self, 'Uyarı', 'Lütfen program görüntülemek için bir üye seçin!')
             return
         
-        satir = secili_satirlar[0].row()
-        uye_id = int(self.uye_tablosu.item(satir, 0).text())
-        uye_ad = self.uye_tablosu.item(satir, 1).text()
+        uye_id, uye_ad = secili
         
         dialog = ProgramGoruntuleDialog(uye_id, uye_ad, self)
         dialog.exec_()
     
     def closeEvent(self, event):
+        # Canli dinleyiciyi durdur
+        if hasattr(self, 'canli_dinleyici'):
+            self.canli_dinleyici.durdur()
+            self.canli_dinleyici.wait()
+        
         # Worker'i durdur
         if hasattr(self, 'turnike_worker'):
             self.turnike_worker.durdur()
             self.turnike_worker.wait()
+            # Tamponda bekleyen turnike loglarini yaz
+            try:
+                self.turnike_worker.yazici.close()
+            except Exception as e:
+                print(f"Turnike loglari yazilamadi: {e}")
         event.accept()
\ No newline at end of file
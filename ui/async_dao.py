@@ -0,0 +1,156 @@
+import itertools
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+from database.db import CancelScope, cancellable
+
+# Tüm ekranların paylaştığı iş parçacığı havuzu. Eşzamanlı sorgu sayısı
+# bağlantı havuzunu (PGPOOL_MAX) tüketmesin diye küçük tutulur.
+MAKS_IS_PARCACIGI = 4
+
+_havuz = None
+_sayac = itertools.count(1)
+# Çalışan işlerin Python referansları (iş bitene kadar GC toplamasın)
+_calisanlar = set()
+_calisanlar_kilidi = threading.Lock()
+
+
+def is_havuzu() -> QThreadPool:
+    """DAO işlerinin çalıştığı ortak QThreadPool (ilk kullanımda oluşturulur)"""
+    global _havuz
+    if _havuz is None:
+        _havuz = QThreadPool()
+        _havuz.setMaxThreadCount(MAKS_IS_PARCACIGI)
+    return _havuz
+
+
+def havuzu_kapat(bekleme_ms=5000):
+    """Kuyruktaki işleri bırak, çalışanların bitmesini bekle (uygulama kapanırken)"""
+    if _havuz is not None:
+        _havuz.clear()
+        _havuz.waitForDone(bekleme_ms)
+
+
+class _IsSinyalleri(QObject):
+    # (istek no, başarılı mı, sonuç veya hata)
+    bitti = pyqtSignal(int, bool, object)
+
+
+class _DaoIsi(QRunnable):
+    """Tek bir dao çağrısını havuzdaki bir iş parçacığında çalıştırır"""
+
+    def __init__(self, no, fonksiyon, args, kwargs):
+        super().__init__()
+        # Ömrü Python referanslarıyla yönetilir (iptal sonrası tryTake güvenli olsun)
+        self.setAutoDelete(False)
+        self.no = no
+        self.fonksiyon = fonksiyon
+        self.args = args
+        self.kwargs = kwargs
+        self.iptal = False
+        # iptal_et() çalışan sorguyu bu kapsam üzerinden kestirir
+        self.kapsam = CancelScope()
+        # GUI thread'inde oluşturulur; emit kuyruklu bağlantıyla GUI'ye döner
+        self.sinyaller = _IsSinyalleri()
+
+    def run(self):
+        try:
+            if self.iptal:
+                return
+            try:
+                with cancellable(self.kapsam):
+                    sonuc = self.fonksiyon(*self.args, **self.kwargs)
+                basarili = True
+            except Exception as e:
+                sonuc, basarili = e, False
+            if not self.iptal:
+                self.sinyaller.bitti.emit(self.no, basarili, sonuc)
+        finally:
+            with _calisanlar_kilidi:
+                _calisanlar.discard(self)
+
+
+class AsyncDao(QObject):
+    """
+    database.dao çağrılarını GUI thread'i dışında çalıştıran cephe.
+
+    Her ekran kendi örneğini oluşturur (ekrana parent edilir; ekran
+    kapanınca bekleyen sonuçlar da düşer). Her istek bir anahtarla verilir;
+    aynı anahtarla yeni bir istek gelince öncekinin sonucu yok sayılır,
+    henüz başlamamışsa kuyruktan da çıkarılır, çalışıyorsa o anda
+    veritabanında yürüyen sorgusu da kesilir (conn.cancel()).
+
+        self.async_dao = AsyncDao(self)
+        self.async_dao.calistir('paketler', dao.get_all_packages,
+                                basarili=self.paketleri_goster)
+
+    Sonuç ve hata callback'leri GUI thread'inde çağrılır; ayrıca
+    sonuc_hazir / hata_olustu sinyalleri (anahtar, değer) yayınlanır.
+    """
+    sonuc_hazir = pyqtSignal(str, object)
+    hata_olustu = pyqtSignal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._guncel = {}  # anahtar -> en son istek (_DaoIsi)
+        self._callbackler = {}  # istek no -> (anahtar, basarili, hata)
+
+    def calistir(self, anahtar, fonksiyon, *args, basarili=None, hata=None, **kwargs):
+        """
+        fonksiyon(*args, **kwargs)'ı arka planda çalıştırır, istek numarasını döndürür.
+        Aynı anahtardaki önceki istek iptal edilir.
+        """
+        self.iptal_et(anahtar)
+
+        is_ = _DaoIsi(next(_sayac), fonksiyon, args, kwargs)
+        is_.sinyaller.bitti.connect(self._tamamlandi)
+        self._guncel[anahtar] = is_
+        self._callbackler[is_.no] = (anahtar, basarili, hata)
+
+        with _calisanlar_kilidi:
+            _calisanlar.add(is_)
+        is_havuzu().start(is_)
+        return is_.no
+
+    def iptal_et(self, anahtar):
+        """
+        Anahtardaki isteği iptal et (sonucu hiç teslim edilmez). Henüz
+        başlamadıysa kuyruktan çıkarılır; çalışıyorsa yürüyen sorgusu
+        kesilir ve iş kalan sorgularını çalıştırmadan biter. Sorgu dışında
+        geçen (Python tarafındaki) süre kesilemez.
+        """
+        is_ = self._guncel.pop(anahtar, None)
+        if is_ is None:
+            return
+        is_.iptal = True
+        self._callbackler.pop(is_.no, None)
+        # Henüz başlamadıysa kuyruktan çıkar, başladıysa sorgusunu kes
+        if is_havuzu().tryTake(is_):
+            with _calisanlar_kilidi:
+                _calisanlar.discard(is_)
+        else:
+            is_.kapsam.cancel()
+
+    def bekliyor_mu(self, anahtar):
+        return anahtar in self._guncel
+
+    @pyqtSlot(int, bool, object)
+    def _tamamlandi(self, no, basarili_mi, sonuc):
+        kayit = self._callbackler.pop(no, None)
+        if kayit is None:
+            return  # Daha yeni bir istek tarafından geçersiz kılındı
+        anahtar, basarili, hata = kayit
+        if self._guncel.get(anahtar) is not None and self._guncel[anahtar].no == no:
+            del self._guncel[anahtar]
+
+        if basarili_mi:
+            self.sonuc_hazir.emit(anahtar, sonuc)
+            if basarili is not None:
+                basarili(sonuc)
+        else:
+            self.hata_olustu.emit(anahtar, sonuc)
+            if hata is not None:
+                hata(sonuc)
+            else:
+                print(f"Veritabani istegi hatasi ({anahtar}): {sonuc}")
@@ -0,0 +1,89 @@
+import json
+import select
+import time
+from datetime import datetime
+
+import psycopg2
+import psycopg2.extensions
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from database import dao
+from database.db import get_db_connection
+
+
+class CanliDinleyici(QThread):
+    """
+    PostgreSQL LISTEN/NOTIFY ile diğer terminallerdeki değişiklikleri dinler.
+
+    Kendi (havuz dışı) bağlantısında dao.ACCESS_LOG_CHANNEL ve dao.CHANGE_CHANNEL
+    kanallarını dinler; gelen bildirimleri sinyal olarak GUI thread'ine iletir.
+    Bağlantı koparsa birkaç saniye bekleyip yeniden bağlanır.
+    """
+    # Turnike logu: {id, user_id, action_type, created_at, first_name, last_name, program_name}
+    log_sinyali = pyqtSignal(object)
+    # Üye / üyelik değişikliği: (tablo, işlem)
+    degisiklik_sinyali = pyqtSignal(str, str)
+    # Dinleme durumu (bağlandı / koptu)
+    baglanti_sinyali = pyqtSignal(bool)
+
+    YENIDEN_BAGLANMA_SURESI = 5  # saniye
+
+    def __init__(self):
+        super().__init__()
+        self.calisiyor = True
+        self.bagli = False
+
+    def run(self):
+        while self.calisiyor:
+            conn = None
+            try:
+                conn = get_db_connection()
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cur = conn.cursor()
+                cur.execute(f"LISTEN {dao.ACCESS_LOG_CHANNEL}")
+                cur.execute(f"LISTEN {dao.CHANGE_CHANNEL}")
+                self._durum(True)
+                self._dinle(conn)
+            except Exception as e:
+                print(f"Canli dinleyici hatasi: {e}")
+            finally:
+                self._durum(False)
+                if conn is not None:
+                    conn.close()
+
+            # Yeniden bağlanmadan önce bekle (durdurulursa hemen çık)
+            for _ in range(self.YENIDEN_BAGLANMA_SURESI * 10):
+                if not self.calisiyor:
+                    break
+                time.sleep(0.1)
+
+    def _dinle(self, conn):
+        while self.calisiyor:
+            # 1 saniyede bir uyan ki durdur() çağrısı beklemesin
+            if select.select([conn], [], [], 1.0) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                bildirim = conn.notifies.pop(0)
+                self._isle(bildirim)
+
+    def _isle(self, bildirim):
+        try:
+            veri = json.loads(bildirim.payload)
+        except ValueError:
+            return
+
+        if bildirim.channel == dao.ACCESS_LOG_CHANNEL:
+            if veri.get('created_at'):
+                veri['created_at'] = datetime.fromisoformat(veri['created_at'])
+            self.log_sinyali.emit(veri)
+        elif bildirim.channel == dao.CHANGE_CHANNEL:
+            self.degisiklik_sinyali.emit(veri.get('table', ''), veri.get('op', ''))
+
+    def _durum(self, bagli):
+        if self.bagli != bagli:
+            self.bagli = bagli
+            self.baglanti_sinyali.emit(bagli)
+
+    def durdur(self):
+        self.calisiyor = False
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+class GecikmeliArama(QObject):
+    """
+    Yazdıkça arama için ortak bileşen.
+
+    Metin her değiştiğinde zamanlayıcı yeniden başlar; kullanıcı `gecikme_ms`
+    kadar durunca tek bir sorgu AsyncDao üzerinden arka planda çalışır.
+    Yeni bir sorgu, sonucu henüz gelmemiş öncekini iptal eder. Son
+    `onbellek_boyutu` sorgunun sonucu saklanır; aynı metin tekrar
+    arandığında veritabanına gidilmez.
+
+        self.uye_arama = GecikmeliArama(self.async_dao, 'uye_arama',
+                                        lambda metin: dao.search_users(metin, limit=200))
+        self.arama_input.textChanged.connect(self.uye_arama.metin_degisti)
+        self.uye_arama.sonuc_hazir.connect(self.sonuclari_goster)
+        self.uye_arama.temizlendi.connect(self.tumunu_yukle)
+    """
+    # (arama metni, sonuç)
+    sonuc_hazir = pyqtSignal(str, object)
+    # Arama kutusu boşaldı (tam liste gösterilmeli)
+    temizlendi = pyqtSignal()
+
+    def __init__(self, async_dao, anahtar, arama_fonksiyonu, gecikme_ms=300,
+                 onbellek_boyutu=20, parent=None):
+        super().__init__(parent if parent is not None else async_dao)
+        self.async_dao = async_dao
+        self.anahtar = anahtar
+        self.arama_fonksiyonu = arama_fonksiyonu
+        self.onbellek_boyutu = onbellek_boyutu
+        self._onbellek = OrderedDict()  # metin -> sonuç (en son kullanılan sonda)
+        self._metin = ''
+
+        self._zamanlayici = QTimer(self)
+        self._zamanlayici.setSingleShot(True)
+        self._zamanlayici.setInterval(gecikme_ms)
+        self._zamanlayici.timeout.connect(self._ara)
+
+    @property
+    def gecikme_ms(self):
+        return self._zamanlayici.interval()
+
+    @gecikme_ms.setter
+    def gecikme_ms(self, deger):
+        self._zamanlayici.setInterval(deger)
+
+    @property
+    def metin(self):
+        """Son aranan (boşlukları kırpılmış) metin"""
+        return self._metin
+
+    def metin_degisti(self, metin):
+        """QLineEdit.textChanged'e bağlanır"""
+        self._metin = (metin or '').strip()
+        if not self._metin:
+            self.iptal_et()
+            self.temizlendi.emit()
+            return
+        self._zamanlayici.start()
+
+    def simdi_ara(self):
+        """Beklemeden (ör. Enter / Yenile) mevcut metni ara"""
+        if self._metin:
+            self._zamanlayici.stop()
+            self._ara()
+
+    def iptal_et(self):
+        """Bekleyen zamanlayıcıyı ve sürmekte olan sorguyu iptal et"""
+        self._zamanlayici.stop()
+        self.async_dao.iptal_et(self.anahtar)
+
+    def onbellegi_temizle(self):
+        """Veriler değiştiğinde (kayıt eklendi/silindi) eski sonuçları unut"""
+        self._onbellek.clear()
+
+    def _ara(self):
+        metin = self._metin
+        if metin in self._onbellek:
+            self.async_dao.iptal_et(self.anahtar)
+            self._onbellek.move_to_end(metin)
+            self.sonuc_hazir.emit(metin, self._onbellek[metin])
+            return
+        self.async_dao.calistir(
+            self.anahtar, self.arama_fonksiyonu, metin,
+            basarili=lambda sonuc: self._geldi(metin, sonuc),
+        )
+
+    def _geldi(self, metin, sonuc):
+        self._onbellek[metin] = sonuc
+        self._onbellek.move_to_end(metin)
+        while len(self._onbellek) > self.onbellek_boyutu:
+            self._onbellek.popitem(last=False)
+        # Bu arada metin değiştiyse eski sonucu gösterme (sadece önbelleğe al)
+        if metin == self._metin:
+            self.sonuc_hazir.emit(metin, sonuc)
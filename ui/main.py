@@ -8,6 +8,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon
 from giris_ekrani import GirisEkrani
+from database.db import close_pool
+from database import query_stats
+from async_dao import havuzu_kapat
 try:
     import PyQt5
     plugin_path = os.path.join(os.path.dirname(PyQt5.__file__), "Qt5", "plugins")
@@ -29,7 +32,13 @@ def main():
     giris = GirisEkrani()
     giris.show()
     
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    havuzu_kapat()
+    close_pool()
+    # PGQUERY_STATS_REPORT=1: en pahalı sorguların özetini yazdır
+    if os.getenv('PGQUERY_STATS_REPORT') == '1':
+        print(query_stats.format_report())
+    sys.exit(exit_code)
 
 
 if __name__ == '__main__':
@@ -1,14 +1,47 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QTableWidget, QTableWidgetItem, QHeaderView,
-                             QPushButton, QLineEdit)
-from PyQt5.QtCore import Qt
+                             QPushButton, QLineEdit, QComboBox, QDateEdit, QCheckBox)
+from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont
 from database import dao
+from database.records import PaymentRow
+from async_dao import AsyncDao
+from gecikmeli_arama import GecikmeliArama
+
+
+def _odeme_sayfasi(metin, filtre, sayfa, sayfa_boyutu, ozet_dahil=True):
+    """
+    Arka planda calisir: filtreye uyan odemelerin bir sayfasi ve
+    (istenirse) tum eslesenlerin adet/toplam ozeti.
+    filtre: (baslangic, bitis, odeme_tipi_id, siralama_anahtari, azalan)
+    """
+    baslangic, bitis, odeme_tipi_id, siralama, azalan = filtre
+    filtreler = dict(start_date=baslangic, end_date=bitis,
+                     payment_type_id=odeme_tipi_id, member_name=metin)
+    satirlar = dao.get_subscriptions_page(
+        order_by=siralama, descending=azalan,
+        limit=sayfa_boyutu, offset=sayfa * sayfa_boyutu, records=PaymentRow, **filtreler
+    )
+    ozet = dao.get_subscriptions_summary(**filtreler) if ozet_dahil else None
+    return {'satirlar': satirlar, 'ozet': ozet, 'sayfa': sayfa}
 
 
 class OdemeEkrani(QWidget):
+    # Bir sayfada gösterilen ödeme
+    SAYFA_BOYUTU = 100
+    # Yazma durduktan kaç ms sonra arama yapılır
+    ARAMA_GECIKMESI_MS = 300
+    # Tablo sütunu -> sunucu tarafı sıralama anahtarı (dao.SUBSCRIPTION_SORT_COLUMNS)
+    SIRALAMA_SUTUNLARI = {0: 'id', 1: 'member', 2: 'price', 3: 'created_at', 4: 'payment_type'}
+
     def __init__(self):
         super().__init__()
+        self.async_dao = AsyncDao(self)
+        self.sayfa = 0
+        self.toplam_kayit = 0
+        # (baslangic, bitis, odeme_tipi_id, siralama, azalan); GUI thread'inde
+        # butun olarak degistirilir, arka plan isi sadece okur
+        self._filtre = (None, None, None, 'created_at', True)
         self.initUI()
     
     def initUI(self):
@@ -28,13 +61,61 @@ class OdemeEkrani(QWidget):
         
         layout.addLayout(header_layout)
         
-        # Istatistikler
+        # Istatistikler (filtreye uyan tum odemeler)
         self.stats_layout = QHBoxLayout()
         self.stats_layout.setSpacing(15)
+        self.islem_kutusu = self.create_stat_box('Toplam Islem', '0', '#34495e')
+        self.tutar_kutusu = self.create_stat_box('Toplam Tutar', '0.00 TL', '#27ae60')
+        self.stats_layout.addWidget(self.islem_kutusu)
+        self.stats_layout.addWidget(self.tutar_kutusu)
         layout.addLayout(self.stats_layout)
         
-        # Istatistikleri yukle
-        self.istatistikleri_guncelle()
+        # Tarih araligi ve odeme tipi filtresi
+        filtre_layout = QHBoxLayout()
+        filtre_stili = """
+            QDateEdit, QComboBox {
+                border: 2px solid #dfe4ea;
+                border-radius: 8px;
+                padding: 6px;
+                font-size: 13px;
+            }
+        """
+        
+        self.tarih_filtresi = QCheckBox('Tarih:')
+        self.tarih_filtresi.setFont(QFont('Arial', 11, QFont.Bold))
+        self.baslangic_tarihi = QDateEdit(QDate.currentDate().addDays(1 - QDate.currentDate().day()))
+        self.bitis_tarihi = QDateEdit(QDate.currentDate())
+        for tarih in (self.baslangic_tarihi, self.bitis_tarihi):
+            tarih.setCalendarPopup(True)
+            tarih.setDisplayFormat('dd.MM.yyyy')
+            tarih.setFixedHeight(40)
+            tarih.setEnabled(False)
+            tarih.setStyleSheet(filtre_stili)
+            tarih.dateChanged.connect(self.filtre_degisti)
+        self.tarih_filtresi.toggled.connect(self.baslangic_tarihi.setEnabled)
+        self.tarih_filtresi.toggled.connect(self.bitis_tarihi.setEnabled)
+        self.tarih_filtresi.toggled.connect(self.filtre_degisti)
+        
+        odeme_tipi_label = QLabel('Ödeme Tipi:')
+        odeme_tipi_label.setFont(QFont('Arial', 11, QFont.Bold))
+        self.odeme_tipi_combo = QComboBox()
+        self.odeme_tipi_combo.setFixedHeight(40)
+        self.odeme_tipi_combo.setMinimumWidth(160)
+        self.odeme_tipi_combo.setStyleSheet(filtre_stili)
+        self.odeme_tipi_combo.addItem('Tümü', None)
+        self.odeme_tipi_combo.currentIndexChanged.connect(self.filtre_degisti)
+        self.async_dao.calistir('odeme_tipleri', dao.get_all_payment_types,
+                                basarili=self.odeme_tiplerini_goster)
+        
+        filtre_layout.addWidget(self.tarih_filtresi)
+        filtre_layout.addWidget(self.baslangic_tarihi)
+        filtre_layout.addWidget(QLabel('-'))
+        filtre_layout.addWidget(self.bitis_tarihi)
+        filtre_layout.addSpacing(20)
+        filtre_layout.addWidget(odeme_tipi_label)
+        filtre_layout.addWidget(self.odeme_tipi_combo)
+        filtre_layout.addStretch()
+        layout.addLayout(filtre_layout)
         
         # Arama ve filtre
         arama_layout = QHBoxLayout()
@@ -56,6 +137,15 @@ class OdemeEkrani(QWidget):
                 border: 2px solid #e94560;
             }
         """)
+        # Yazarken her tusta degil, duraklamada tek sorgu; sayfa yuklemeleriyle
+        # ayni anahtari kullanir ki eski istek yenisini ezmesin
+        self.odeme_arama = GecikmeliArama(
+            self.async_dao, 'odemeler',
+            lambda metin: _odeme_sayfasi(metin, self._filtre, 0, self.SAYFA_BOYUTU),
+            gecikme_ms=self.ARAMA_GECIKMESI_MS,
+        )
+        self.odeme_arama.sonuc_hazir.connect(self._arama_sonucu_geldi)
+        self.odeme_arama.temizlendi.connect(self.odemeler_yukle)
         self.arama_input.textChanged.connect(self.odemeler_ara)
         
         yenile_btn = QPushButton('🔄 Yenile')
@@ -86,7 +176,14 @@ class OdemeEkrani(QWidget):
         self.odeme_tablosu.setHorizontalHeaderLabels(['Ödeme ID', 'Üye Adı', 'Tutar (TL)', 
                                                        'Tarih', 'Ödeme Tipi', 'Durum'])
         self.odeme_tablosu.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.odeme_tablosu.setEditTriggers(QTableWidget.NoEditTriggers)
         self.odeme_tablosu.setAlternatingRowColors(True)
+        # Siralama sunucuda yapilir (tum eslesenler uzerinden, sadece bu sayfa degil)
+        baslik_satiri = self.odeme_tablosu.horizontalHeader()
+        baslik_satiri.setSectionsClickable(True)
+        baslik_satiri.setSortIndicatorShown(True)
+        baslik_satiri.setSortIndicator(3, Qt.DescendingOrder)
+        baslik_satiri.sortIndicatorChanged.connect(self.siralama_degisti)
         self.odeme_tablosu.setStyleSheet("""
             QTableWidget {
                 gridline-color: #dfe4ea;
@@ -117,6 +214,41 @@ class OdemeEkrani(QWidget):
         
         layout.addWidget(self.odeme_tablosu)
         
+        # Sayfalama
+        sayfa_layout = QHBoxLayout()
+        sayfa_btn_stili = """
+            QPushButton {
+                background-color: #2c3e50;
+                color: white;
+                border-radius: 8px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #34495e;
+            }
+            QPushButton:disabled {
+                background-color: #bdc3c7;
+            }
+        """
+        self.onceki_btn = QPushButton('◀ Önceki')
+        self.sonraki_btn = QPushButton('Sonraki ▶')
+        for btn in (self.onceki_btn, self.sonraki_btn):
+            btn.setFixedSize(110, 35)
+            btn.setStyleSheet(sayfa_btn_stili)
+            btn.setEnabled(False)
+        self.onceki_btn.clicked.connect(lambda: self.sayfaya_git(self.sayfa - 1))
+        self.sonraki_btn.clicked.connect(lambda: self.sayfaya_git(self.sayfa + 1))
+        self.sayfa_label = QLabel()
+        self.sayfa_label.setFont(QFont('Arial', 11))
+        self.sayfa_label.setStyleSheet('color: #2c3e50;')
+        
+        sayfa_layout.addStretch()
+        sayfa_layout.addWidget(self.onceki_btn)
+        sayfa_layout.addWidget(self.sayfa_label)
+        sayfa_layout.addWidget(self.sonraki_btn)
+        sayfa_layout.addStretch()
+        layout.addLayout(sayfa_layout)
+        
         # Ödemeleri yükle
         self.odemeler_yukle()
         
@@ -151,34 +283,98 @@ class OdemeEkrani(QWidget):
         return box
     
 
-    def istatistikleri_guncelle(self):
-        """Istatistikleri guncelle."""
-        # Eski widget'lari temizle
-        while self.stats_layout.count():
-            child = self.stats_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-        
-        # Yeni istatistikleri hesapla
-        odemeler = dao.get_all_subscriptions()
-        toplam_odeme = len(odemeler)
-        # Baru widgetlari ekle
-        self.stats_layout.addWidget(self.create_stat_box('Toplam Islem', str(toplam_odeme), '#34495e'))
+    def kutu_guncelle(self, kutu, deger):
+        """Istatistik kutusunun deger labelini gunceller."""
+        deger_label = kutu.layout().itemAt(1).widget()
+        if isinstance(deger_label, QLabel):
+            deger_label.setText(deger)
+
+    def istatistikleri_guncelle(self, ozet):
+        """Istatistikleri (filtreye uyan tum odemelerin ozeti) guncelle."""
+        self.toplam_kayit = ozet['count']
+        self.kutu_guncelle(self.islem_kutusu, str(ozet['count']))
+        self.kutu_guncelle(self.tutar_kutusu, f"{ozet['total_revenue']:,.2f} TL")
+    
+    def odeme_tiplerini_goster(self, odeme_tipleri):
+        self.odeme_tipi_combo.blockSignals(True)
+        for tip in odeme_tipleri:
+            self.odeme_tipi_combo.addItem(tip['name'], tip['id'])
+        self.odeme_tipi_combo.blockSignals(False)
+    
+    def _filtreyi_oku(self):
+        """Filtre widget'larindan (GUI thread'inde) yeni filtre tuple'i olusturur."""
+        baslangic = bitis = None
+        if self.tarih_filtresi.isChecked():
+            baslangic = self.baslangic_tarihi.date().toPyDate()
+            bitis = self.bitis_tarihi.date().toPyDate()
+        siralama, azalan = self._filtre[3], self._filtre[4]
+        return (baslangic, bitis, self.odeme_tipi_combo.currentData(), siralama, azalan)
+    
+    def filtre_degisti(self, *_):
+        """Tarih / odeme tipi degisti: ilk sayfadan, ozetle birlikte yukle."""
+        self._filtre = self._filtreyi_oku()
+        self.odemeler_yukle()
+    
+    def siralama_degisti(self, sutun, sira):
+        anahtar = self.SIRALAMA_SUTUNLARI.get(sutun)
+        if anahtar is None:
+            # Durum sutunu siralanamaz; gostergeyi eski sutuna geri al
+            eski = next(k for k, v in self.SIRALAMA_SUTUNLARI.items() if v == self._filtre[3])
+            self.odeme_tablosu.horizontalHeader().blockSignals(True)
+            self.odeme_tablosu.horizontalHeader().setSortIndicator(
+                eski, Qt.DescendingOrder if self._filtre[4] else Qt.AscendingOrder)
+            self.odeme_tablosu.horizontalHeader().blockSignals(False)
+            return
+        self._filtre = self._filtre[:3] + (anahtar, sira == Qt.DescendingOrder)
+        # Siralama ozeti degistirmez
+        self.odeme_arama.onbellegi_temizle()
+        self._sayfa_iste(0, ozet_dahil=False)
+    
+    def sayfaya_git(self, sayfa):
+        if 0 <= sayfa < self._sayfa_sayisi():
+            self._sayfa_iste(sayfa, ozet_dahil=False)
     
     def odemeler_yukle(self):
-        self.istatistikleri_guncelle()  # Istatistikleri guncelle
-        odemeler = dao.get_all_subscriptions()
+        """Filtreye uyan ilk sayfayi ve ozeti (yeniden) yukle."""
+        # Yeni odeme olmus ya da filtre degismis olabilir: eski arama sonuclarini birak
+        self.odeme_arama.onbellegi_temizle()
+        self._sayfa_iste(0, ozet_dahil=True)
+    
+    def _sayfa_iste(self, sayfa, ozet_dahil):
+        self.async_dao.calistir(
+            'odemeler', _odeme_sayfasi,
+            self.odeme_arama.metin, self._filtre, sayfa, self.SAYFA_BOYUTU, ozet_dahil,
+            basarili=self.odemeleri_goster,
+        )
+    
+    def odemeleri_goster(self, sonuc):
+        if sonuc['ozet'] is not None:
+            self.istatistikleri_guncelle(sonuc['ozet'])  # Istatistikleri guncelle
+        self.sayfa = sonuc['sayfa']
+        self._tabloyu_doldur(sonuc['satirlar'])
+        self._sayfa_bilgisini_guncelle()
+    
+    def _sayfa_sayisi(self):
+        return max(1, -(-self.toplam_kayit // self.SAYFA_BOYUTU))
+    
+    def _sayfa_bilgisini_guncelle(self):
+        sayfa_sayisi = self._sayfa_sayisi()
+        self.sayfa_label.setText(f"  Sayfa {self.sayfa + 1} / {sayfa_sayisi}  ({self.toplam_kayit} kayıt)  ")
+        self.onceki_btn.setEnabled(self.sayfa > 0)
+        self.sonraki_btn.setEnabled(self.sayfa + 1 < sayfa_sayisi)
+    
+    def _tabloyu_doldur(self, odemeler):
         self.odeme_tablosu.setRowCount(len(odemeler))
         
         for i, odeme in enumerate(odemeler):
-            # PostgreSQL dict format
-            uye_ad = f"{odeme.get('first_name', '')} {odeme.get('last_name', '')}"
+            # dao records.PaymentRow kaydi (sadece tabloda gorunen sutunlar)
+            uye_ad = f"{odeme.first_name} {odeme.last_name}"
             data = [
-                str(odeme.get('id', '')),
+                str(odeme.id),
                 uye_ad,
-                f"{odeme.get('price_sold', 0):,.2f}",
-                str(odeme.get('created_at', '')).split('.')[0],
-                odeme.get('payment_type_name', ''),
+                f"{odeme.price_sold:,.2f}",
+                str(odeme.created_at or '').split('.')[0],
+                odeme.payment_type_name,
                 'TAMAMLANDI'
             ]
             
@@ -197,12 +393,9 @@ class OdemeEkrani(QWidget):
                 self.odeme_tablosu.setItem(i, j, item)
     
     def odemeler_ara(self):
-        arama_text = self.arama_input.text().lower()
-        
-        for i in range(self.odeme_tablosu.rowCount()):
-            uye_adi = self.odeme_tablosu.item(i, 1).text().lower()
-            
-            if arama_text in uye_adi:
-                self.odeme_tablosu.setRowHidden(i, False)
-            else:
-                self.odeme_tablosu.setRowHidden(i, True)
\ No newline at end of file
+        # Uye adina gore filtre PostgreSQL'de; bos metin filtresiz listeye doner
+        # (temizlendi -> odemeler_yukle)
+        self.odeme_arama.metin_degisti(self.arama_input.text())
+    
+    def _arama_sonucu_geldi(self, metin, sonuc):
+        self.odemeleri_goster(sonuc)
@@ -6,6 +6,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from database import dao
+from async_dao import AsyncDao
 
 
 class PaketEkleDialog(QDialog):
@@ -132,6 +133,7 @@ class PaketEkleDialog(QDialog):
 class PaketYonetimi(QWidget):
     def __init__(self):
         super().__init__()
+        self.async_dao = AsyncDao(self)
         self.initUI()
     
     def initUI(self):
@@ -290,8 +292,14 @@ class PaketYonetimi(QWidget):
         self.paketleri_yukle()
     
     def paketleri_yukle(self):
+        self.async_dao.calistir(
+            'paketler', dao.get_all_packages,
+            basarili=self.paketleri_goster,
+            hata=lambda e: QMessageBox.critical(self, 'Hata', f'Paketler yüklenirken hata oluştu:\n{str(e)}'),
+        )
+    
+    def paketleri_goster(self, paketler):
         try:
-            paketler = dao.get_all_packages()
             self.paket_tablosu.setRowCount(len(paketler))
             
             for i, paket in enumerate(paketler):
@@ -3,12 +3,21 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from database import dao
 from datetime import datetime, timedelta
+from async_dao import AsyncDao
+
+def _program_detayi(program_id):
+    """Program ve egzersizlerini tek arka plan işinde getirir."""
+    program = dao.get_program(program_id)
+    egzersizler = dao.get_program_exercises(program_id) if program else []
+    return program, egzersizler
+
 
 class ProgramAtaDialog(QDialog):
     def __init__(self, uye_id, uye_adi, parent=None):
         super().__init__(parent)
         self.uye_id = uye_id
         self.uye_adi = uye_adi
+        self.async_dao = AsyncDao(self)
         
         self.setWindowTitle(f"Program Ata - {uye_adi}")
         self.setMinimumSize(500, 400)
@@ -39,17 +48,6 @@ class ProgramAtaDialog(QDialog):
             }
         """)
         
-        # Programları yükle
-        programlar = dao.get_all_programs()
-        if not programlar:
-            QMessageBox.warning(self, "Uyarı", "Henüz hiç program oluşturulmamış!\nÖnce 'Programlar' sekmesinden program oluşturun.")
-            self.reject()
-            return
-        
-        for program in programlar:
-            # PostgreSQL dict: {id, name, description}
-            self.program_combo.addItem(f"{program.get('name', '')} - {program.get('description', '')}", program.get('id'))
-        
         self.program_combo.currentIndexChanged.connect(self.program_secildi)
         
         # Program detayları
@@ -121,8 +119,9 @@ class ProgramAtaDialog(QDialog):
         
         layout.addLayout(form_layout)
         
-        # İlk programı göster
-        self.program_secildi()
+        # Programları yükle (arka planda; ilk program gelince gösterilir)
+        self.async_dao.calistir('programlar', dao.get_all_programs,
+                                basarili=self.programlari_goster)
         
         # Butonlar
         buton_layout = QHBoxLayout()
@@ -166,20 +165,35 @@ class ProgramAtaDialog(QDialog):
         
         self.setLayout(layout)
     
+    def programlari_goster(self, programlar):
+        """Yüklenen programları combo box'a ekler."""
+        if not programlar:
+            QMessageBox.warning(self, "Uyarı", "Henüz hiç program oluşturulmamış!\nÖnce 'Programlar' sekmesinden program oluşturun.")
+            self.reject()
+            return
+        
+        for program in programlar:
+            # PostgreSQL dict: {id, name, description}
+            self.program_combo.addItem(f"{program.get('name', '')} - {program.get('description', '')}", program.get('id'))
+    
     def program_secildi(self):
         """Program seçildiğinde detayları gösterir."""
         program_id = self.program_combo.currentData()
         if program_id:
-            program = dao.get_program(program_id)
-            if program:
-                # PostgreSQL dict: {id, name, description}
-                detay_text = f"<b>Açıklama:</b> {program.get('description', '') or 'Yok'}<br>"
-                
-                # Egzersiz sayısını hesapla
-                egzersizler = dao.get_program_exercises(program_id)
-                detay_text += f"<b>Egzersiz Sayısı:</b> {len(egzersizler)}"
-                
-                self.program_detay_label.setText(detay_text)
+            # Hızlı gezinirken sadece son seçilen programın detayı gösterilir
+            self.async_dao.calistir('program_detay', _program_detayi, program_id,
+                                    basarili=self.program_detay_goster)
+    
+    def program_detay_goster(self, detay):
+        program, egzersizler = detay
+        if program:
+            # PostgreSQL dict: {id, name, description}
+            detay_text = f"<b>Açıklama:</b> {program.get('description', '') or 'Yok'}<br>"
+            
+            # Egzersiz sayısını hesapla
+            detay_text += f"<b>Egzersiz Sayısı:</b> {len(egzersizler)}"
+            
+            self.program_detay_label.setText(detay_text)
     
     def tarih_degisti(self):
         """Başlangıç tarihi değiştiğinde bitiş tarihini otomatik ayarlar."""
@@ -195,6 +209,10 @@ class ProgramAtaDialog(QDialog):
         bitis = self.bitis_date.date().toString("yyyy-MM-dd")
         notlar = self.notlar_input.toPlainText().strip()
         
+        if program_id is None:
+            QMessageBox.warning(self, "Uyarı", "Lütfen bir program seçin!")
+            return
+        
         # Tarih kontrolü
         if self.bitis_date.date() <= self.baslangic_date.date():
             QMessageBox.warning(self, "Uyarı", "Bitiş tarihi başlangıç tarihinden sonra olmalıdır!")
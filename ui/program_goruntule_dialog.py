@@ -2,12 +2,26 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from database import dao
+from async_dao import AsyncDao
+
+
+def _uye_programi(uye_id):
+    """Üyenin programı ve egzersizleri (tek arka plan işinde). Program atanmamışsa None."""
+    uye = dao.get_user(uye_id, columns=('current_program_id',))
+    program_id = uye.get('current_program_id') if uye else None
+    if not program_id:
+        return None
+    program = dao.get_program(program_id)
+    egzersizler = dao.get_program_exercises(program_id) if program else []
+    return program, egzersizler
+
 
 class ProgramGoruntuleDialog(QDialog):
     def __init__(self, uye_id, uye_adi, parent=None):
         super().__init__(parent)
         self.uye_id = uye_id
         self.uye_adi = uye_adi
+        self.async_dao = AsyncDao(self)
         
         self.setWindowTitle(f"Program Görüntüle - {uye_adi}")
         self.setMinimumSize(900, 600)
@@ -108,11 +122,14 @@ class ProgramGoruntuleDialog(QDialog):
         self.setLayout(layout)
     
     def program_yukle(self):
-        """Üyenin programını yükler."""
-        # PostgreSQL'de üyenin programını al
-        uye = dao.get_user(self.uye_id)
-        
-        if not uye or not uye.get('current_program_id'):
+        """Üyenin programını yükler (arka planda)."""
+        self.async_dao.calistir(
+            'program', _uye_programi, self.uye_id,
+            basarili=self.program_goster,
+            hata=lambda e: QMessageBox.warning(self, "Hata", f"Program yüklenemedi:\n{e}"))
+    
+    def program_goster(self, sonuc):
+        if sonuc is None:
             QMessageBox.information(
                 self,
                 "Bilgi",
@@ -121,9 +138,7 @@ class ProgramGoruntuleDialog(QDialog):
             self.reject()
             return
         
-        program_id = uye.get('current_program_id')
-        program = dao.get_program(program_id)
-        
+        program, egzersizler = sonuc
         if not program:
             QMessageBox.warning(self, "Hata", "Program bilgisi alınamadı!")
             self.reject()
@@ -138,9 +153,6 @@ class ProgramGoruntuleDialog(QDialog):
         
         self.bilgi_label.setText(bilgi_text)
         
-        # Egzersizleri yükle
-        egzersizler = dao.get_program_exercises(program_id)
-        
         if not egzersizler:
             QMessageBox.warning(
                 self,
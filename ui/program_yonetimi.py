@@ -3,10 +3,23 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from database import dao
 from datetime import datetime
+from async_dao import AsyncDao
+
+def _program_formu(program_id):
+    """
+    Egzersiz listesi ile (düzenlemede) program ve egzersizleri; tek arka
+    plan işinde getirilir.
+    """
+    tum_egzersizler = dao.get_all_exercises()
+    program = dao.get_program(program_id) if program_id else None
+    program_egzersizleri = dao.get_program_exercises(program_id) if program else []
+    return tum_egzersizler, program, program_egzersizleri
+
 
 class ProgramYonetimiWidget(QWidget):
     def __init__(self):
         super().__init__()
+        self.async_dao = AsyncDao(self)
         self.init_ui()
         self.programlari_yukle()
     
@@ -134,8 +147,11 @@ class ProgramYonetimiWidget(QWidget):
         self.setLayout(layout)
     
     def programlari_yukle(self):
-        """Programları veritabanından yükler."""
-        programlar = dao.get_all_programs()
+        """Programları veritabanından yükler (arka planda)."""
+        self.async_dao.calistir('programlar', dao.get_all_programs,
+                                basarili=self.programlari_goster)
+    
+    def programlari_goster(self, programlar):
         self.program_table.setRowCount(len(programlar))
         
         for row, program in enumerate(programlar):
@@ -191,13 +207,13 @@ class ProgramOlusturDialog(QDialog):
         super().__init__(parent)
         self.program_id = program_id
         self.egzersiz_satirlari = []
+        self.tum_egzersizler = []  # Egzersiz seçim listesi (arka planda bir kez yüklenir)
+        self.async_dao = AsyncDao(self)
         
         self.setWindowTitle("Yeni Program Oluştur" if not program_id else "Program Düzenle")
         self.setMinimumSize(900, 700)
         self.init_ui()
-        
-        if program_id:
-            self.program_yukle()
+        self.program_yukle()
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -243,6 +259,7 @@ class ProgramOlusturDialog(QDialog):
         """)
         ekle_btn.clicked.connect(self.egzersiz_ekle)
         egzersiz_layout.addWidget(ekle_btn)
+        self.ekle_btn = ekle_btn
         
         # Egzersiz listesi için scroll area
         scroll = QScrollArea()
@@ -278,6 +295,7 @@ class ProgramOlusturDialog(QDialog):
             }
         """)
         kaydet_btn.clicked.connect(self.kaydet)
+        self.kaydet_btn = kaydet_btn
         
         iptal_btn = QPushButton("❌ İptal")
         iptal_btn.setStyleSheet("""
@@ -303,15 +321,25 @@ class ProgramOlusturDialog(QDialog):
         self.setLayout(layout)
     
     def program_yukle(self):
-        """Mevcut programı yükler."""
-        program = dao.get_program(self.program_id)
+        """Egzersiz listesini ve (düzenlemede) mevcut programı arka planda yükler."""
+        # Veriler gelene kadar ekleme/kaydetme kapalı (boş program kaydedilmesin)
+        self.ekle_btn.setEnabled(False)
+        self.kaydet_btn.setEnabled(False)
+        self.async_dao.calistir(
+            'program_formu', _program_formu, self.program_id,
+            basarili=self.program_goster,
+            hata=lambda e: QMessageBox.warning(self, "Hata", f"Program yüklenemedi:\n{e}"))
+    
+    def program_goster(self, veri):
+        self.tum_egzersizler, program, egzersizler = veri
+        self.ekle_btn.setEnabled(True)
+        self.kaydet_btn.setEnabled(True)
         if program:
             self.program_adi_input.setText(program.get('name', ''))
             self.aciklama_input.setPlainText(program.get('description', '') or "")
             self.hedef_input.setText(program.get('description', '') or "")  # PostgreSQL'de hedef yok, description kullanılıyor
             
             # Egzersizleri yükle
-            egzersizler = dao.get_program_exercises(self.program_id)
             for egz in egzersizler:
                 # PostgreSQL dict: {id, program_id, exercise_id, sets, reps, exercise_name}
                 self.egzersiz_ekle(egz)
@@ -326,8 +354,7 @@ class ProgramOlusturDialog(QDialog):
         egzersiz_combo = QComboBox()
         egzersiz_combo.setMinimumWidth(200)
         egzersiz_combo.setEditable(True)
-        egzersizler = dao.get_all_exercises()
-        for egz in egzersizler:
+        for egz in self.tum_egzersizler:
             # PostgreSQL dict: {id, name, muscle_group, description}
             egzersiz_combo.addItem(f"{egz.get('name', '')} ({egz.get('muscle_group', '')})", egz.get('id'))
         
@@ -457,36 +484,39 @@ class ProgramOlusturDialog(QDialog):
             return
         
         try:
-            # Program oluştur veya güncelle
-            if self.program_id:
-                # Güncelleme - PostgreSQL'de update_program fonksiyonu kullan
-                dao.update_program(self.program_id, name=program_adi, description=aciklama)
-                # Eski egzersizleri sil
-                dao.delete_program_exercises(self.program_id)
-                program_id = self.program_id
-            else:
-                # Yeni program oluştur
-                program_id = dao.create_program(program_adi, aciklama)
+            # Program ve egzersizleri tek transaction'da kaydet (tek bağlantı,
+            # tek commit): hata olursa program yarım kalmaz
+            with dao.transaction():
+                # Program oluştur veya güncelle
+                if self.program_id:
+                    # Güncelleme - PostgreSQL'de update_program fonksiyonu kullan
+                    dao.update_program(self.program_id, name=program_adi, description=aciklama)
+                    # Eski egzersizleri sil
+                    dao.delete_program_exercises(self.program_id)
+                    program_id = self.program_id
+                else:
+                    # Yeni program oluştur
+                    program_id = dao.create_program(program_adi, aciklama)
             
-            # Egzersizleri ekle
-            for satir in self.egzersiz_satirlari:
-                combo = satir['egzersiz_combo']
-                egzersiz_id = combo.currentData()
-                egzersiz_adi = combo.currentText().strip()
+                # Egzersizleri ekle
+                for satir in self.egzersiz_satirlari:
+                    combo = satir['egzersiz_combo']
+                    egzersiz_id = combo.currentData()
+                    egzersiz_adi = combo.currentText().strip()
                 
-                # Eğer listeden seçilmediyse (yeni giriş)
-                if combo.currentIndex() == -1:
-                    if not egzersiz_adi:
-                        continue 
-                    # Yeni egzersiz oluştur veya varsa ID'sini al
-                    egzersiz_id = dao.create_exercise(egzersiz_adi)
-                set_sayisi = satir['set_input'].value()
-                tekrar = satir['tekrar_input'].text().strip()
+                    # Eğer listeden seçilmediyse (yeni giriş)
+                    if combo.currentIndex() == -1:
+                        if not egzersiz_adi:
+                            continue 
+                        # Yeni egzersiz oluştur veya varsa ID'sini al
+                        egzersiz_id = dao.create_exercise(egzersiz_adi)
+                    set_sayisi = satir['set_input'].value()
+                    tekrar = satir['tekrar_input'].text().strip()
                 
-                # PostgreSQL dao: add_exercise_to_program(program_id, exercise_id, sets, reps)
-                dao.add_exercise_to_program(
-                    program_id, egzersiz_id, set_sayisi, tekrar
-                )
+                    # PostgreSQL dao: add_exercise_to_program(program_id, exercise_id, sets, reps)
+                    dao.add_exercise_to_program(
+                        program_id, egzersiz_id, set_sayisi, tekrar
+                    )
             
             QMessageBox.information(
                 self, 
@@ -4,6 +4,7 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt, QDate, pyqtSignal
 from PyQt5.QtGui import QFont
 from database import dao
+from async_dao import AsyncDao
 
 
 class UyeGuncelleDialog(QDialog):
@@ -13,6 +14,7 @@ class UyeGuncelleDialog(QDialog):
     def __init__(self, uye_id, parent=None):
         super().__init__(parent)
         self.uye_id = uye_id
+        self.async_dao = AsyncDao(self)
         self.setWindowTitle("Üye Bilgilerini Güncelle")
         self.setModal(True)
         self.setMinimumWidth(600)
@@ -122,6 +124,9 @@ class UyeGuncelleDialog(QDialog):
         
         kaydet_btn = QPushButton('💾 Güncelle')
         kaydet_btn.setFixedHeight(45)
+        # Üye bilgileri gelene kadar kapalı (boş form kaydedilmesin)
+        kaydet_btn.setEnabled(False)
+        self.kaydet_btn = kaydet_btn
         kaydet_btn.setStyleSheet("""
             QPushButton {
                 background-color: #27ae60;
@@ -187,9 +192,16 @@ class UyeGuncelleDialog(QDialog):
         """)
     
     def uye_bilgilerini_yukle(self):
-        """Mevcut üye bilgilerini forma yükle."""
-        uye = dao.get_user(self.uye_id)
+        """Mevcut üye bilgilerini forma yükle (arka planda)."""
+        self.async_dao.calistir(
+            'uye', dao.get_user, self.uye_id,
+            columns=('first_name', 'last_name', 'tc_number', 'phone', 'email', 'birth_date', 'gender'),
+            basarili=self.uye_bilgilerini_goster,
+            hata=lambda e: QMessageBox.warning(self, 'Hata', f'Üye bilgileri yüklenemedi:\n{e}'))
+    
+    def uye_bilgilerini_goster(self, uye):
         if uye:
+            self.kaydet_btn.setEnabled(True)
             # PostgreSQL dict format
             self.ad_input.setText(uye.get('first_name', ''))
             self.soyad_input.setText(uye.get('last_name', ''))
@@ -5,11 +5,13 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont
 from database import dao
+from async_dao import AsyncDao
 
 
 class UyeIslemleri(QWidget):
     def __init__(self):
         super().__init__()
+        self.async_dao = AsyncDao(self)
         self.initUI()
     
     def initUI(self):
@@ -266,8 +268,11 @@ class UyeIslemleri(QWidget):
         """)
     
     def paketleri_yukle(self):
+        self.async_dao.calistir('paketler', dao.get_all_packages,
+                                basarili=self.paketleri_goster)
+    
+    def paketleri_goster(self, paketler):
         self.paket_combo.clear()
-        paketler = dao.get_all_packages()
         for paket in paketler:
             # PostgreSQL dict format: {id, name, duration_days, price, description}
             self.paket_combo.addItem(f"{paket['name']} - {paket['price']:.0f} TL", paket['id'])
@@ -286,36 +291,41 @@ class UyeIslemleri(QWidget):
             QMessageBox.warning(self, 'Uyarı', 'Lütfen bir paket seçiniz!')
             return
         
-        # Üyeyi kaydet (validasyonlar dao.py'de yapılıyor)
-        uye_id = dao.create_user(
-            self.ad_input.text(),
-            self.soyad_input.text(),
-            self.email_input.text(),
-            '',  # password (boş bırakılıyor, sadece coach'ler için)
-            self.telefon_input.text(),
-            self.cinsiyet_combo.currentText(),
-            self.tc_input.text(),
-            self.dogum_tarihi.date().toPyDate(),
-        )
-        
-        if uye_id:
-            # Üyelik oluştur
-            paket_id = self.paket_combo.currentData()
-            # Odeme tipini belirle
-            odeme_tipi_id = 1  # Nakit
-            if self.kredi_radio.isChecked():
-                odeme_tipi_id = 2  # Kredi Kartı
-            elif self.havale_radio.isChecked():
-                odeme_tipi_id = 3  # Havale/EFT
-            
-            # Paket bilgilerini al
-            paket = dao.get_package(paket_id)
-            if paket:
+        paket_id = self.paket_combo.currentData()
+        # Odeme tipini belirle
+        odeme_tipi_id = 1  # Nakit
+        if self.kredi_radio.isChecked():
+            odeme_tipi_id = 2  # Kredi Kartı
+        elif self.havale_radio.isChecked():
+            odeme_tipi_id = 3  # Havale/EFT
+        
+        # Üye ve üyeliği tek transaction'da kaydet (tek bağlantı, tek commit):
+        # herhangi bir adım başarısız olursa üye de kaydedilmez
+        try:
+            with dao.transaction():
+                # Üyeyi kaydet (validasyonlar dao.py'de yapılıyor)
+                uye_id = dao.create_user(
+                    self.ad_input.text(),
+                    self.soyad_input.text(),
+                    self.email_input.text(),
+                    '',  # password (boş bırakılıyor, sadece coach'ler için)
+                    self.telefon_input.text(),
+                    self.cinsiyet_combo.currentText(),
+                    self.tc_input.text(),
+                    self.dogum_tarihi.date().toPyDate(),
+                )
+                
+                # Paket bilgilerini al
+                paket = dao.get_package(paket_id)
+                if not paket:
+                    raise LookupError('Paket bilgisi alınamadı!')
+                
                 from datetime import datetime, timedelta
                 baslangic = datetime.now()
                 bitis = baslangic + timedelta(days=paket['duration_days'])
                 
-                uyelik_id = dao.create_subscription(
+                # Üyelik oluştur
+                dao.create_subscription(
                     uye_id, 
                     paket_id, 
                     baslangic, 
@@ -323,19 +333,17 @@ class UyeIslemleri(QWidget):
                     paket['price'],
                     odeme_tipi_id
                 )
-                
-                if uyelik_id:
-                    QMessageBox.information(self, 'Başarılı', 
-                        f'{self.ad_input.text()} {self.soyad_input.text()} başarıyla kaydedildi!\n'
-                        f'Üyelik No: {uye_id}')
-                    self.formu_temizle()
-                else:
-                    QMessageBox.warning(self, 'Hata', 'Üyelik oluşturulurken bir hata oluştu!')
-            else:
-                QMessageBox.warning(self, 'Hata', 'Paket bilgisi alınamadı!')
-        else:
-            # Hata
-            QMessageBox.warning(self, 'Hata', 'Üye kaydedilirken bir hata oluştu!')
+        except LookupError as e:
+            QMessageBox.warning(self, 'Hata', str(e))
+            return
+        except Exception as e:
+            QMessageBox.warning(self, 'Hata', f'Üye kaydedilirken bir hata oluştu!\n{e}')
+            return
+        
+        QMessageBox.information(self, 'Başarılı', 
+            f'{self.ad_input.text()} {self.soyad_input.text()} başarıyla kaydedildi!\n'
+            f'Üyelik No: {uye_id}')
+        self.formu_temizle()
     
     def formu_temizle(self):
         self.ad_input.clear()
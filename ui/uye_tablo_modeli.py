@@ -0,0 +1,177 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant, QSortFilterProxyModel
+from PyQt5.QtGui import QFont, QBrush
+
+
+class UyeTabloModeli(QAbstractTableModel):
+    """
+    Üye listesi için model (QTableView ile kullanılır).
+
+    Satırlar kompakt tuple'lar olarak tutulur; hücre metni, rengi ve fontu
+    data() içinde sadece görünen satırlar için hesaplanır. Yeniden yükleme
+    tek bir model reset'idir, satır başına QTableWidgetItem oluşturulmaz.
+
+    sayfali_yukle() ile verilirse liste sayfa sayfa (keyset) yüklenir:
+    görünüm en alta kaydırıldıkça canFetchMore()/fetchMore() sıradaki
+    sayfayı son satırın id'sinden sonrası olarak ister. async_dao verilirse
+    sayfalar arka planda yüklenir ve gelince eklenir.
+    """
+    BASLIKLAR = ['ID', 'Ad Soyad', 'TC No', 'Telefon', 'E-posta', 'Paket',
+                 'Başlangıç', 'Bitiş', 'Durum']
+
+    # Satır tuple'ındaki sütun sırası (BASLIKLAR ile aynı)
+    ID, AD_SOYAD, TC_NO, TELEFON, EPOSTA, PAKET, BASLANGIC, BITIS, DURUM = range(9)
+
+    # Sayfa isteklerinin AsyncDao anahtarı (yeni istek eskisini iptal eder)
+    ISTEK_ANAHTARI = 'uye_sayfasi'
+
+    def __init__(self, async_dao=None, parent=None):
+        super().__init__(parent)
+        self.async_dao = async_dao
+        self._satirlar = []
+        self._sayfa_yukleyici = None  # (after_id, limit) -> list[records.MemberRow]
+        self._sayfa_boyutu = 0
+        self._daha_var = False
+        self._yukleniyor = False
+        # Durum sütunu stili (tüm hücreler aynı nesneleri paylaşır)
+        self.aktif_renk = QBrush(Qt.darkGreen)
+        self.pasif_renk = QBrush(Qt.red)
+        self.durum_fontu = QFont('Arial', 11, QFont.Bold)
+
+    @staticmethod
+    def _satir(uye):
+        """dao'nun records.MemberRow kaydını kompakt satır tuple'ına çevirir"""
+        return (
+            uye.id,
+            f"{uye.first_name} {uye.last_name}",
+            uye.tc_number or '',
+            uye.phone or '',
+            uye.email or '',
+            uye.program_name or '',
+            uye.start_date,
+            uye.end_date,
+            uye.subscription_status or 'Pasif',
+        )
+
+    def uyeleri_ayarla(self, uyeler):
+        """Tüm listeyi değiştirir (tek model reset, sayfalama yok)"""
+        self.yuklemeyi_durdur()
+        self.beginResetModel()
+        self._satirlar = [self._satir(uye) for uye in uyeler]
+        self.endResetModel()
+
+    def sayfali_yukle(self, yukleyici, sayfa_boyutu=200):
+        """
+        Listeyi ilk sayfayla değiştirir; sonraki sayfalar kaydırdıkça gelir.
+        yukleyici(after_id, limit) id'ye göre sıralı en fazla limit üye
+        (records.MemberRow) döndürmeli.
+        """
+        self.yuklemeyi_durdur()
+        self._sayfa_yukleyici = yukleyici
+        self._sayfa_boyutu = sayfa_boyutu
+        self._sayfa_iste(None, self._ilk_sayfa_geldi)
+
+    def yuklemeyi_durdur(self):
+        """Bekleyen sayfa isteğini iptal eder, sonraki sayfaları kapatır"""
+        if self.async_dao is not None:
+            self.async_dao.iptal_et(self.ISTEK_ANAHTARI)
+        self._yukleniyor = False
+        self._daha_var = False
+
+    def _sayfa_iste(self, after_id, teslim):
+        if self.async_dao is None:
+            teslim(self._sayfa_yukleyici(after_id, self._sayfa_boyutu))
+            return
+        self._yukleniyor = True
+        self.async_dao.calistir(
+            self.ISTEK_ANAHTARI, self._sayfa_yukleyici, after_id, self._sayfa_boyutu,
+            basarili=teslim, hata=self._sayfa_hatasi,
+        )
+
+    def _ilk_sayfa_geldi(self, sayfa):
+        self._yukleniyor = False
+        self.beginResetModel()
+        self._daha_var = len(sayfa) >= self._sayfa_boyutu
+        self._satirlar = [self._satir(uye) for uye in sayfa]
+        self.endResetModel()
+
+    def _sayfa_geldi(self, sayfa):
+        self._yukleniyor = False
+        self._daha_var = len(sayfa) >= self._sayfa_boyutu
+        if not sayfa:
+            return
+        ilk = len(self._satirlar)
+        self.beginInsertRows(QModelIndex(), ilk, ilk + len(sayfa) - 1)
+        self._satirlar.extend(self._satir(uye) for uye in sayfa)
+        self.endInsertRows()
+
+    def _sayfa_hatasi(self, hata):
+        self._yukleniyor = False
+        print(f"Uye sayfasi yuklenemedi: {hata}")
+
+    def uye_id(self, satir):
+        return self._satirlar[satir][self.ID]
+
+    def ad_soyad(self, satir):
+        return self._satirlar[satir][self.AD_SOYAD]
+
+    # ----- QAbstractTableModel -----
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._daha_var and not self._yukleniyor
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        son_id = self._satirlar[-1][self.ID] if self._satirlar else None
+        self._sayfa_iste(son_id, self._sayfa_geldi)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._satirlar)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.BASLIKLAR)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.BASLIKLAR[section]
+        return QVariant()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        satir = self._satirlar[index.row()]
+        sutun = index.column()
+        deger = satir[sutun]
+
+        if role == Qt.DisplayRole:
+            return str(deger) if deger else '-'
+        if role == Qt.UserRole:
+            # Sıralama anahtarı: ID sayısal, tarihler kronolojik
+            if sutun == self.ID:
+                return deger
+            if sutun in (self.BASLANGIC, self.BITIS):
+                return deger.isoformat() if deger else ''
+            return deger
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if sutun == self.DURUM:
+            if role == Qt.ForegroundRole:
+                return self.aktif_renk if deger == 'Aktif' else self.pasif_renk
+            if role == Qt.FontRole:
+                return self.durum_fontu
+        return QVariant()
+
+
+def uye_proxy_modeli(model, parent=None):
+    """
+    Üye modeli için sıralama/filtreleme proxy'si.
+    Filtre tüm sütunlarda, büyük/küçük harf duyarsız aranır; sıralama
+    Qt.UserRole'deki ham değerlere göre yapılır. Sayfalı (fetchMore) listede
+    sıralama açılmamalı: sadece yüklenmiş satırları sıralar.
+    """
+    proxy = QSortFilterProxyModel(parent)
+    proxy.setSourceModel(model)
+    proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+    proxy.setFilterKeyColumn(-1)
+    proxy.setSortRole(Qt.UserRole)
+    return proxy
@@ -5,6 +5,7 @@ from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont
 from database import dao
 from datetime import datetime, timedelta
+from async_dao import AsyncDao
 
 
 class UyelikYenileDialog(QDialog):
@@ -15,6 +16,7 @@ class UyelikYenileDialog(QDialog):
         super().__init__(parent)
         self.uye_id = uye_id
         self.uye_ad = uye_ad
+        self.async_dao = AsyncDao(self)
         self.setWindowTitle("Üyelik Yenile")
         self.setModal(True)
         self.setMinimumWidth(500)
@@ -194,8 +196,11 @@ class UyelikYenileDialog(QDialog):
         """)
     
     def paketleri_yukle(self):
-        """Paketleri combo box'a yükle."""
-        paketler = dao.get_all_packages()
+        """Paketleri combo box'a yükle (arka planda)."""
+        self.async_dao.calistir('paketler', dao.get_all_packages,
+                                basarili=self.paketleri_goster)
+    
+    def paketleri_goster(self, paketler):
         for paket in paketler:
             # PostgreSQL dict format: {id, name, duration_days, price, description}
             self.paket_combo.addItem(
@@ -261,9 +266,7 @@ class UyelikYenileDialog(QDialog):
                     price_sold=float(paket['price']),
                     payment_type_id=payment_type_id
                 )
-                
-                # Kullanıcı durumunu aktif yap
-                dao.update_user(self.uye_id, status='Aktif')
+                # Üye durumu (Aktif) create_subscription içinde güncellenir
                 
                 QMessageBox.information(
                     self,